@@ -0,0 +1,178 @@
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.utils.text_normalizer import tokenize
+
+
+# ---------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------
+
+# Course codes as users type them: "AE ZG631", "ae zg631",
+# "AE* ZG631", "AEZG631". Lookahead so overlapping
+# candidates are all tried against the code table.
+QUESTION_CODE_PATTERN = re.compile(
+    r"(?=\b([A-Za-z]{2,5})\*?\s*([A-Za-z]{2}\s?\d{3})\b)"
+)
+
+# Question words ignored when matching a question to a title
+QUESTION_WORDS = {
+    "what", "how", "explain", "define", "describe",
+    "course", "about", "tell", "me", "which",
+}
+
+
+def course_code_key(code: str) -> str:
+    """
+    Hash key for a course code: uppercase, no '*' or spaces.
+    """
+
+    return re.sub(r"[\s*]+", "", code).upper()
+
+
+def code_candidates(text: str) -> List[str]:
+    """
+    Keys of everything in free text shaped like a course
+    code, in order, known to a catalog or not.
+    """
+
+    return list(dict.fromkeys(
+        course_code_key(m.group(1) + m.group(2))
+        for m in QUESTION_CODE_PATTERN.finditer(text)
+    ))
+
+
+def title_terms(text: str) -> Set[str]:
+    """
+    Tokens a question is matched to course titles by.
+    """
+
+    return {t for t in tokenize(text) if t not in QUESTION_WORDS}
+
+
+def question_course_key(question: str) -> Tuple:
+    """
+    Everything CourseIndex.resolve() reads from a question.
+    """
+
+    return tuple(code_candidates(question)), tuple(sorted(title_terms(question)))
+
+
+# ---------------------------------------------------------
+# Index
+# ---------------------------------------------------------
+
+class CourseIndex:
+    """
+    Exact-lookup index over extract_courses_from_pdf records.
+
+    - codes: normalized code -> course ids (O(1) lookup)
+    - title_postings: title token -> course ids
+    - credits: credits -> course ids
+    """
+
+    def __init__(self, courses: List[Dict]):
+        self.courses = courses
+        self.codes: Dict[str, List[int]] = {}
+        self.title_postings: Dict[str, Set[int]] = {}
+        self.title_tokens: List[Set[str]] = []
+        self.credits: Dict[int, List[int]] = {}
+
+        for cid, course in enumerate(courses):
+            self.codes.setdefault(
+                course_code_key(course["course_code"]), []
+            ).append(cid)
+
+            tokens = set(tokenize(course.get("title", "")))
+            self.title_tokens.append(tokens)
+            for t in tokens:
+                self.title_postings.setdefault(t, set()).add(cid)
+
+            if course.get("credits") is not None:
+                self.credits.setdefault(course["credits"], []).append(cid)
+
+    def __len__(self) -> int:
+        return len(self.courses)
+
+    def lookup_code(self, code: str) -> List[Dict]:
+        return [self.courses[c] for c in self.codes.get(course_code_key(code), [])]
+
+    def codes_in_text(self, text: str) -> List[str]:
+        """
+        Known course codes mentioned in free text, in order.
+        """
+
+        return [key for key in code_candidates(text) if key in self.codes]
+
+    def match_title(self, text: str) -> List[Dict]:
+        """
+        Courses whose title tokens are exactly the question's
+        content tokens (question words ignored).
+        """
+
+        tokens = title_terms(text)
+        if not tokens:
+            return []
+
+        candidates: Optional[Set[int]] = None
+        for t in tokens:
+            ids = self.title_postings.get(t)
+            if not ids:
+                return []
+            candidates = set(ids) if candidates is None else candidates & ids
+
+        return [
+            self.courses[c] for c in sorted(candidates)
+            if self.title_tokens[c] == tokens
+        ]
+
+    def resolve(self, question: str) -> List[Dict]:
+        """
+        Courses a question is about: by code first, then title.
+        """
+
+        keys = self.codes_in_text(question)
+        if keys:
+            return [self.courses[c] for k in keys for c in self.codes[k]]
+
+        return self.match_title(question)
+
+    def filter(
+        self,
+        credits: Optional[int] = None,
+        min_credits: Optional[int] = None,
+        max_credits: Optional[int] = None,
+        title: Optional[str] = None,
+    ) -> List[Dict]:
+        if credits is not None:
+            ids = list(self.credits.get(credits, []))
+        else:
+            ids = list(range(len(self.courses)))
+
+        if min_credits is not None or max_credits is not None:
+            lo = min_credits if min_credits is not None else float("-inf")
+            hi = max_credits if max_credits is not None else float("inf")
+            ids = [
+                c for c in ids
+                if self.courses[c].get("credits") is not None
+                and lo <= self.courses[c]["credits"] <= hi
+            ]
+
+        if title:
+            wanted = set(tokenize(title))
+            ids = [c for c in ids if wanted <= self.title_tokens[c]]
+
+        return [self.courses[c] for c in ids]
+
+
+def build_course_index(courses: List[Dict]) -> CourseIndex:
+    return CourseIndex([
+        {
+            "course_code": c["course_code"],
+            "title": c["title"],
+            "credits": c.get("credits"),
+            "description": c.get("description", "").strip(),
+            "page": c.get("page"),
+        }
+        for c in courses
+    ])
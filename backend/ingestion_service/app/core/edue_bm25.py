@@ -0,0 +1,460 @@
+import heapq
+import math
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.utils.text_normalizer import STOPWORDS, word_terms
+
+
+# ---------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------
+
+BM25_K1 = 1.2
+
+# BM25F field settings: (weight, length normalization b)
+BODY_FIELD = (1.0, 0.75)
+HEADER_FIELD = (2.0, 0.5)
+
+# Positional re-ranking: adjacent question terms found as an
+# exact phrase (same word gap as in the question) or within a
+# small window earn a share of their own BM25F weights.
+PHRASE_BONUS = 0.5
+PROXIMITY_BONUS = 0.2
+PROXIMITY_WINDOW = 4
+
+# Largest share of a pair's weights a sentence can earn; bounds
+# the positional bonus so the re-rank can stop early.
+MAX_PAIR_BONUS = max(PHRASE_BONUS, PROXIMITY_BONUS)
+
+# The re-rank's bound is grown by this relative margin so
+# float32 rounding can never skip a sentence that would have
+# made the top-k.
+PRUNE_MARGIN = 1e-4
+
+
+def bm25_tokenize(text: str) -> List[str]:
+    return [
+        t for t in word_terms(text.lower())
+        if t not in STOPWORDS
+    ]
+
+
+class BM25Query(NamedTuple):
+    tokens: List[str]
+    # Word offset of each token in the question (stopwords
+    # count), used for exact phrase gaps
+    offsets: List[int]
+
+
+def parse_bm25_query(text: str) -> BM25Query:
+    tokens: List[str] = []
+    offsets: List[int] = []
+
+    for i, w in enumerate(word_terms(text.lower())):
+        if w not in STOPWORDS:
+            tokens.append(w)
+            offsets.append(i)
+
+    return BM25Query(tokens, offsets)
+
+
+# ---------------------------------------------------------
+# Term x sentence weight matrix (CSR)
+# ---------------------------------------------------------
+
+class BM25Matrix:
+    """
+    Precomputed BM25F weights, one CSR row per term.
+
+    A query is the sum of its term rows, so scoring is a
+    sparse gather + bincount with no per-sentence Python.
+
+    positions (optional) holds the word positions of every
+    CSR entry in the sentence body: entry j owns
+    positions[pos_indptr[j]:pos_indptr[j + 1]] (empty when
+    the term only occurs in the section header).
+    """
+
+    def __init__(
+        self,
+        terms: Dict[str, int],
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        data: np.ndarray,
+        num_sentences: int,
+        pos_indptr: Optional[np.ndarray] = None,
+        positions: Optional[np.ndarray] = None,
+    ):
+        self.terms = terms
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.num_sentences = num_sentences
+        self.pos_indptr = pos_indptr
+        self.positions = positions
+
+    def term_rows(self, tokens: Sequence[str]) -> Dict[str, int]:
+        """
+        Row of each indexed token, one lookup per distinct
+        token (a mapped table binary-searches every lookup).
+        """
+
+        found: Dict[str, int] = {}
+        for t in set(tokens):
+            row = self.terms.get(t)
+            if row is not None:
+                found[t] = row
+        return found
+
+    def rows(self, tokens: Sequence[str]) -> List[int]:
+        return sorted(set(self.term_rows(tokens).values()))
+
+    def score(self, tokens: Sequence[str]) -> np.ndarray:
+        """
+        Dense BM25F score per sentence for the query tokens.
+        """
+
+        rows = self.rows(tokens)
+
+        if not rows:
+            return np.zeros(self.num_sentences, dtype=np.float32)
+
+        indices = np.concatenate([
+            self.indices[self.indptr[r]:self.indptr[r + 1]]
+            for r in rows
+        ])
+        data = np.concatenate([
+            self.data[self.indptr[r]:self.indptr[r + 1]]
+            for r in rows
+        ])
+
+        return np.bincount(
+            indices,
+            weights=data,
+            minlength=self.num_sentences,
+        ).astype(np.float32)
+
+    def score_batch(self, token_lists: Sequence[Sequence[str]]) -> np.ndarray:
+        """
+        Dense (questions x sentences) scores: the query-term
+        matrix times the term x sentence matrix, done as one
+        bincount over (question, sentence) cells.
+        """
+
+        n = self.num_sentences
+        cells: List[np.ndarray] = []
+        weights: List[np.ndarray] = []
+
+        # Same row order as score(), so ties rank identically
+        for q, tokens in enumerate(token_lists):
+            for r in self.rows(tokens):
+                start, end = self.indptr[r], self.indptr[r + 1]
+                cells.append(self.indices[start:end] + q * n)
+                weights.append(self.data[start:end])
+
+        if not cells:
+            return np.zeros((len(token_lists), n), dtype=np.float32)
+
+        return np.bincount(
+            np.concatenate(cells),
+            weights=np.concatenate(weights),
+            minlength=len(token_lists) * n,
+        ).astype(np.float32).reshape(len(token_lists), n)
+
+    def top_k(self, query: BM25Query, k: int) -> List[int]:
+        """
+        Highest scoring sentence ids (score > 0), best first.
+        Ties are broken by document order.
+        """
+
+        return [i for i, _ in self.search(query, k)]
+
+    def search(
+        self,
+        query: BM25Query,
+        k: int,
+        scores: Optional[np.ndarray] = None,
+    ) -> List[Tuple[int, float]]:
+        """
+        BM25F top-k with positional re-ranking, paired with
+        the final scores. `scores` may be passed in when the
+        caller already has them (batch scoring).
+        """
+
+        if scores is None:
+            scores = self.score(query.tokens)
+
+        ids = np.flatnonzero(scores > 0)
+        values = scores[ids]
+
+        # ids are ascending, so position order == document order
+        top = top_k_ids(values, k)
+
+        if len(query.tokens) < 2 or self.positions is None or not top:
+            return [(int(ids[p]), float(values[p])) for p in top]
+
+        pairs = self._query_pairs(query)
+        if not pairs:
+            return [(int(ids[p]), float(values[p])) for p in top]
+
+        # Only sentences holding both terms of some pair can
+        # earn a bonus; everything else keeps its BM25F score
+        pair_entries = self._pair_entries(pairs, ids)
+        paired, bonus_bound = self._pair_bounds(pair_entries, len(ids))
+
+        def boosted(p: int) -> float:
+            if paired[p]:
+                return values[p] + self._proximity(pair_entries, p)
+            return values[p]
+
+        final = {p: boosted(p) for p in top}
+
+        if len(top) == k:
+            # Visit the remaining sentences by best possible
+            # boosted score and stop once it can't beat the
+            # current k-th result
+            kth = [(v, -p) for p, v in final.items()]
+            heapq.heapify(kth)
+
+            potential = (values + bonus_bound) * (1.0 + PRUNE_MARGIN)
+            scan = np.flatnonzero(potential >= kth[0][0])
+            scan = scan[np.argsort(-potential[scan], kind="stable")]
+
+            for p in scan.tolist():
+                if potential[p] < kth[0][0]:
+                    break
+                if p in final:
+                    continue
+
+                final[p] = boosted(p)
+                if (final[p], -p) > kth[0]:
+                    heapq.heapreplace(kth, (final[p], -p))
+
+        ranked = sorted(final.items(), key=lambda x: (-x[1], x[0]))
+        return [(int(ids[p]), float(v)) for p, v in ranked[:k]]
+
+    # -----------------------------------------------------
+    # Positional helpers
+    # -----------------------------------------------------
+
+    def _row_entries(self, row: int, ids: np.ndarray) -> np.ndarray:
+        """
+        CSR entry of a row for each of the given (sorted)
+        sentence ids, -1 where the term does not occur.
+        """
+
+        start, end = int(self.indptr[row]), int(self.indptr[row + 1])
+        row_ids = self.indices[start:end]
+        j = np.minimum(np.searchsorted(row_ids, ids), end - start - 1)
+        return np.where(row_ids[j] == ids, start + j, -1)
+
+    def _query_pairs(self, query: BM25Query) -> List[Tuple[int, int, int]]:
+        """
+        Adjacent, distinct, indexed question terms as
+        (row_a, row_b, word gap).
+        """
+
+        rows = self.term_rows(query.tokens)
+
+        pairs = []
+        for (a, oa), (b, ob) in zip(
+            zip(query.tokens, query.offsets),
+            zip(query.tokens[1:], query.offsets[1:]),
+        ):
+            if a != b and a in rows and b in rows:
+                pairs.append((rows[a], rows[b], ob - oa))
+        return pairs
+
+    def _pair_entries(
+        self,
+        pairs: List[Tuple[int, int, int]],
+        ids: np.ndarray,
+    ) -> List[Tuple[np.ndarray, np.ndarray, int]]:
+        """
+        CSR entries of both terms of every pair for each of
+        the (sorted) sentence ids, -1 where absent.
+        """
+
+        return [
+            (self._row_entries(row_a, ids), self._row_entries(row_b, ids), gap)
+            for row_a, row_b, gap in pairs
+        ]
+
+    def _pair_bounds(
+        self,
+        pair_entries: List[Tuple[np.ndarray, np.ndarray, int]],
+        count: int,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Per sentence: whether it holds both terms of some
+        pair, and an upper bound on its positional bonus.
+        """
+
+        paired = np.zeros(count, dtype=bool)
+        bound = np.zeros(count, dtype=np.float64)
+
+        for ea, eb, _ in pair_entries:
+            both = (ea >= 0) & (eb >= 0)
+            paired |= both
+            bound[both] += MAX_PAIR_BONUS * (
+                self.data[ea[both]].astype(np.float64) + self.data[eb[both]]
+            )
+
+        return paired, bound
+
+    def _entry_positions(self, entry: int) -> List[int]:
+        return self.positions[
+            self.pos_indptr[entry]:self.pos_indptr[entry + 1]
+        ].tolist()
+
+    def _proximity(
+        self,
+        pair_entries: List[Tuple[np.ndarray, np.ndarray, int]],
+        p: int,
+    ) -> float:
+        """
+        Positional bonus of the p-th sentence of the ids the
+        pair entries were built for.
+        """
+
+        bonus = 0.0
+
+        for entries_a, entries_b, gap in pair_entries:
+            ea, eb = int(entries_a[p]), int(entries_b[p])
+            if ea < 0 or eb < 0:
+                continue
+
+            pa = self._entry_positions(ea)
+            pb = self._entry_positions(eb)
+            if not pa or not pb:
+                continue
+
+            weight = float(self.data[ea]) + float(self.data[eb])
+
+            following = set(pb)
+            if any(x + gap in following for x in pa):
+                bonus += PHRASE_BONUS * weight
+            elif min(abs(y - x) for x in pa for y in pb) <= PROXIMITY_WINDOW:
+                bonus += PROXIMITY_BONUS * weight
+
+        return bonus
+
+
+def top_k_ids(scores: np.ndarray, k: int) -> List[int]:
+    positive = int(np.count_nonzero(scores > 0))
+    k = min(k, positive)
+
+    if k <= 0:
+        return []
+
+    if k < len(scores):
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        # Include every id tied with the k-th score, so the
+        # document-order tie break below stays deterministic
+        kth = scores[candidates].min()
+        candidates = np.flatnonzero(scores >= kth)
+    else:
+        candidates = np.arange(len(scores))
+
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order][:k].tolist()
+
+
+# ---------------------------------------------------------
+# Builder
+# ---------------------------------------------------------
+
+def build_bm25_matrix(
+    sentence_words: List[List[str]],
+    sentence_sections: List[int],
+    header_tokens: List[List[str]],
+) -> BM25Matrix:
+    """
+    BM25F over two fields: the sentence body and the header
+    of the section it belongs to (boosted).
+
+    sentence_words are all lowercased word runs of each
+    sentence (stopwords included, so positions line up with
+    question word offsets).
+    """
+
+    num_sentences = len(sentence_words)
+
+    # term -> word positions, per sentence body
+    body_positions: List[Dict[str, List[int]]] = []
+    for words in sentence_words:
+        positions: Dict[str, List[int]] = {}
+        for pos, w in enumerate(words):
+            if w not in STOPWORDS:
+                positions.setdefault(w, []).append(pos)
+        body_positions.append(positions)
+
+    header_counts = [Counter(tokens) for tokens in header_tokens]
+
+    body_lengths = [
+        sum(len(p) for p in positions.values())
+        for positions in body_positions
+    ]
+    header_lengths = [
+        len(header_tokens[sec]) for sec in sentence_sections
+    ]
+
+    avg_body = (sum(body_lengths) / num_sentences) if num_sentences else 0.0
+    avg_header = (sum(header_lengths) / num_sentences) if num_sentences else 0.0
+
+    body_w, body_b = BODY_FIELD
+    header_w, header_b = HEADER_FIELD
+
+    # term -> {sentence_id: pseudo term frequency}
+    pseudo_tf: Dict[str, Dict[int, float]] = {}
+
+    for sid in range(num_sentences):
+        body_norm = 1.0 - body_b + body_b * (
+            body_lengths[sid] / avg_body if avg_body else 0.0
+        )
+        header_norm = 1.0 - header_b + header_b * (
+            header_lengths[sid] / avg_header if avg_header else 0.0
+        )
+
+        for term, positions in body_positions[sid].items():
+            row = pseudo_tf.setdefault(term, {})
+            row[sid] = row.get(sid, 0.0) + body_w * len(positions) / body_norm
+
+        for term, tf in header_counts[sentence_sections[sid]].items():
+            row = pseudo_tf.setdefault(term, {})
+            row[sid] = row.get(sid, 0.0) + header_w * tf / header_norm
+
+    terms: Dict[str, int] = {}
+    indptr = [0]
+    indices: List[int] = []
+    data: List[float] = []
+    pos_indptr = [0]
+    positions_flat: List[int] = []
+
+    for term in sorted(pseudo_tf):
+        row = pseudo_tf[term]
+        df = len(row)
+        idf = math.log(1.0 + (num_sentences - df + 0.5) / (df + 0.5))
+
+        for sid in sorted(row):
+            tf = row[sid]
+            indices.append(sid)
+            data.append(idf * tf * (BM25_K1 + 1.0) / (tf + BM25_K1))
+            positions_flat.extend(body_positions[sid].get(term, ()))
+            pos_indptr.append(len(positions_flat))
+
+        terms[term] = len(terms)
+        indptr.append(len(indices))
+
+    return BM25Matrix(
+        terms=terms,
+        indptr=np.asarray(indptr, dtype=np.int64),
+        indices=np.asarray(indices, dtype=np.int32),
+        data=np.asarray(data, dtype=np.float32),
+        num_sentences=num_sentences,
+        pos_indptr=np.asarray(pos_indptr, dtype=np.int64),
+        positions=np.asarray(positions_flat, dtype=np.int32),
+    )
@@ -1,6 +1,6 @@
 import re
-import pdfplumber
 from app.models.document import Document, Section, ContentLine
+from app.utils.pdf_parser import parse_pdf
 
 COURSE_CODE_PATTERN = re.compile(r"\b[A-Z]{2}\s?[A-Z]{1,2}\d{3}\b")
 
@@ -10,43 +10,42 @@ def build_edue_document(pdf_path: str) -> Document:
     current_section = None
     document_title = None
 
-    with pdfplumber.open(pdf_path) as pdf:
-        for page_index, page in enumerate(pdf.pages, start=1):
-            lines = page.extract_text().splitlines() if page.extract_text() else []
-
-            for line in lines:
-                text = line.strip()
-                if not text:
-                    continue
-
-                # 🔹 Detect course code like AE ZG631
-                if COURSE_CODE_PATTERN.search(text):
-                    if current_section:
-                        current_section.end_page = page_index
-                        sections.append(current_section)
-
-                    current_section = Section(
-                        title=text,
-                        start_page=page_index,
-                        end_page=page_index,
-                        content=[]
-                    )
-
-                    if not document_title:
-                        document_title = text
-
-                else:
-                    if current_section:
-                        current_section.content.append(
-                            ContentLine(
-                                text=text,
-                                page_number=page_index
-                            )
+    # Page text lines come from the shared single-pass parse
+    # (already stripped, blank lines dropped)
+    pages = parse_pdf(pdf_path)
+
+    for record in pages:
+        page_index = record["page"]
+
+        for text in record["lines"]:
+            # 🔹 Detect course code like AE ZG631
+            if COURSE_CODE_PATTERN.search(text):
+                if current_section:
+                    current_section.end_page = page_index
+                    sections.append(current_section)
+
+                current_section = Section(
+                    title=text,
+                    start_page=page_index,
+                    end_page=page_index,
+                    content=[]
+                )
+
+                if not document_title:
+                    document_title = text
+
+            else:
+                if current_section:
+                    current_section.content.append(
+                        ContentLine(
+                            text=text,
+                            page_number=page_index
                         )
+                    )
 
-        if current_section:
-            current_section.end_page = page_index
-            sections.append(current_section)
+    if current_section:
+        current_section.end_page = page_index
+        sections.append(current_section)
 
     return Document(
         title=document_title,
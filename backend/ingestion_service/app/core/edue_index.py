@@ -0,0 +1,187 @@
+import bisect
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+
+from app.core.edue_bm25 import BM25Matrix, bm25_tokenize, build_bm25_matrix
+from app.utils.text_normalizer import iter_sentences, word_terms
+
+
+# Question terms are matched as substrings of sentences.
+# A question term never contains punctuation or whitespace,
+# so any substring hit lies inside one maximal word run.
+# Indexing those runs (word_terms) keeps the lookup exact.
+
+
+# ---------------------------------------------------------
+# Index
+# ---------------------------------------------------------
+
+class EDUEIndex:
+    """
+    Per-document lexical index built once at ingest.
+
+    - sentences: cleaned, noise-filtered sentence table
+    - pages: page number per sentence (may be None)
+    - postings: word run -> sorted sentence ids
+    - sentence_sections / section_titles / section_pages:
+      owning section of each sentence
+    - bm25: BM25F term x sentence matrix
+    """
+
+    def __init__(
+        self,
+        sentences: List[str],
+        pages: List[Optional[int]],
+        postings: Dict[str, List[int]],
+        sentence_sections: List[int],
+        section_titles: List[str],
+        section_pages: List[List[int]],
+        bm25: BM25Matrix,
+        lengths: Optional[Sequence[int]] = None,
+    ):
+        self.sentences = sentences
+        self.pages = pages
+        self.postings = postings
+        self.lengths = (
+            lengths if lengths is not None
+            else [len(s) for s in sentences]
+        )
+        self.sentence_sections = sentence_sections
+        self.section_titles = section_titles
+        self.section_pages = section_pages
+        self.bm25 = bm25
+        self._vocab = None
+
+    def sentence_pages(self, sentence_id: int) -> List[int]:
+        """
+        Pages of the section owning the sentence.
+        """
+
+        return self.section_pages[self.sentence_sections[sentence_id]]
+
+    def __len__(self) -> int:
+        return len(self.sentences)
+
+    def match_term(self, term: str) -> Set[int]:
+        """
+        Sentence ids whose text contains `term` as a substring.
+        """
+
+        return self.match_terms([term])[term]
+
+    def match_terms(self, terms: Iterable[str]) -> Dict[str, Set[int]]:
+        """
+        match_term for many terms in one sweep of the vocabulary.
+        """
+
+        words, blob, starts = self._vocabulary()
+        matched: Dict[str, Set[int]] = {}
+
+        for term in terms:
+            ids: Set[int] = set()
+            pos = blob.find(term)
+
+            while pos != -1:
+                w = bisect.bisect_right(starts, pos) - 1
+                ids.update(self.postings[words[w]])
+                # One hit per word is enough; jump to the next one
+                pos = blob.find(term, starts[w + 1]) if w + 1 < len(words) else -1
+
+            matched[term] = ids
+
+        return matched
+
+    def _vocabulary(self):
+        """
+        All indexed words joined by newlines (never part of a
+        term), so substring lookups run as str.find in C.
+        """
+
+        if self._vocab is None:
+            words = list(self.postings)
+            starts = []
+            offset = 0
+            for w in words:
+                starts.append(offset)
+                offset += len(w) + 1
+            self._vocab = (words, "\n".join(words), starts)
+
+        return self._vocab
+
+    def match_any(self, terms: Iterable[str]) -> Set[int]:
+        matched: Set[int] = set()
+        for ids in self.match_terms(terms).values():
+            matched |= ids
+        return matched
+
+
+# ---------------------------------------------------------
+# Builder
+# ---------------------------------------------------------
+
+def _section_title(section: Dict) -> str:
+    return section.get("header") or section.get("title") or ""
+
+
+def _section_pages(section: Dict) -> List[int]:
+    if section.get("pages"):
+        return list(section["pages"])
+    if section.get("page") is not None:
+        return [section["page"]]
+    return []
+
+
+def build_edue_index(sections: List[Dict]) -> EDUEIndex:
+    """
+    Split, clean and index every section exactly the way
+    query_edue used to do per question.
+    """
+
+    sentences: List[str] = []
+    pages: List[Optional[int]] = []
+    postings: Dict[str, List[int]] = {}
+
+    sentence_words: List[List[str]] = []
+    sentence_sections: List[int] = []
+    section_titles: List[str] = []
+    section_pages: List[List[int]] = []
+    header_tokens: List[List[str]] = []
+
+    for section_id, section in enumerate(sections):
+        header = section.get("header", "")
+        paragraphs = section.get("paragraphs", [])
+        page = section.get("page")
+
+        section_titles.append(_section_title(section))
+        section_pages.append(_section_pages(section))
+        header_tokens.append(bm25_tokenize(section_titles[-1]))
+
+        combined_text = " ".join([header] + paragraphs)
+
+        for s_clean, lowered, noise in iter_sentences(combined_text):
+            if noise:
+                continue
+
+            words = word_terms(lowered)
+
+            sentence_id = len(sentences)
+            sentences.append(s_clean)
+            pages.append(page)
+            sentence_sections.append(section_id)
+            sentence_words.append(words)
+
+            for word in set(words):
+                postings.setdefault(word, []).append(sentence_id)
+
+    bm25 = build_bm25_matrix(
+        sentence_words, sentence_sections, header_tokens
+    )
+
+    return EDUEIndex(
+        sentences,
+        pages,
+        postings,
+        sentence_sections,
+        section_titles,
+        section_pages,
+        bm25,
+    )
@@ -1,14 +1,26 @@
+import heapq
 import re
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.core.course_index import question_course_key
+from app.core.edue_bm25 import parse_bm25_query
+from app.core.edue_index import build_edue_index
 
 
 # ---------------------------------------------------------
 # Configuration
 # ---------------------------------------------------------
 
-MIN_SENTENCE_TOKENS = 8
 MAX_SENTENCES = 3
 
+# Ranking engines selectable per query
+#   edue: substring match, longest sentences first
+#   bm25: BM25F over sentence body + boosted section header
+ENGINES = ("edue", "bm25")
+
+# Questions scored together in one dense block by the batch path
+BM25_BATCH_CHUNK = 32
+
 QUESTION_PREFIXES = (
     "what is",
     "how are",
@@ -17,45 +29,10 @@ QUESTION_PREFIXES = (
     "define",
 )
 
-NOISE_PATTERNS = [
-    r"learning objective",
-    r"https?://",
-    r"www\.",
-]
-
-
-# ---------------------------------------------------------
-# Utility cleaners
-# ---------------------------------------------------------
-
-def _repair_pdf_artifacts(text: str) -> str:
-    """
-    Fix common PDF extraction issues.
-    """
-    text = re.sub(r"-\s+", "", text)          # fix hyphenation
-    text = re.sub(r"\s+", " ", text)          # normalize spaces
-    return text.strip()
-
-
-def _is_noise(sentence: str) -> bool:
-    s = sentence.lower().strip()
-
-    if len(s.split()) < MIN_SENTENCE_TOKENS:
-        return True
-
-    for p in NOISE_PATTERNS:
-        if re.search(p, s):
-            return True
-
-    if s.startswith(("what is", "explain", "define")):
-        return True
+_QUESTION_PUNCTUATION = re.compile(r"[^\w\s]")
 
-    return False
-
-
-def _split_sentences(text: str) -> List[str]:
-    text = _repair_pdf_artifacts(text)
-    return re.split(r"(?<=[.!?])\s+", text)
+# Sentence cleaning / noise filtering lives in
+# app.utils.text_normalizer and runs once, at ingest.
 
 
 # ---------------------------------------------------------
@@ -84,7 +61,7 @@ def _normalize_to_declarative(question: str, answer: str) -> str:
 # Core EDUE Query Engine
 # ---------------------------------------------------------
 
-def query_edue(document: Dict, question: str) -> Dict:
+def query_edue(document: Dict, question: str, engine: str = "edue") -> Dict:
     """
     Enterprise Document Understanding Engine (EDUE)
 
@@ -94,80 +71,260 @@ def query_edue(document: Dict, question: str) -> Dict:
     - No LLMs
     """
 
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown EDUE engine: {engine}")
+
     if not document or "sections" not in document:
         return _empty_response(question)
 
-    candidate_sentences: List[Tuple[str, int]] = []
+    course_response = _course_response(document, question)
+    if course_response:
+        return course_response
 
-    question_terms = set(
-        re.sub(r"[^\w\s]", "", question.lower()).split()
-    )
+    index = _get_index(document)
+
+    if engine == "bm25":
+        return _query_bm25(index, question)
+
+    question_terms = _question_terms(question)
 
     # -----------------------------------------------------
-    # Section scanning
+    # Postings lookup
     # -----------------------------------------------------
 
-    for section in document["sections"]:
-        header = section.get("header", "")
-        paragraphs = section.get("paragraphs", [])
-        page = section.get("page")
+    candidate_ids = index.match_any(question_terms)
+
+    return _rank_longest(index, question, candidate_ids)
+
+
+def query_edue_batch(
+    document: Dict,
+    questions: List[str],
+    engine: str = "edue",
+) -> List[Dict]:
+    """
+    Answers many questions against one document in one sweep.
+
+    Results are identical to calling query_edue per question
+    and come back in question order.
+    """
+
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown EDUE engine: {engine}")
+
+    if not document or "sections" not in document:
+        return [_empty_response(q) for q in questions]
+
+    # Course-code / course-title questions resolve by lookup
+    results: List[Optional[Dict]] = [
+        _course_response(document, q) for q in questions
+    ]
+    pending = [i for i, r in enumerate(results) if r is None]
+    pending_questions = [questions[i] for i in pending]
+
+    index = _get_index(document)
+
+    if engine == "bm25":
+        answers = _query_bm25_batch(index, pending_questions)
+    else:
+        # One vocabulary sweep for the union of all question terms
+        terms_per_question = [_question_terms(q) for q in pending_questions]
+        matches = index.match_terms(set().union(*terms_per_question))
+
+        answers = []
+        for question, terms in zip(pending_questions, terms_per_question):
+            candidate_ids = set()
+            for t in terms:
+                candidate_ids |= matches[t]
+            answers.append(_rank_longest(index, question, candidate_ids))
+
+    for i, answer in zip(pending, answers):
+        results[i] = answer
 
-        combined_text = " ".join([header] + paragraphs)
-        combined_text = _repair_pdf_artifacts(combined_text)
+    return results
 
-        sentences = _split_sentences(combined_text)
 
-        for s in sentences:
-            s_clean = s.strip()
+def query_key(question: str, engine: str = "edue") -> Tuple:
+    """
+    Everything query_edue reads from a question: questions
+    with equal keys get the same answer from any document
+    (up to the echoed "question").
+
+    - the declarative phrasing, subject verbatim
+    - course code candidates and title tokens
+    - edue: the substring terms (stopwords count);
+      bm25: query tokens and the word gaps between them
+    """
 
-            if _is_noise(s_clean):
-                continue
+    if engine == "bm25":
+        query = parse_bm25_query(question)
+        terms = (
+            tuple(query.tokens),
+            tuple(b - a for a, b in zip(query.offsets, query.offsets[1:])),
+        )
+    else:
+        terms = tuple(sorted(_question_terms(question)))
+
+    return (
+        _normalize_to_declarative(question, ""),
+        question_course_key(question),
+        terms,
+    )
 
-            score = sum(
-                1 for t in question_terms
-                if t in s_clean.lower()
-            )
 
-            if score > 0:
-                candidate_sentences.append((s_clean, page))
+def _question_terms(question: str) -> Set[str]:
+    return set(
+        _QUESTION_PUNCTUATION.sub("", question.lower()).split()
+    )
+
 
+def _rank_longest(index, question: str, candidate_ids: Set[int]) -> Dict:
     # -----------------------------------------------------
     # No signal case
     # -----------------------------------------------------
 
-    if not candidate_sentences:
+    if not candidate_ids:
         return _empty_response(question)
 
     # -----------------------------------------------------
-    # Rank & select
+    # Rank & select (longest first, document order on ties)
     # -----------------------------------------------------
 
-    candidate_sentences.sort(
-        key=lambda x: len(x[0]),
-        reverse=True
+    selected_ids = heapq.nsmallest(
+        MAX_SENTENCES,
+        candidate_ids,
+        key=lambda i: (-index.lengths[i], i)
     )
 
-    selected = candidate_sentences[:MAX_SENTENCES]
+    pages = sorted({
+        index.pages[i] for i in selected_ids
+        if index.pages[i] is not None
+    })
 
-    answer_text = " ".join(s for s, _ in selected)
-    pages = sorted(
-        {p for _, p in selected if p is not None}
+    return _build_response(
+        question,
+        [index.sentences[i] for i in selected_ids],
+        pages,
     )
 
+
+def _course_response(document: Dict, question: str) -> Optional[Dict]:
+    """
+    Structured answer when the question names a catalog
+    course by code (hash lookup) or by its exact title.
+    """
+
+    courses = document.get("courses")
+    if not courses:
+        return None
+
+    matches = courses.resolve(question)
+    if not matches:
+        return None
+
+    answer = " ".join(_describe_course(c) for c in matches)
+    pages = sorted({
+        c["page"] for c in matches if c.get("page") is not None
+    })
+
+    return {
+        "engine": "edue-course",
+        "question": question,
+        "result": {
+            "answer": answer,
+            "confidence": 0.9 if pages else 0.6,
+            "pages": pages,
+        },
+        "courses": matches,
+    }
+
+
+def _describe_course(course: Dict) -> str:
+    head = f"{course['course_code']} {course['title']}"
+    if course.get("credits") is not None:
+        head += f" ({course['credits']} credits)"
+
+    description = course.get("description", "")
+    return f"{head}: {description}" if description else f"{head}."
+
+
+def _get_index(document: Dict):
+    index = document.get("index")
+
+    if index is None:
+        # Documents ingested before indexing existed
+        index = build_edue_index(document["sections"])
+
+    return index
+
+
+def _query_bm25(index, question: str) -> Dict:
+    """
+    BM25F ranking over the precomputed term x sentence matrix.
+    """
+
+    selected_ids = index.bm25.top_k(
+        parse_bm25_query(question), MAX_SENTENCES
+    )
+
+    return _bm25_response(index, question, selected_ids)
+
+
+def _query_bm25_batch(index, questions: List[str]) -> List[Dict]:
+    results = []
+
+    for start in range(0, len(questions), BM25_BATCH_CHUNK):
+        chunk = questions[start:start + BM25_BATCH_CHUNK]
+        queries = [parse_bm25_query(q) for q in chunk]
+        scores = index.bm25.score_batch([q.tokens for q in queries])
+
+        for question, query, row in zip(chunk, queries, scores):
+            selected_ids = [
+                i for i, _ in index.bm25.search(query, MAX_SENTENCES, scores=row)
+            ]
+            results.append(_bm25_response(index, question, selected_ids))
+
+    return results
+
+
+def _bm25_response(index, question: str, selected_ids: List[int]) -> Dict:
+    if not selected_ids:
+        return _empty_response(question, engine="edue-bm25")
+
+    pages = sorted({
+        p for i in selected_ids for p in index.sentence_pages(i)
+    })
+
+    return _build_response(
+        question,
+        [index.sentences[i] for i in selected_ids],
+        pages,
+        engine="edue-bm25",
+    )
+
+
+def _build_response(
+    question: str,
+    sentences: List[str],
+    pages: List[int],
+    engine: str = "edue",
+) -> Dict:
+    answer_text = " ".join(sentences)
+
     answer_text = _normalize_to_declarative(
         question, answer_text
     )
 
     confidence = min(
         0.9,
-        0.4 + 0.2 * len(selected)
+        0.4 + 0.2 * len(sentences)
     )
 
     if not pages:
         confidence = min(confidence, 0.6)
 
     return {
-        "engine": "edue",
+        "engine": engine,
         "question": question,
         "result": {
             "answer": answer_text.strip(),
@@ -181,9 +338,9 @@ def query_edue(document: Dict, question: str) -> Dict:
 # Empty response
 # ---------------------------------------------------------
 
-def _empty_response(question: str) -> Dict:
+def _empty_response(question: str, engine: str = "edue") -> Dict:
     return {
-        "engine": "edue",
+        "engine": engine,
         "question": question,
         "result": {
             "answer": "Information is not available.",
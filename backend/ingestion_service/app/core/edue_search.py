@@ -0,0 +1,129 @@
+import heapq
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Sequence, Tuple
+
+from app.core.edue_bm25 import BM25Query, parse_bm25_query
+from app.core.edue_query import _get_index
+
+
+# ---------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------
+
+DEFAULT_TOP_K = 5
+MAX_TOP_K = 50
+
+# Scatter fan-out; below the threshold the call is serial
+SEARCH_WORKERS = min(8, os.cpu_count() or 1)
+MIN_DOCUMENTS_PER_SHARD = 16
+
+_executor = ThreadPoolExecutor(
+    max_workers=SEARCH_WORKERS,
+    thread_name_prefix="edue-search",
+)
+
+# (score, -document_order, -sentence_id): heap order == rank order
+_Hit = Tuple[float, int, int]
+
+
+# ---------------------------------------------------------
+# Scatter: per-shard bounded top-k
+# ---------------------------------------------------------
+
+def _search_shard(
+    shard: Sequence[Tuple[int, Dict]],
+    query: BM25Query,
+    top_k: int,
+) -> List[_Hit]:
+    heap: List[_Hit] = []
+
+    for order, document in shard:
+        index = _get_index(document)
+
+        # Skip documents that share no term with the question
+        if not any(t in index.bm25.terms for t in query.tokens):
+            continue
+
+        for sentence_id, score in index.bm25.search(query, top_k):
+            hit = (score, -order, -sentence_id)
+
+            if len(heap) < top_k:
+                heapq.heappush(heap, hit)
+            elif hit > heap[0]:
+                heapq.heapreplace(heap, hit)
+            else:
+                # Per-document hits arrive best first
+                break
+
+    return heap
+
+
+# ---------------------------------------------------------
+# Gather: global merge
+# ---------------------------------------------------------
+
+def search_edue(
+    documents: List[Dict],
+    question: str,
+    top_k: int = DEFAULT_TOP_K,
+) -> Dict:
+    """
+    BM25F search across many EDUE documents.
+
+    Documents are split into shards scored in parallel;
+    each shard keeps a bounded heap and the shards are
+    merged into one global top-k.
+    """
+
+    top_k = max(1, min(top_k, MAX_TOP_K))
+    query = parse_bm25_query(question)
+
+    indexed = [
+        (order, doc)
+        for order, doc in enumerate(documents)
+        if doc and "sections" in doc
+    ]
+
+    hits: List[_Hit] = []
+
+    if query.tokens and indexed:
+        shard_count = min(
+            SEARCH_WORKERS,
+            max(1, len(indexed) // MIN_DOCUMENTS_PER_SHARD),
+        )
+
+        if shard_count == 1:
+            hits = _search_shard(indexed, query, top_k)
+        else:
+            shards = [indexed[i::shard_count] for i in range(shard_count)]
+            futures = [
+                _executor.submit(_search_shard, shard, query, top_k)
+                for shard in shards
+            ]
+            for f in futures:
+                hits.extend(f.result())
+
+    ranked = heapq.nlargest(top_k, hits)
+
+    results = []
+    for score, neg_order, neg_sentence_id in ranked:
+        document = documents[-neg_order]
+        index = _get_index(document)
+        sentence_id = -neg_sentence_id
+
+        results.append({
+            "document_id": document.get("document_id"),
+            "filename": document.get("filename"),
+            "section": index.section_titles[index.sentence_sections[sentence_id]],
+            "sentence": index.sentences[sentence_id],
+            "score": round(score, 4),
+            "pages": index.sentence_pages(sentence_id),
+        })
+
+    return {
+        "engine": "edue-bm25",
+        "question": question,
+        "documents_searched": len(indexed),
+        "results": results,
+    }
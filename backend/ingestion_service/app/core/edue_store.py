@@ -1,11 +1,28 @@
 import json
+import mmap
+import os
+import struct
+import threading
 import uuid
+from array import array
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
 from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
 from app.models.document import Document
+from app.core.edue_bm25 import BM25Matrix
+from app.core.edue_index import EDUEIndex
+from app.core.course_index import CourseIndex
 
 EDUE_DATA_DIR = Path("data")
 EDUE_DATA_DIR.mkdir(exist_ok=True)
 
+# Documents kept mapped by EDUEDocumentStore (LRU)
+EDUE_STORE_MAX_OPEN = 256
+
 
 def save_edue_document(document: Document) -> str:
     document_id = str(uuid.uuid4())
@@ -15,3 +32,612 @@ def save_edue_document(document: Document) -> str:
         json.dump(document.model_dump(), f, indent=2)
 
     return document_id
+
+
+# ============================================================
+# BINARY DOCUMENT FORMAT (.edue)
+# ============================================================
+#
+#   magic "EDUE" | version u32 | header length u32 | header JSON
+#   followed by 8-byte aligned blocks listed in the header.
+#
+# All strings live in one UTF-8 "arena" block; every string
+# table is a uint64 offset array into it. Integer / float
+# blocks are read with np.frombuffer straight off the mmap,
+# so opening a document costs one header parse.
+#
+# Term tables (postings, BM25 rows) are sorted, so a lookup
+# is a binary search over the arena rather than a decode of
+# every term.
+
+EDUE_BINARY_SUFFIX = ".edue"
+EDUE_BINARY_MAGIC = b"EDUE"
+EDUE_BINARY_VERSION = 1
+
+_PREAMBLE = struct.Struct("<4sII")
+_ALIGN = 8
+
+
+class _ArenaBuilder:
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.size = 0
+
+    def add_table(self, strings) -> np.ndarray:
+        offsets = [self.size]
+        for s in strings:
+            data = s.encode("utf-8")
+            self.chunks.append(data)
+            self.size += len(data)
+            offsets.append(self.size)
+        return np.asarray(offsets, dtype=np.uint64)
+
+
+def _ragged(rows) -> Tuple[np.ndarray, np.ndarray]:
+    indptr = [0]
+    values: List[int] = []
+    for row in rows:
+        values.extend(row)
+        indptr.append(len(values))
+    return (
+        np.asarray(indptr, dtype=np.int64),
+        np.asarray(values, dtype=np.int32),
+    )
+
+
+def write_edue_binary(path: Path, document: Dict) -> None:
+    """
+    Serialize an indexed EDUE document to `path` atomically.
+    """
+
+    index: EDUEIndex = document["index"]
+    sections = document["sections"]
+    arena = _ArenaBuilder()
+
+    postings_terms = sorted(index.postings)
+    bm25_terms = sorted(index.bm25.terms, key=index.bm25.terms.get)
+
+    # build_bm25_matrix assigns rows in term order
+    if bm25_terms != sorted(bm25_terms):
+        raise ValueError("BM25 rows are not in term order")
+
+    section_page_indptr, section_page_values = _ragged(
+        s.get("pages", []) for s in sections
+    )
+    paragraph_indptr, _ = _ragged(
+        range(len(s.get("paragraphs", []))) for s in sections
+    )
+    postings_indptr, postings_ids = _ragged(
+        index.postings[t] for t in postings_terms
+    )
+    index_page_indptr, index_page_values = _ragged(index.section_pages)
+
+    blocks = {
+        "sentences": arena.add_table(index.sentences),
+        "section_titles": arena.add_table(index.section_titles),
+        "paragraphs": arena.add_table(
+            p for s in sections for p in s.get("paragraphs", [])
+        ),
+        "raw_section_titles": arena.add_table(
+            s.get("title", "") for s in sections
+        ),
+        "postings_terms": arena.add_table(postings_terms),
+        "bm25_terms": arena.add_table(bm25_terms),
+        "sentence_lengths": np.asarray(index.lengths, dtype=np.int32),
+        "sentence_pages": np.asarray(
+            [-1 if p is None else p for p in index.pages], dtype=np.int32
+        ),
+        "sentence_sections": np.asarray(
+            index.sentence_sections, dtype=np.int32
+        ),
+        "index_section_page_indptr": index_page_indptr,
+        "index_section_page_values": index_page_values,
+        "section_page_indptr": section_page_indptr,
+        "section_page_values": section_page_values,
+        "paragraph_indptr": paragraph_indptr,
+        "postings_indptr": postings_indptr,
+        "postings_ids": postings_ids,
+        "bm25_indptr": np.asarray(index.bm25.indptr, dtype=np.int64),
+        "bm25_indices": np.asarray(index.bm25.indices, dtype=np.int32),
+        "bm25_data": np.asarray(index.bm25.data, dtype=np.float32),
+    }
+
+    if document.get("courses"):
+        blocks["courses_json"] = np.frombuffer(
+            json.dumps(document["courses"].courses).encode("utf-8"),
+            dtype=np.uint8,
+        )
+
+    if index.bm25.positions is not None:
+        blocks["bm25_pos_indptr"] = np.asarray(
+            index.bm25.pos_indptr, dtype=np.int64
+        )
+        blocks["bm25_positions"] = np.asarray(
+            index.bm25.positions, dtype=np.int32
+        )
+
+    payloads = [("arena", "u1", b"".join(arena.chunks))]
+    payloads += [
+        (name, arr.dtype.str, arr.tobytes())
+        for name, arr in blocks.items()
+    ]
+
+    # Offsets are relative to the end of the header
+    table = {}
+    cursor = 0
+    for name, dtype, data in payloads:
+        table[name] = [cursor, len(data), dtype]
+        cursor += len(data) + (-len(data) % _ALIGN)
+
+    header = json.dumps({
+        "document_id": document.get("document_id"),
+        "filename": document.get("filename"),
+        "num_sentences": len(index.sentences),
+        "num_sections": len(sections),
+        "blocks": table,
+    }).encode("utf-8")
+    header += b" " * (-(len(header) + _PREAMBLE.size) % _ALIGN)
+
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+
+    with open(tmp_path, "wb") as f:
+        f.write(_PREAMBLE.pack(
+            EDUE_BINARY_MAGIC, EDUE_BINARY_VERSION, len(header)
+        ))
+        f.write(header)
+        for _, _, data in payloads:
+            f.write(data)
+            f.write(b"\0" * (-len(data) % _ALIGN))
+
+    os.replace(tmp_path, path)
+
+
+# ------------------------------------------------------------
+# Lazy views over the mapped file
+# ------------------------------------------------------------
+
+class _ArenaStrings(Sequence):
+    def __init__(self, arena, offsets: np.ndarray):
+        self._arena = arena
+        self._offsets = offsets
+        # Indexing a memoryview yields ints without the cost
+        # of numpy scalars (binary searches index it a lot)
+        self._bounds = memoryview(offsets)
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        return self.raw(i).decode("utf-8")
+
+    def raw(self, i: int) -> bytes:
+        return bytes(self._arena[self._bounds[i]:self._bounds[i + 1]])
+
+
+class _RaggedInts(Sequence):
+    def __init__(self, indptr: np.ndarray, values: np.ndarray):
+        self._indptr = indptr
+        self._values = values
+
+    def __len__(self) -> int:
+        return len(self._indptr) - 1
+
+    def __getitem__(self, i) -> List[int]:
+        return self._values[self._indptr[i]:self._indptr[i + 1]].tolist()
+
+
+class _OptionalInts(Sequence):
+    """
+    int32 array where -1 means None.
+    """
+
+    def __init__(self, values: np.ndarray):
+        self._values = values
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __getitem__(self, i) -> Optional[int]:
+        v = int(self._values[i])
+        return None if v < 0 else v
+
+
+class _TermTable(Mapping):
+    """
+    term -> row over a sorted term table (row == position).
+    Lookups binary-search the UTF-8 bytes, whose order is the
+    same as str order, so no term is decoded.
+    """
+
+    def __init__(self, terms: _ArenaStrings):
+        self._terms = terms
+
+    def _find(self, term) -> int:
+        if not isinstance(term, str):
+            return -1
+
+        key = term.encode("utf-8")
+        lo, hi = 0, len(self._terms)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._terms.raw(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        if lo < len(self._terms) and self._terms.raw(lo) == key:
+            return lo
+        return -1
+
+    def __getitem__(self, term: str) -> int:
+        row = self._find(term)
+        if row < 0:
+            raise KeyError(term)
+        return row
+
+    def __contains__(self, term) -> bool:
+        return self._find(term) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        return (self._terms[i] for i in range(len(self._terms)))
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+
+class _Postings(Mapping):
+    def __init__(self, terms: _TermTable, rows: _RaggedInts):
+        self._terms = terms
+        self._rows = rows
+
+    def __getitem__(self, term: str) -> List[int]:
+        return self._rows[self._terms[term]]
+
+    def __contains__(self, term) -> bool:
+        return term in self._terms
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._terms)
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+
+class _Sections(Sequence):
+    """
+    Section dicts rebuilt on access ({title, paragraphs, pages}).
+    """
+
+    def __init__(self, titles, paragraphs, paragraph_indptr, pages):
+        self._titles = titles
+        self._paragraphs = paragraphs
+        self._paragraph_indptr = paragraph_indptr
+        self._pages = pages
+
+    def __len__(self) -> int:
+        return len(self._titles)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        start = int(self._paragraph_indptr[i])
+        end = int(self._paragraph_indptr[i + 1])
+        return {
+            "title": self._titles[i],
+            "paragraphs": [self._paragraphs[j] for j in range(start, end)],
+            "pages": self._pages[i],
+        }
+
+
+def open_edue_binary(path: Path) -> Dict:
+    """
+    Memory-map a .edue file and return an EDUE document dict
+    whose sections and index read lazily from the mapping.
+    """
+
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, header_len = _PREAMBLE.unpack_from(mapped, 0)
+
+    if magic != EDUE_BINARY_MAGIC or version != EDUE_BINARY_VERSION:
+        mapped.close()
+        raise ValueError(f"Unsupported EDUE file: {path}")
+
+    header_end = _PREAMBLE.size + header_len
+    header = json.loads(bytes(mapped[_PREAMBLE.size:header_end]))
+
+    def block(name: str) -> np.ndarray:
+        offset, length, dtype = header["blocks"][name]
+        dt = np.dtype(dtype)
+        return np.frombuffer(
+            mapped,
+            dtype=dt,
+            count=length // dt.itemsize,
+            offset=header_end + offset,
+        )
+
+    def optional_block(name: str) -> Optional[np.ndarray]:
+        return block(name) if name in header["blocks"] else None
+
+    arena = memoryview(block("arena"))
+
+    def strings(name: str) -> _ArenaStrings:
+        return _ArenaStrings(arena, block(name))
+
+    sentences = strings("sentences")
+    postings_terms = _TermTable(strings("postings_terms"))
+
+    bm25 = BM25Matrix(
+        terms=_TermTable(strings("bm25_terms")),
+        indptr=block("bm25_indptr"),
+        indices=block("bm25_indices"),
+        data=block("bm25_data"),
+        num_sentences=header["num_sentences"],
+        pos_indptr=optional_block("bm25_pos_indptr"),
+        positions=optional_block("bm25_positions"),
+    )
+
+    index = EDUEIndex(
+        sentences=sentences,
+        pages=_OptionalInts(block("sentence_pages")),
+        postings=_Postings(
+            postings_terms,
+            _RaggedInts(block("postings_indptr"), block("postings_ids")),
+        ),
+        sentence_sections=block("sentence_sections"),
+        section_titles=strings("section_titles"),
+        section_pages=_RaggedInts(
+            block("index_section_page_indptr"),
+            block("index_section_page_values"),
+        ),
+        bm25=bm25,
+        lengths=block("sentence_lengths"),
+    )
+
+    sections = _Sections(
+        titles=strings("raw_section_titles"),
+        paragraphs=strings("paragraphs"),
+        paragraph_indptr=block("paragraph_indptr"),
+        pages=_RaggedInts(
+            block("section_page_indptr"),
+            block("section_page_values"),
+        ),
+    )
+
+    courses = optional_block("courses_json")
+
+    return {
+        "document_id": header["document_id"],
+        "filename": header["filename"],
+        "sections": sections,
+        "index": index,
+        "courses": (
+            CourseIndex(json.loads(courses.tobytes()))
+            if courses is not None else None
+        ),
+    }
+
+
+def read_edue_terms(path: Path) -> List[str]:
+    """
+    BM25 terms of a .edue file, read without mapping the
+    document.
+    """
+
+    with open(path, "rb") as f:
+        magic, version, header_len = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+
+        if magic != EDUE_BINARY_MAGIC or version != EDUE_BINARY_VERSION:
+            raise ValueError(f"Unsupported EDUE file: {path}")
+
+        header_end = _PREAMBLE.size + header_len
+        blocks = json.loads(f.read(header_len))["blocks"]
+
+        offset, length, dtype = blocks["bm25_terms"]
+        f.seek(header_end + offset)
+        offsets = np.frombuffer(f.read(length), dtype=dtype).tolist()
+
+        # One table is one contiguous run of the arena
+        f.seek(header_end + blocks["arena"][0] + offsets[0])
+        data = f.read(offsets[-1] - offsets[0])
+
+    bounds = [o - offsets[0] for o in offsets]
+    return [
+        data[start:end].decode("utf-8")
+        for start, end in zip(bounds, bounds[1:])
+    ]
+
+
+# ============================================================
+# PERSISTENT DOCUMENT STORE
+# ============================================================
+
+class EDUEDocumentStore:
+    """
+    Dict-like EDUE document store backed by .edue files.
+
+    Startup only lists the directory; a document is mapped
+    the first time it is read. Files written since by other
+    processes (bulk_ingest, other API workers) are picked up
+    when an id misses and whenever all ids are listed. Written documents are not kept
+    in memory (they are mapped back when read), and at most
+    max_open documents stay mapped, least recently used first
+    out, so a long bulk ingest doesn't grow with every PDF.
+
+    with_terms() narrows a search to the documents holding a
+    query term, from a corpus-wide term -> documents index
+    (filled as documents are written, and from the files of
+    the others on first use), so a search maps only those.
+    """
+
+    def __init__(
+        self,
+        data_dir: Path = EDUE_DATA_DIR,
+        max_open: int = EDUE_STORE_MAX_OPEN,
+    ):
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.max_open = max_open
+        self._lock = threading.Lock()
+        self._loaded: "OrderedDict[str, Dict]" = OrderedDict()
+        self._paths: Dict[str, Path] = {}
+
+        # Corpus term index: term -> ordinals (registration
+        # order) of the documents holding it. Under _terms_lock,
+        # which is taken before _lock, never after.
+        self._terms_lock = threading.Lock()
+        self._ordinals: Dict[str, int] = {}
+        self._ids: List[str] = []
+        self._term_documents: Dict[str, array] = {}
+        self._unindexed: List[str] = []
+
+        for p in self.data_dir.glob(f"*{EDUE_BINARY_SUFFIX}"):
+            self._register(p.stem, p)
+
+    def _register(self, document_id: str, path: Path, pending: bool = True) -> None:
+        # Under _lock (or in __init__)
+        self._paths[document_id] = path
+        if document_id not in self._ordinals:
+            self._ordinals[document_id] = len(self._ids)
+            self._ids.append(document_id)
+            if pending:
+                self._unindexed.append(document_id)
+
+    def _index_terms(self, document_id: str, terms: Iterable[str]) -> None:
+        # Under _terms_lock
+        ordinal = self._ordinals[document_id]
+        for term in terms:
+            self._term_documents.setdefault(term, array("i")).append(ordinal)
+
+    def _discover(self, document_id: str) -> bool:
+        """
+        Register <document_id>.edue if it was written after the
+        directory was listed.
+        """
+
+        # Ids come from requests: only plain file names
+        if (
+            not isinstance(document_id, str)
+            or not document_id
+            or document_id.startswith(".")
+            or os.path.basename(document_id) != document_id
+        ):
+            return False
+
+        path = self.data_dir / f"{document_id}{EDUE_BINARY_SUFFIX}"
+        if not path.is_file():
+            return False
+
+        with self._lock:
+            self._register(document_id, path)
+        return True
+
+    def _scan(self) -> None:
+        paths = list(self.data_dir.glob(f"*{EDUE_BINARY_SUFFIX}"))
+
+        with self._lock:
+            for p in paths:
+                if p.stem not in self._paths:
+                    self._register(p.stem, p)
+
+    def __contains__(self, document_id: str) -> bool:
+        return document_id in self._paths or self._discover(document_id)
+
+    def __len__(self) -> int:
+        self._scan()
+        return len(self._paths)
+
+    def keys(self) -> List[str]:
+        self._scan()
+        return list(self._paths)
+
+    def __getitem__(self, document_id: str) -> Dict:
+        if document_id not in self:
+            raise KeyError(document_id)
+
+        with self._lock:
+            document = self._loaded.get(document_id)
+            if document is not None:
+                self._loaded.move_to_end(document_id)
+                return document
+
+            path = self._paths[document_id]
+
+        # Mapping reads the header only; done outside the lock
+        document = open_edue_binary(path)
+
+        with self._lock:
+            self._loaded[document_id] = document
+            self._loaded.move_to_end(document_id)
+            while len(self._loaded) > self.max_open:
+                # Views into a dropped mapping keep it alive
+                # until the last one goes away
+                self._loaded.popitem(last=False)
+        return document
+
+    def get(self, document_id: str, default=None):
+        if document_id not in self:
+            return default
+        return self[document_id]
+
+    def __setitem__(self, document_id: str, document: Dict) -> None:
+        path = self.data_dir / f"{document_id}{EDUE_BINARY_SUFFIX}"
+        write_edue_binary(path, document)
+
+        with self._lock:
+            self._register(document_id, path, pending=False)
+            # A mapping of the previous file is stale now
+            self._loaded.pop(document_id, None)
+
+        # A rewrite adds its terms again: a superset is fine,
+        # with_terms only uses the index to skip documents
+        with self._terms_lock:
+            self._index_terms(document_id, document["index"].bm25.terms)
+
+    def values(self) -> List[Dict]:
+        return [self[d] for d in self.keys()]
+
+    def with_terms(
+        self,
+        terms: Iterable[str],
+        document_ids: Optional[List[str]] = None,
+    ) -> List[str]:
+        """
+        Ids of the documents (all, or those of document_ids, in
+        that order) holding at least one of the terms.
+        """
+
+        if document_ids is None:
+            self._scan()
+        else:
+            for d in document_ids:
+                if d not in self._paths:
+                    self._discover(d)
+
+        with self._terms_lock:
+            with self._lock:
+                pending, self._unindexed = self._unindexed, []
+                paths = [self._paths[d] for d in pending]
+
+            for document_id, path in zip(pending, paths):
+                try:
+                    self._index_terms(document_id, read_edue_terms(path))
+                except FileNotFoundError:
+                    pass
+
+            ordinals = set()
+            for term in set(terms):
+                ordinals.update(self._term_documents.get(term, ()))
+
+        with self._lock:
+            if document_ids is None:
+                return [self._ids[o] for o in sorted(ordinals)]
+            return [
+                d for d in document_ids
+                if d in self._ordinals and self._ordinals[d] in ordinals
+            ]
@@ -1,4 +1,18 @@
 QDRANT_CONFIG = {
     "host": "localhost",
     "port": 6333,
+    "grpc_port": 6334,
+    # gRPC for point traffic (binary vectors, lower per-call
+    # overhead); collection management works over either
+    "prefer_grpc": False,
+    # Seconds per request
+    "timeout": 10,
+    # Keep-alive HTTP connections / gRPC channels per client
+    "pool_size": 16,
+    # Retries of transient failures (connection errors, timeouts,
+    # 429/502/503/504), backing off retry_backoff * 2**attempt s
+    "retries": 2,
+    "retry_backoff": 0.2,
+    # Skip the server version probe when a client is created
+    "check_compatibility": False,
 }
@@ -0,0 +1,439 @@
+# app/core/vector_index.py
+
+import json
+import mmap
+import os
+import struct
+import threading
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.utils.file_lock import exclusive_lock
+
+
+# ============================================================
+# Embedded vector index (single node / offline)
+# ============================================================
+#
+# Drop-in for the Qdrant collection behind search_vectors:
+# exact cosine top-k over an in-process float32 matrix.
+#
+#   vectors[.N].f32    header | float32[dim] per row (unit length)
+#   payloads[.N].jsonl {"id": ..., "payload": {...}} per row
+#   CURRENT            generation N in use (absent: 0, no suffix)
+#
+# Both files are append-only. Rows count only once both halves
+# are on disk (a crash mid-write leaves a tail that's ignored,
+# then cut off before the next append). The matrix is memory-
+# mapped; payload lines are read back only for the hits.
+#
+# Any number of processes may write (the API ingest queue,
+# bulk_ingest): writers hold an exclusive lock on write.lock
+# from refresh through append, so the tail they cut off can
+# only be a crashed write. Readers take no lock.
+#
+# Searching is one matrix-vector product and an argpartition.
+# Payload filters use per-field postings (value -> rows, built
+# on load and on upsert for FILTER_FIELDS): the rows of each
+# condition are intersected and only those rows are scored.
+# Filters on other fields fall back to scanning payloads.
+#
+# Upserting an existing id appends a new row and hides the old
+# one. Once hidden rows pass VECTOR_INDEX_COMPACT_RATIO of the
+# index, the live rows are rewritten as generation N + 1 and
+# CURRENT is switched to it; readers reload when they see the
+# new generation. The previous generation is kept (a reader may
+# still be opening it) and removed by the next compaction.
+
+VECTOR_INDEX_DIR = Path("data") / "vector_index"
+
+# Compact once superseded rows are this share of all rows (and
+# at least VECTOR_INDEX_COMPACT_MIN_ROWS)
+VECTOR_INDEX_COMPACT_RATIO = 0.5
+VECTOR_INDEX_COMPACT_MIN_ROWS = 1024
+
+# Payload fields with postings (see ingest_service.document_chunks)
+FILTER_FIELDS = ("document_id", "filename", "section", "source", "page", "pages")
+
+_HEADER = struct.Struct("<4sIII")
+_MAGIC = b"VIDX"
+_VERSION = 1
+
+
+def _values(value: Any) -> List[Any]:
+    # Qdrant matches a list payload on any of its elements
+    return value if isinstance(value, list) else [value]
+
+
+class NumpyVectorIndex:
+    """
+    Exact cosine search over a memory-mapped float32 matrix.
+
+    - upsert(points): objects with .id, .vector, .payload
+      (e.g. qdrant_client PointStruct)
+    - search(): same normalized {"id", "score", "payload"}
+      dicts as qdrant_utils.search_vectors
+    - thread-safe; picks up rows appended (or a compaction
+      done) by another process
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.current_path = self.root / "CURRENT"
+        self.lock_path = self.root / "write.lock"
+
+        self._lock = threading.Lock()
+        self.compactions = 0
+        self._reset(0)
+
+    def _reset(self, generation: int) -> None:
+        suffix = f".{generation}" if generation else ""
+        self.generation = generation
+        self.vectors_path = self.root / f"vectors{suffix}.f32"
+        self.payloads_path = self.root / f"payloads{suffix}.jsonl"
+
+        self.dim: Optional[int] = None
+        self.count = 0
+        self._ids: List[Any] = []
+        self._rows: Dict[Any, int] = {}                 # id -> live row
+        self._offsets = array("q")                      # payload line starts
+        self._live = np.zeros(0, dtype=bool)
+        self._postings: Dict[str, Dict[Any, array]] = {f: {} for f in FILTER_FIELDS}
+        self._payload_end = 0                           # bytes of payloads indexed
+
+        self._matrix: Optional[np.ndarray] = None
+        self._payload_map: Optional[mmap.mmap] = None
+
+    # ---------------------------------------------------------------
+    # Loading (under self._lock)
+    # ---------------------------------------------------------------
+
+    def _current_generation(self) -> int:
+        try:
+            return int(self.current_path.read_text())
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _refresh(self) -> None:
+        """
+        Index rows appended since the last call.
+        """
+
+        generation = self._current_generation()
+        if generation != self.generation:
+            # Compacted (here or by another process)
+            self._reset(generation)
+
+        if self.dim is None:
+            try:
+                with open(self.vectors_path, "rb") as f:
+                    header = f.read(_HEADER.size)
+            except FileNotFoundError:
+                return
+
+            if len(header) < _HEADER.size:
+                return
+            magic, version, dim, _ = _HEADER.unpack(header)
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError(f"Not a vector index file: {self.vectors_path}")
+            self.dim = dim
+
+        vector_rows = (
+            os.path.getsize(self.vectors_path) - _HEADER.size
+        ) // (4 * self.dim)
+
+        if vector_rows <= self.count or not self.payloads_path.exists():
+            return
+
+        with open(self.payloads_path, "rb") as f:
+            f.seek(self._payload_end)
+            data = f.read()
+
+        start = 0
+        while self.count < vector_rows:
+            end = data.find(b"\n", start)
+            if end < 0:
+                break
+            record = json.loads(data[start:end])
+            self._add(record["id"], record["payload"], self._payload_end + start)
+            start = end + 1
+
+        self._payload_end += start
+
+    def _add(self, point_id: Any, payload: Dict, offset: int) -> None:
+        row = self.count
+
+        old = self._rows.get(point_id)
+        if old is not None:
+            self._live[old] = False
+
+        if row >= len(self._live):
+            grown = np.zeros(max(1024, 2 * len(self._live)), dtype=bool)
+            grown[:len(self._live)] = self._live
+            self._live = grown
+
+        self._live[row] = True
+        self._rows[point_id] = row
+        self._ids.append(point_id)
+        self._offsets.append(offset)
+
+        for field, postings in self._postings.items():
+            if field in payload:
+                for value in _values(payload[field]):
+                    postings.setdefault(value, array("q")).append(row)
+
+        self.count += 1
+
+    def _views(self):
+        """
+        (matrix, payload map) covering every indexed row.
+        """
+
+        if self._matrix is None or len(self._matrix) < self.count:
+            self._matrix = np.memmap(
+                self.vectors_path, dtype=np.float32, mode="r",
+                offset=_HEADER.size, shape=(self.count, self.dim),
+            )
+            # The old map may still be read by a search in flight;
+            # it's closed once nothing references it
+            with open(self.payloads_path, "rb") as f:
+                self._payload_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        return self._matrix, self._payload_map
+
+    # ---------------------------------------------------------------
+    # Writes
+    # ---------------------------------------------------------------
+
+    def upsert(self, points: Iterable) -> int:
+        points = list(points)
+        if not points:
+            return 0
+
+        vectors = np.asarray([p.vector for p in points], dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms > 0, norms, 1)
+
+        with self._lock, exclusive_lock(self.lock_path):
+            self._refresh()
+
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+                with open(self.vectors_path, "wb") as f:
+                    f.write(_HEADER.pack(_MAGIC, _VERSION, self.dim, 0))
+
+            if vectors.shape[1] != self.dim:
+                raise ValueError(
+                    f"Vector size {vectors.shape[1]} != index size {self.dim}"
+                )
+
+            lines = [
+                json.dumps({"id": p.id, "payload": p.payload or {}}).encode("utf-8") + b"\n"
+                for p in points
+            ]
+
+            self._append(
+                self.vectors_path,
+                _HEADER.size + self.count * 4 * self.dim,
+                vectors.tobytes(),
+            )
+            self._append(self.payloads_path, self._payload_end, b"".join(lines))
+
+            offset = self._payload_end
+            for p, line in zip(points, lines):
+                self._add(p.id, p.payload or {}, offset)
+                offset += len(line)
+            self._payload_end = offset
+
+            if self._should_compact():
+                self._compact()
+
+        return len(points)
+
+    @staticmethod
+    def _append(path: Path, end: int, data: bytes) -> None:
+        with open(path, "ab") as f:
+            # Cut the tail of a crashed write, so rows stay
+            # aligned (only then: a mapped file can't be resized
+            # on Windows)
+            if f.seek(0, os.SEEK_END) > end:
+                f.truncate(end)
+            f.write(data)
+
+    # ---------------------------------------------------------------
+    # Compaction (under self._lock and the write lock)
+    # ---------------------------------------------------------------
+
+    def _should_compact(self) -> bool:
+        dead = self.count - int(self._live[:self.count].sum())
+        return (
+            dead >= VECTOR_INDEX_COMPACT_MIN_ROWS
+            and dead >= VECTOR_INDEX_COMPACT_RATIO * self.count
+        )
+
+    def _compact(self) -> None:
+        """
+        Rewrite the live rows as the next generation.
+        """
+
+        old = self.generation
+        rows = np.flatnonzero(self._live[:self.count])
+        matrix, payload_map = self._views()
+        offsets = self._offsets
+
+        self._reset(old + 1)
+
+        with open(self.vectors_path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, matrix.shape[1], 0))
+            for start in range(0, len(rows), 65536):
+                f.write(np.ascontiguousarray(matrix[rows[start:start + 65536]]).tobytes())
+
+        with open(self.payloads_path, "wb") as f:
+            for row in rows.tolist():
+                start = offsets[row]
+                f.write(payload_map[start:payload_map.find(b"\n", start) + 1])
+
+        tmp = self.current_path.with_suffix(".tmp")
+        tmp.write_text(str(self.generation))
+        os.replace(tmp, self.current_path)
+
+        # Generations older than the one just replaced
+        for path in (*self.root.glob("vectors*.f32"), *self.root.glob("payloads*.jsonl")):
+            parts = path.name.split(".")
+            if (int(parts[1]) if len(parts) == 3 else 0) < old:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+        self._refresh()
+        self.compactions += 1
+
+    def compact(self) -> None:
+        """
+        Drop superseded rows now (see VECTOR_INDEX_COMPACT_RATIO
+        for the automatic trigger).
+        """
+
+        with self._lock, exclusive_lock(self.lock_path):
+            self._refresh()
+            if self.count and self.count > int(self._live[:self.count].sum()):
+                self._compact()
+
+    # ---------------------------------------------------------------
+    # Search
+    # ---------------------------------------------------------------
+
+    @staticmethod
+    def _payload(payload_map: mmap.mmap, start: int) -> Dict:
+        end = payload_map.find(b"\n", start)
+        return json.loads(payload_map[start:end])["payload"]
+
+    def _filter_rows(
+        self, metadata_filter: Dict[str, Any], payload_map: mmap.mmap
+    ) -> np.ndarray:
+        rows = None
+
+        for field, value in metadata_filter.items():
+            if field in self._postings:
+                match = np.frombuffer(
+                    self._postings[field].get(value, array("q")), dtype=np.int64
+                )[:self.count]
+            else:
+                # No postings: scan the payloads still in play
+                candidates = np.arange(self.count) if rows is None else rows
+                match = np.asarray([
+                    r for r in candidates.tolist()
+                    if value in _values(self._payload(payload_map, self._offsets[r]).get(field))
+                ], dtype=np.int64)
+
+            # Postings are ascending and duplicate-free per value
+            rows = match if rows is None else np.intersect1d(rows, match, assume_unique=True)
+
+        return rows
+
+    def search(
+        self,
+        query_vector: List[float],
+        limit: int = 5,
+        metadata_filter: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._refresh()
+            if not self.count or limit <= 0:
+                return []
+
+            matrix, payload_map = self._views()
+            live = self._live[:self.count]
+            # A compaction replaces these (not the old ones)
+            ids, offsets = self._ids, self._offsets
+
+            rows = None
+            if metadata_filter:
+                rows = self._filter_rows(metadata_filter, payload_map)
+                rows = rows[live[rows]]
+
+        query = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+
+        if rows is None:
+            scores = matrix @ query
+            scores[~live] = -np.inf
+            candidates = int(live.sum())
+        else:
+            scores = matrix[rows] @ query
+            candidates = len(rows)
+
+        k = min(limit, candidates)
+        if k == 0:
+            return []
+
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        hits = top if rows is None else rows[top]
+
+        return [
+            {
+                "id": ids[row],
+                "score": float(score),
+                "payload": self._payload(payload_map, offsets[row]),
+            }
+            for row, score in zip(hits.tolist(), scores[top].tolist())
+        ]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            self._refresh()
+            return {
+                "rows": self.count,
+                "live": int(self._live[:self.count].sum()),
+                "generation": self.generation,
+                "compactions": self.compactions,
+                "dim": self.dim,
+                "bytes": (
+                    self.vectors_path.stat().st_size + self._payload_end
+                    if self.dim is not None else 0
+                ),
+            }
+
+
+# ------------------------------------------------------------
+# Process-wide indexes, one per collection
+# ------------------------------------------------------------
+
+_indexes: Dict[str, NumpyVectorIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_vector_index(collection_name: str, root: Path = VECTOR_INDEX_DIR) -> NumpyVectorIndex:
+    with _indexes_lock:
+        index = _indexes.get(collection_name)
+        if index is None:
+            index = _indexes[collection_name] = NumpyVectorIndex(root / collection_name)
+        return index
@@ -1,11 +1,10 @@
-from qdrant_client import QdrantClient
+# Run from backend/ingestion_service: python -m app.create_qdrant_collection
+
 from qdrant_client.models import VectorParams, Distance
+from app.utils.qdrant_utils import get_qdrant_client
 
-# Connect to local Qdrant
-client = QdrantClient(
-    host="localhost",
-    port=6333
-)
+# Connect to Qdrant (core/qdrant_config.py)
+client = get_qdrant_client()
 
 COLLECTION_NAME = "documents_chunks"
 
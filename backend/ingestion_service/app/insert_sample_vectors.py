@@ -1,11 +1,13 @@
-from qdrant_client import QdrantClient
+# Run from backend/ingestion_service: python -m app.insert_sample_vectors
+
 from qdrant_client.models import PointStruct
-from utils.embedding_utils import EmbeddingService
+from app.utils.embedding_utils import EmbeddingService
+from app.utils.qdrant_utils import get_qdrant_client
 
 # -----------------------------
-# Qdrant connection
+# Qdrant connection (shared client, core/qdrant_config.py)
 # -----------------------------
-client = QdrantClient(host="localhost", port=6333)
+client = get_qdrant_client()
 
 # ✅ SINGLE SOURCE OF TRUTH
 COLLECTION_NAME = "documents"
@@ -1,9 +1,25 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from app.routes.upload import router as upload_router
 from app.routes.edue_query import router as edue_query_router
+from app.utils.embedding_utils import warm_up
+
+# Load the embedding model at startup instead of on the first
+# ingest / RAG query. Off by default: EDUE-only deployments
+# never embed, and startup stays well under a second.
+WARM_UP_EMBEDDING_MODEL = False
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if WARM_UP_EMBEDDING_MODEL:
+        warm_up()
+    yield
+
 
-app = FastAPI(title="Enterprise Document Understanding Engine")
+app = FastAPI(title="Enterprise Document Understanding Engine", lifespan=lifespan)
 
 app.include_router(upload_router)
 app.include_router(edue_query_router)
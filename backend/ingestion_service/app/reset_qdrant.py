@@ -1,6 +1,8 @@
-from qdrant_client import QdrantClient
+# Run from backend/ingestion_service: python -m app.reset_qdrant
 
-client = QdrantClient(host="localhost", port=6333)
+from app.utils.qdrant_utils import get_qdrant_client
+
+client = get_qdrant_client()
 
 collections = client.get_collections().collections
 
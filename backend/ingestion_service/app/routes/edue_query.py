@@ -1,9 +1,14 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from typing import List, Literal, Optional
 
-from app.services.ingest_service import get_document_by_id
-from app.core.edue_query import query_edue
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel, Field
+
+from app.services.ingest_service import get_document_by_id, get_documents
+from app.core.edue_bm25 import parse_bm25_query
+from app.core.edue_query import query_edue, query_edue_batch
+from app.core.edue_search import DEFAULT_TOP_K, MAX_TOP_K, search_edue
 from app.services.query_orchestrator import run_hybrid_query
+from app.services.query_cache import QUERY_CACHE
 
 
 # --------------------------------------------------
@@ -20,17 +25,38 @@ router = APIRouter(
 # Request schema
 # --------------------------------------------------
 
+MAX_BATCH_QUESTIONS = 1000
+
+
 class EDUERequest(BaseModel):
     document_id: str
     question: str
 
 
+class EDUEQueryRequest(EDUERequest):
+    # "edue" = legacy substring ranking, "bm25" = BM25F ranking
+    engine: Literal["edue", "bm25"] = "edue"
+
+
+class EDUEBatchRequest(BaseModel):
+    document_id: str
+    questions: List[str] = Field(..., min_length=1, max_length=MAX_BATCH_QUESTIONS)
+    engine: Literal["edue", "bm25"] = "edue"
+
+
+class EDUESearchRequest(BaseModel):
+    question: str
+    # None = search every ingested document
+    document_ids: Optional[List[str]] = None
+    top_k: int = Field(DEFAULT_TOP_K, ge=1, le=MAX_TOP_K)
+
+
 # --------------------------------------------------
 # EDUE ONLY (deterministic, structure-first)
 # --------------------------------------------------
 
 @router.post("/query")
-def edue_query_endpoint(req: EDUERequest):
+def edue_query_endpoint(req: EDUEQueryRequest):
     """
     Runs ONLY the Enterprise Document Understanding Engine (EDUE).
     Deterministic, no LLM, no embeddings.
@@ -44,7 +70,131 @@ def edue_query_endpoint(req: EDUERequest):
             detail="Document not found"
         )
 
-    return query_edue(document, req.question)
+    return QUERY_CACHE.get_or_compute(
+        req.document_id,
+        req.engine,
+        req.question,
+        lambda: query_edue(document, req.question, engine=req.engine),
+    )
+
+
+# --------------------------------------------------
+# EDUE batch (many questions, one document sweep)
+# --------------------------------------------------
+
+@router.post("/query/batch")
+def edue_query_batch_endpoint(req: EDUEBatchRequest):
+    """
+    Answers a list of questions against one document.
+    Results are returned in question order.
+    """
+
+    document = get_document_by_id(req.document_id)
+
+    if not document:
+        raise HTTPException(
+            status_code=404,
+            detail="Document not found"
+        )
+
+    return {
+        "document_id": req.document_id,
+        "results": query_edue_batch(
+            document, req.questions, engine=req.engine
+        ),
+    }
+
+
+# --------------------------------------------------
+# EDUE across documents (scatter / gather)
+# --------------------------------------------------
+
+@router.post("/search")
+def edue_search_endpoint(req: EDUESearchRequest):
+    """
+    BM25F search over all ingested documents (or a subset).
+    Returns a globally merged top-k with document_id and pages.
+    Only documents sharing a term with the question are read.
+    """
+
+    query = parse_bm25_query(req.question)
+    documents = get_documents(req.document_ids, terms=query.tokens)
+
+    return search_edue(documents, req.question, top_k=req.top_k)
+
+
+# --------------------------------------------------
+# Course catalog (exact lookups, no ranking)
+# --------------------------------------------------
+
+def _course_documents(document_id: Optional[str]):
+    if document_id is None:
+        documents = get_documents()
+    else:
+        documents = get_documents([document_id])
+        if not documents:
+            raise HTTPException(
+                status_code=404,
+                detail="Document not found"
+            )
+
+    return [d for d in documents if d.get("courses")]
+
+
+def _with_document(document, courses):
+    return [
+        {"document_id": document.get("document_id"), **c}
+        for c in courses
+    ]
+
+
+@router.get("/courses")
+def edue_courses_endpoint(
+    credits: Optional[int] = None,
+    min_credits: Optional[int] = Query(None, ge=0),
+    max_credits: Optional[int] = Query(None, ge=0),
+    title: Optional[str] = None,
+    document_id: Optional[str] = None,
+):
+    """
+    Lists catalog courses, filtered by credits and/or
+    title words.
+    """
+
+    results = []
+    for document in _course_documents(document_id):
+        results.extend(_with_document(
+            document,
+            document["courses"].filter(
+                credits=credits,
+                min_credits=min_credits,
+                max_credits=max_credits,
+                title=title,
+            ),
+        ))
+
+    return {"count": len(results), "results": results}
+
+
+@router.get("/courses/{code}")
+def edue_course_endpoint(code: str, document_id: Optional[str] = None):
+    """
+    Exact course-code lookup ("AE ZG631", "aezg631", ...).
+    """
+
+    results = []
+    for document in _course_documents(document_id):
+        results.extend(_with_document(
+            document, document["courses"].lookup_code(code)
+        ))
+
+    if not results:
+        raise HTTPException(
+            status_code=404,
+            detail="Course not found"
+        )
+
+    return {"course_code": code, "results": results}
 
 
 # --------------------------------------------------
@@ -57,6 +207,9 @@ def hybrid_query_endpoint(req: EDUERequest):
     Runs EDUE first, then RAG.
     Returns both results side-by-side.
     No arbitration yet.
+
+    Not cached: RAG answers come from the shared vector
+    collection, which any ingest (in any process) changes.
     """
 
     document = get_document_by_id(req.document_id)
@@ -68,3 +221,16 @@ def hybrid_query_endpoint(req: EDUERequest):
         )
 
     return run_hybrid_query(document, req.question)
+
+
+# --------------------------------------------------
+# Query cache observability
+# --------------------------------------------------
+
+@router.get("/cache/stats")
+def edue_cache_stats_endpoint():
+    """
+    Hit / miss / eviction counters of the query-result cache.
+    """
+
+    return QUERY_CACHE.stats()
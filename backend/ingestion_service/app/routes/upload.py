@@ -1,26 +1,93 @@
+import os
+
 from fastapi import APIRouter, UploadFile, File, HTTPException
-from app.services.ingest_service import process_file
+from fastapi.responses import JSONResponse
+
+from app.services.ingest_service import duplicate_result, is_ingested, save_upload
+from app.services.ingest_jobs import INGEST_QUEUE, IngestQueueFull
 
 router = APIRouter(prefix="/upload", tags=["Ingestion"])
 
+# Seconds a client should wait before retrying a refused upload
+RETRY_AFTER_SECONDS = 30
+
 
 @router.post("/")
 def upload_document(file: UploadFile = File(...)):
     """
-    Upload and ingest a document.
+    Upload a document and queue it for ingestion.
+
+    Returns a job id immediately (202); poll /upload/jobs/{id}.
+    Re-uploads of an ingested document return at once.
     """
 
     try:
-        # ❌ DO NOT await — this is a sync function
-        result = process_file(file)
+        file_path, document_id = save_upload(file)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=str(e)
+        )
 
+    if is_ingested(document_id):
         return {
             "status": "success",
-            "details": result
+            "details": duplicate_result(document_id, file.filename, file_path),
         }
 
-    except Exception as e:
+    try:
+        job = INGEST_QUEUE.submit(document_id, file.filename, file_path)
+    except IngestQueueFull as e:
+        # Backpressure: the client retries later. Nothing will
+        # read the saved copy, unless the same bytes got queued
+        # by another request meanwhile.
+        if not INGEST_QUEUE.is_active(document_id):
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
+
         raise HTTPException(
-            status_code=500,
-            detail=str(e)
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
         )
+
+    return JSONResponse(
+        status_code=202,
+        content={
+            "status": job.status,
+            "job_id": job.id,
+            "document_id": document_id,
+            "status_url": f"/upload/jobs/{job.id}",
+        },
+    )
+
+
+@router.get("/jobs/{job_id}")
+def upload_job_status(job_id: str):
+    """
+    Ingestion progress: status, pages processed / total,
+    result or error.
+    """
+
+    job = INGEST_QUEUE.get(job_id)
+
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Job not found"
+        )
+
+    return job.to_dict()
+
+
+@router.get("/jobs")
+def upload_queue_stats():
+    """
+    Queue depth and job counts by status.
+    """
+
+    return INGEST_QUEUE.stats()
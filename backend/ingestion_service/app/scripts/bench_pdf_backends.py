@@ -0,0 +1,97 @@
+# app/scripts/bench_pdf_backends.py
+#
+# PDF backend benchmark over a fixed local corpus: pages/sec
+# per backend, and how far each backend's text lines are from
+# the layout (pdfplumber) backend's. The page cache is off so
+# every page is really parsed.
+#
+#   python -m app.scripts.bench_pdf_backends PATH [PATH ...]
+#       [--workers 1] [--show 5]
+
+import argparse
+import difflib
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from app.utils import page_cache
+from app.utils.pdf_parser import PDF_BACKENDS, detect_pdf_backend, parse_pdf
+
+
+def _corpus(paths: List[str]) -> List[Path]:
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(sorted(path.rglob("*.pdf")))
+        else:
+            files.append(path)
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("paths", nargs="+", help="PDFs or directories")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--show", type=int, default=5, help="diff lines shown per file")
+    args = parser.parse_args()
+
+    page_cache.PAGE_CACHE_ENABLED = False
+    files = _corpus(args.paths)
+
+    # backend -> seconds, and per file: backend -> page lines
+    elapsed: Dict[str, float] = {backend: 0.0 for backend in PDF_BACKENDS}
+    lines: Dict[Path, Dict[str, List[List[str]]]] = {}
+    pages = 0
+
+    for f in files:
+        lines[f] = {}
+        for backend in PDF_BACKENDS:
+            start = time.perf_counter()
+            records = parse_pdf(str(f), args.workers, backend=backend)
+            elapsed[backend] += time.perf_counter() - start
+            lines[f][backend] = [r["lines"] for r in records]
+
+        pages += len(records)
+
+    print(f"\n{len(files)} PDFs, {pages} pages, workers={args.workers}\n")
+
+    for backend, seconds in elapsed.items():
+        print(
+            f"  {backend:<8} {seconds:8.2f} s  {pages / seconds:7.1f} pages/s  "
+            f"{elapsed['layout'] / seconds:5.2f}x"
+        )
+
+    # ---------------------------------------------------------------
+    # Output diffs against the layout backend
+    # ---------------------------------------------------------------
+
+    print()
+    for f, by_backend in lines.items():
+        print(f"{f.name}  (auto: {detect_pdf_backend(str(f))})")
+
+        reference = by_backend["layout"]
+        for backend, page_lines in by_backend.items():
+            if backend == "layout":
+                continue
+
+            differ = [
+                i for i, (a, b) in enumerate(zip(reference, page_lines), 1)
+                if a != b
+            ]
+            diff = [
+                l for a, b in zip(reference, page_lines)
+                for l in difflib.unified_diff(a, b, lineterm="", n=0)
+                if l[:1] in "+-" and l[:3] not in ("+++", "---")
+            ]
+            print(
+                f"  {backend:<8} {len(differ)}/{len(reference)} pages differ, "
+                f"{len(diff)} lines changed"
+            )
+            for l in diff[:args.show]:
+                print(f"      {l}")
+
+    print()
+
+
+if __name__ == "__main__":
+    main()
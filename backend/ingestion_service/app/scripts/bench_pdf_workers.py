@@ -0,0 +1,48 @@
+# app/scripts/bench_pdf_workers.py
+#
+# Scaling benchmark: per-page PDF extraction with 1..N pool
+# workers. Output is checked against the serial run.
+#
+#   python -m app.scripts.bench_pdf_workers PDF [--workers 1 2 4 8]
+
+import argparse
+import time
+
+from app.utils import pdf_pages
+from app.utils.pdf_parser import extract_structured_sections_from_pdf
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("pdf")
+    parser.add_argument("--workers", type=int, nargs="+", default=None)
+    args = parser.parse_args()
+
+    counts = args.workers or sorted({1, 2, 4, pdf_pages.PDF_WORKERS})
+    pdf_pages.PDF_WORKERS = max(counts)
+
+    num_pages = pdf_pages.count_pages(args.pdf)
+    print(f"\n{args.pdf}: {num_pages} pages\n")
+
+    baseline, serial_time = None, None
+
+    for workers in counts:
+        start = time.perf_counter()
+        sections = extract_structured_sections_from_pdf(args.pdf, workers=workers)
+        elapsed = time.perf_counter() - start
+
+        if baseline is None:
+            baseline, serial_time = sections, elapsed
+        assert sections == baseline, f"output differs with {workers} workers"
+
+        print(
+            f"  workers={workers:<3} {elapsed:8.2f} s  "
+            f"{num_pages / elapsed:8.1f} pages/s  "
+            f"speedup {serial_time / elapsed:5.2f}x"
+        )
+
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# app/scripts/bench_query_batching.py
+#
+# embed_query under concurrent load, with and without
+# micro-batching: queries/sec, latency percentiles, and the
+# batcher's fill / queueing-delay metrics.
+#
+#   python -m app.scripts.bench_query_batching
+#       [--threads 1 8 32] [--queries 512] [--max-wait-ms 5] [--max-batch 32]
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from app.utils import embedding_utils
+from app.utils.embedding_batcher import MicroBatcher
+
+
+QUESTIONS = [
+    "What are the prerequisites for the machine learning course?",
+    "How many credits is the software architecture course?",
+    "Which courses cover cloud computing?",
+    "What is the evaluation scheme for the capstone project?",
+    "Describe the data structures course.",
+    "Who should take the distributed systems elective?",
+    "What topics does the operating systems course cover?",
+    "Is there a course on natural language processing?",
+]
+
+
+def run(threads: int, queries: int) -> None:
+    texts = [f"{QUESTIONS[i % len(QUESTIONS)]} ({i})" for i in range(queries)]
+    latencies: List[float] = []
+
+    def one(text: str) -> None:
+        start = time.perf_counter()
+        embedding_utils.embed_query(text)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(one, texts))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f"    threads {threads:3d}  {queries / elapsed:8.1f} q/s  "
+        f"p50 {statistics.median(latencies) * 1000:7.1f} ms  "
+        f"p95 {p95 * 1000:7.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--queries", type=int, default=512)
+    parser.add_argument("--max-wait-ms", type=float, default=embedding_utils.QUERY_BATCH_MAX_WAIT_MS)
+    parser.add_argument("--max-batch", type=int, default=embedding_utils.QUERY_BATCH_MAX_SIZE)
+    args = parser.parse_args()
+
+    embedding_utils.warm_up()
+    print(f"\n{embedding_utils.MODEL_NAME}, {args.queries} queries per run\n")
+
+    print("  unbatched (one encode per query)")
+    embedding_utils.QUERY_BATCHING_ENABLED = False
+    for threads in args.threads:
+        run(threads, args.queries)
+
+    print(f"\n  micro-batched (max {args.max_batch}, {args.max_wait_ms} ms)")
+    embedding_utils.QUERY_BATCHING_ENABLED = True
+    for threads in args.threads:
+        embedding_utils.QUERY_BATCHER = MicroBatcher(
+            embedding_utils._encode_queries,
+            max_batch=args.max_batch,
+            max_wait_ms=args.max_wait_ms,
+        )
+        run(threads, args.queries)
+
+        stats = embedding_utils.QUERY_BATCHER.stats()
+        print(
+            f"                 batches {stats['batches']}, "
+            f"avg size {stats['avg_batch_size']} (fill {stats['avg_fill']:.0%}), "
+            f"queue delay avg {stats['avg_queue_delay_ms']} ms / "
+            f"max {stats['max_queue_delay_ms']} ms"
+        )
+
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# app/scripts/bench_startup.py
+#
+# Cold-start benchmark: wall time of a fresh interpreter
+# importing the API app and the modules spawn workers import
+# (PDF page workers, ingest process workers), plus the heaviest
+# imports of each and any heavy dependency loaded at import.
+#
+#   python -m app.scripts.bench_startup [--runs 5] [--top 8] [--model]
+#
+# --model also times loading the embedding model (warm_up).
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+
+TARGETS = {
+    "api (app.main)": "app.main",
+    "page worker": "app.utils.pdf_parser",
+    "ingest worker": "app.services.ingest_service",
+}
+
+# Must not be imported just by importing a target
+HEAVY = ("torch", "sentence_transformers", "qdrant_client", "pdfplumber", "psycopg")
+
+
+def _run(code: str) -> Tuple[float, str]:
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, check=True,
+    )
+    return time.perf_counter() - start, proc.stderr
+
+
+def _packages(importtime: str) -> Dict[str, int]:
+    """
+    Cumulative microseconds per third-party / stdlib package
+    pulled in by app code (counted where app code imports it).
+    """
+
+    rows = []
+    for line in importtime.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = len(name) - len(name.lstrip())
+        rows.append((depth, name.strip().split(".")[0], int(cumulative)))
+
+    # -X importtime lists children before their parent
+    totals: Dict[str, int] = {}
+    parents: List[Tuple[int, str]] = []
+    for depth, package, cumulative in reversed(rows):
+        while parents and parents[-1][0] >= depth:
+            parents.pop()
+        if parents and parents[-1][1] == "app" and package != "app":
+            totals[package] = totals.get(package, 0) + cumulative
+        parents.append((depth, package))
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8)
+    parser.add_argument("--model", action="store_true", help="also time the model load")
+    args = parser.parse_args()
+
+    baseline = statistics.median(_run("pass")[0] for _ in range(args.runs))
+    print(f"\ninterpreter alone: {baseline * 1000:.0f} ms\n")
+
+    for label, module in TARGETS.items():
+        times: List[float] = []
+        for _ in range(args.runs):
+            elapsed, importtime = _run(f"import {module}")
+            times.append(elapsed)
+
+        loaded = {
+            line.split("|")[-1].strip()
+            for line in importtime.splitlines()
+            if line.startswith("import time:")
+        }
+        heavy = [name for name in HEAVY if name in loaded]
+
+        print(
+            f"{label:<16} {statistics.median(times) * 1000:7.0f} ms  "
+            f"(+{(statistics.median(times) - baseline) * 1000:.0f} ms imports)  "
+            f"heavy: {', '.join(heavy) or 'none'}"
+        )
+
+        top = sorted(_packages(importtime).items(), key=lambda kv: -kv[1])
+        for package, micros in top[:args.top]:
+            print(f"    {micros / 1000:8.1f} ms  {package}")
+        print()
+
+    if args.model:
+        elapsed, _ = _run(
+            "from app.utils.embedding_utils import warm_up; warm_up()"
+        )
+        print(f"model warm-up (fresh process): {elapsed * 1000:.0f} ms\n")
+
+
+if __name__ == "__main__":
+    main()
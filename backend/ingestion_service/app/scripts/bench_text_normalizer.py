@@ -0,0 +1,126 @@
+# app/scripts/bench_text_normalizer.py
+#
+# Micro-benchmark: shared text normalizer vs the per-call
+# regex code it replaced, on real extracted PDF text.
+#
+#   python -m app.scripts.bench_text_normalizer [--rounds N] [--pdf PATH]
+
+import argparse
+import json
+import re
+import time
+from pathlib import Path
+from typing import List
+
+from app.utils import text_normalizer as tn
+
+SCRIPT_DIR = Path(__file__).resolve()
+SERVICE_DIR = SCRIPT_DIR.parents[2]          # ingestion_service/
+DATA_DIR = SERVICE_DIR / "data"
+
+
+# ---------------------------------------------
+# Previous implementations (baseline)
+# ---------------------------------------------
+
+def legacy_repair(text: str) -> str:
+    text = re.sub(r"-\s+", "", text)
+    text = re.sub(r"\s+", " ", text)
+    return text.strip()
+
+
+def legacy_is_noise(sentence: str) -> bool:
+    s = sentence.lower().strip()
+    if len(s.split()) < tn.MIN_SENTENCE_TOKENS:
+        return True
+    for p in tn.NOISE_PATTERNS:
+        if re.search(p, s):
+            return True
+    return s.startswith(("what is", "explain", "define"))
+
+
+def legacy_sentences(text: str):
+    text = legacy_repair(legacy_repair(text))
+    out = []
+    for s in re.split(r"(?<=[.!?])\s+", text):
+        s = s.strip()
+        out.append((s, legacy_is_noise(s)))
+    return out
+
+
+def legacy_tokenize(text: str) -> List[str]:
+    return [
+        t.lower()
+        for t in re.findall(r"[a-zA-Z0-9]+", text)
+        if t.lower() not in tn.STOPWORDS
+    ]
+
+
+def new_sentences(text: str):
+    return [(s, noise) for s, _, noise in tn.iter_sentences(text)]
+
+
+# ---------------------------------------------
+# Corpus
+# ---------------------------------------------
+
+def load_texts(pdf_path: str = None) -> List[str]:
+    """
+    One combined text block per section, as EDUE indexes it.
+    """
+
+    if pdf_path:
+        from app.utils.pdf_parser import extract_structured_sections_from_pdf
+        return [
+            " ".join([s["title"]] + s["paragraphs"])
+            for s in extract_structured_sections_from_pdf(pdf_path)
+        ]
+
+    texts = []
+    for path in sorted(DATA_DIR.glob("*.json")):
+        doc = json.loads(path.read_text(encoding="utf-8"))
+        for sec in doc.get("sections", []):
+            lines = [c["text"] for c in sec.get("content", [])]
+            texts.append(" ".join([sec.get("title") or ""] + lines))
+    return texts
+
+
+def bench(label: str, fn, texts: List[str], rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for t in texts:
+            fn(t)
+        best = min(best, time.perf_counter() - start)
+    print(f"  {label:<34} {best * 1000:9.1f} ms")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--pdf", help="extract text from this PDF instead of data/*.json")
+    args = parser.parse_args()
+
+    texts = load_texts(args.pdf)
+    size_mb = sum(len(t) for t in texts) / 1e6
+    print(f"\nCorpus: {len(texts)} sections, {size_mb:.2f} M chars\n")
+
+    # Outputs must be identical before timings mean anything
+    for t in texts:
+        assert legacy_sentences(t) == new_sentences(t)
+        assert legacy_tokenize(t) == tn.tokenize(t)
+
+    print("repair + split + noise tagging")
+    old = bench("legacy (re.sub / re.search)", legacy_sentences, texts, args.rounds)
+    new = bench("text_normalizer.iter_sentences", new_sentences, texts, args.rounds)
+    print(f"  speedup: {old / new:.2f}x\n")
+
+    print("tokenize")
+    old = bench("legacy (double lower)", legacy_tokenize, texts, args.rounds)
+    new = bench("text_normalizer.tokenize", tn.tokenize, texts, args.rounds)
+    print(f"  speedup: {old / new:.2f}x\n")
+
+
+if __name__ == "__main__":
+    main()
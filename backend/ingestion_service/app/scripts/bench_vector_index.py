@@ -0,0 +1,119 @@
+# app/scripts/bench_vector_index.py
+#
+# Vector search backends on a synthetic corpus: the embedded
+# NumPy index (build, cold load, search with and without a
+# document_id filter) and, with --qdrant, the Qdrant server
+# from QDRANT_CONFIG on the same points and queries.
+#
+#   python -m app.scripts.bench_vector_index
+#       [--points 100000] [--dim 384] [--documents 200] [--queries 200] [--qdrant]
+
+import argparse
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+import numpy as np
+from qdrant_client.models import PointStruct
+
+from app.core.vector_index import NumpyVectorIndex
+from app.utils import qdrant_utils
+
+
+BATCH = 1024
+
+
+def _points(rng, count: int, dim: int, documents: int) -> List[PointStruct]:
+    vectors = rng.standard_normal((count, dim), dtype=np.float32)
+    return [
+        PointStruct(
+            id=i,
+            vector=vectors[i].tolist(),
+            payload={"document_id": f"doc-{i % documents}", "chunk": i, "text": f"chunk {i}"},
+        )
+        for i in range(count)
+    ]
+
+
+def _timed(label: str, search: Callable, queries: List[List[float]], metadata_filter=None):
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        search(query, 5, metadata_filter)
+        latencies.append(time.perf_counter() - start)
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f"    {label:<22} {len(latencies) / sum(latencies):8.1f} q/s  "
+        f"p50 {statistics.median(latencies) * 1000:7.2f} ms  "
+        f"p95 {p95 * 1000:7.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--qdrant", action="store_true", help="also benchmark the Qdrant server")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    points = _points(rng, args.points, args.dim, args.documents)
+    queries = rng.standard_normal((args.queries, args.dim), dtype=np.float32).tolist()
+    doc_filter = {"document_id": "doc-0"}
+
+    print(f"\n{args.points} points x {args.dim} dims, {args.documents} documents\n")
+
+    root = Path(tempfile.mkdtemp(prefix="vector_index_"))
+    try:
+        print("  numpy (embedded)")
+        index = NumpyVectorIndex(root)
+
+        start = time.perf_counter()
+        for i in range(0, len(points), BATCH):
+            index.upsert(points[i:i + BATCH])
+        elapsed = time.perf_counter() - start
+        print(f"    build {elapsed:.2f} s ({args.points / elapsed:,.0f} points/s)")
+
+        start = time.perf_counter()
+        index = NumpyVectorIndex(root)
+        index.stats()
+        print(f"    cold load {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        _timed("search", index.search, queries)
+        _timed("search + filter", index.search, queries, doc_filter)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    if args.qdrant:
+        print("\n  qdrant (server)")
+        qdrant_utils.VECTOR_BACKEND = "qdrant"
+        qdrant_utils.COLLECTION_NAME = "bench_vector_index"
+        client = qdrant_utils.get_qdrant_client()
+
+        if client.collection_exists(qdrant_utils.COLLECTION_NAME):
+            client.delete_collection(qdrant_utils.COLLECTION_NAME)
+        try:
+            start = time.perf_counter()
+            qdrant_utils.write_points(
+                (points[i:i + BATCH] for i in range(0, len(points), BATCH))
+            )
+            elapsed = time.perf_counter() - start
+            print(f"    build {elapsed:.2f} s ({args.points / elapsed:,.0f} points/s)")
+
+            _timed("search", qdrant_utils.search_vectors, queries)
+            _timed("search + filter", qdrant_utils.search_vectors, queries, doc_filter)
+        finally:
+            client.delete_collection(qdrant_utils.COLLECTION_NAME)
+
+    print()
+
+
+if __name__ == "__main__":
+    main()
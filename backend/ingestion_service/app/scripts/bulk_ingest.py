@@ -0,0 +1,388 @@
+# app/scripts/bulk_ingest.py
+#
+# Bulk ingestion of directory trees / zip archives of PDFs.
+#
+#   python -m app.scripts.bulk_ingest PATH [PATH ...]
+#       [--workers N] [--batch-size 200] [--slowest 10] [--no-db]
+#       [--vectors | --no-vectors]
+#
+# - files are deduplicated by content hash (the document id)
+# - documents already in the EDUE store (or in flight) are
+#   skipped, so an interrupted run is resumed by running it
+#   again; zip members are hashed before they're copied out
+# - inputs are discovered lazily and PDFs are parsed in a
+#   process pool, one file per worker, so memory doesn't grow
+#   with the number of files
+# - each .edue file is written (atomically) as soon as its
+#   document is done, and its chunks embedded into Qdrant;
+#   documents rows are inserted in batches
+# - a document's row is journaled before its .edue file is
+#   written; the next run inserts the journaled rows whose
+#   document made it into the store if this one dies
+#
+# A running API server picks the new documents up as they're
+# asked for (see EDUEDocumentStore); no restart needed.
+
+import argparse
+import hashlib
+import heapq
+import json
+import multiprocessing
+import os
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.core.edue_store import EDUE_DATA_DIR
+from app.services.ingest_service import (
+    extract_document,
+    is_ingested,
+    metadata_row,
+    store_document,
+)
+from app.utils.db_utils import insert_document_metadata_batch
+from app.utils.file_hash_utils import generate_file_hash
+from app.utils.file_utils import UPLOAD_CHUNK_SIZE, save_upload_file
+
+
+# Rows stored in the EDUE store but not yet in the documents table
+JOURNAL_PATH = EDUE_DATA_DIR / "bulk_ingest_pending.jsonl"
+
+# Files submitted to the pool ahead of the ones running
+# (bounds memory held by finished-but-unstored results)
+IN_FLIGHT_PER_WORKER = 2
+
+
+# ------------------------------------------------------------
+# Input discovery
+# ------------------------------------------------------------
+
+def _is_pdf(name: str) -> bool:
+    return name.lower().endswith(".pdf")
+
+
+# skip(document_id) -> True if the document needs no work
+SkipCheck = Callable[[str], bool]
+
+
+def _zip_members(
+    zip_path: Path, skip: SkipCheck
+) -> Iterator[Tuple[str, Optional[str], str]]:
+    """
+    Hash PDF members, then stream the ones not skipped into
+    the upload dir (same naming as /upload/). Skipped members
+    are yielded without a file path.
+    """
+
+    with zipfile.ZipFile(zip_path) as archive:
+        for info in archive.infolist():
+            if info.is_dir() or not _is_pdf(info.filename):
+                continue
+
+            name = os.path.basename(info.filename)
+
+            sha256 = hashlib.sha256()
+            with archive.open(info) as member:
+                for chunk in iter(lambda: member.read(UPLOAD_CHUNK_SIZE), b""):
+                    sha256.update(chunk)
+
+            digest = sha256.hexdigest()
+            if skip(digest):
+                yield digest, None, name
+                continue
+
+            with archive.open(info) as member:
+                file_path, digest = save_upload_file(
+                    SimpleNamespace(file=member, filename=name)
+                )
+            yield digest, file_path, name
+
+
+def _walk(path: Path) -> Iterator[Path]:
+    """
+    Files under a directory, in sorted order, one directory
+    listing at a time.
+    """
+
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            yield Path(root) / name
+
+
+def _sources(
+    paths: List[str], skip: SkipCheck
+) -> Iterator[Tuple[str, Optional[str], str]]:
+    """
+    (document_id, file_path, filename) for every PDF under
+    `paths` (PDF files, directories, zip archives), found as
+    they're consumed. file_path is None for zip members that
+    were skipped.
+    """
+
+    for path in map(Path, paths):
+        files = _walk(path) if path.is_dir() else [path]
+
+        for f in files:
+            if f.suffix.lower() == ".zip":
+                yield from _zip_members(f, skip)
+            elif _is_pdf(f.name):
+                yield generate_file_hash(str(f)), str(f), f.name
+
+
+# ------------------------------------------------------------
+# Metadata batching
+# ------------------------------------------------------------
+
+class MetadataBatch:
+    """
+    documents rows waiting for one batched INSERT.
+
+    A row is journaled (with its document_id) before the
+    document is stored, and added to the batch once it is; a
+    successful flush empties the journal. Rows left over from
+    an interrupted run are kept only if their document made
+    it into the store (otherwise it's ingested again).
+    """
+
+    def __init__(self, journal: Path, batch_size: int, enabled: bool = True):
+        self.journal = journal
+        self.batch_size = batch_size
+        self.enabled = enabled
+        self.rows: List[Dict] = []
+        self.inserted = 0
+
+        # Left over from an interrupted run
+        if enabled and journal.exists():
+            with open(journal, encoding="utf-8") as f:
+                rows = [json.loads(line) for line in f if line.strip()]
+
+            self.rows = [
+                row for row in rows
+                if "document_id" not in row or is_ingested(row["document_id"])
+            ]
+
+    def journal_row(self, row: Dict) -> None:
+        if not self.enabled:
+            return
+
+        with open(self.journal, "a", encoding="utf-8") as f:
+            f.write(json.dumps(row) + "\n")
+
+    def add(self, row: Dict) -> None:
+        if not self.enabled:
+            return
+
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.rows:
+            return
+
+        insert_document_metadata_batch(self.rows)
+        self.inserted += len(self.rows)
+        self.rows = []
+        self.journal.unlink(missing_ok=True)
+
+
+# ------------------------------------------------------------
+# Worker
+# ------------------------------------------------------------
+
+def _extract(file_path: str) -> Tuple[Dict, float]:
+    start = time.perf_counter()
+    # One file per worker: no nested page pool
+    extracted = extract_document(file_path, pdf_workers=1)
+    return extracted, time.perf_counter() - start
+
+
+# ------------------------------------------------------------
+# Main
+# ------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("paths", nargs="+", help="PDFs, directories or zip files")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--slowest", type=int, default=10)
+    parser.add_argument(
+        "--no-db", action="store_true",
+        help="skip the documents table (EDUE store only)",
+    )
+    parser.add_argument(
+        "--vectors", action=argparse.BooleanOptionalAction, default=None,
+        help="embed chunks into the vector index "
+             "(default: ingest_service.VECTOR_INDEX_ENABLED)",
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+
+    batch = MetadataBatch(JOURNAL_PATH, args.batch_size, enabled=not args.no_db)
+
+    # ---------------------------------------------------------------
+    # Discover + dedupe lazily, parse in the pool, store as results
+    # arrive
+    # ---------------------------------------------------------------
+
+    in_flight = {}
+    in_flight_ids = set()
+
+    def skip(document_id: str) -> bool:
+        return document_id in in_flight_ids or is_ingested(document_id)
+
+    sources = _sources(args.paths, skip)
+
+    found = skipped = ingested = pages = num_bytes = vectors = 0
+    vector_seconds = 0.0
+    failed: List[Tuple[str, str]] = []
+    # The --slowest files so far (min-heap)
+    slowest: List[Tuple[float, int, str]] = []
+
+    def fail(filename: str, e: Exception) -> None:
+        failed.append((filename, str(e) or e.__class__.__name__))
+        print(f"  FAILED {filename}: {failed[-1][1]}")
+
+    context = multiprocessing.get_context("spawn")
+
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers, mp_context=context) as pool:
+
+            def fill():
+                nonlocal found, skipped
+
+                while len(in_flight) < args.workers * IN_FLIGHT_PER_WORKER:
+                    item = next(sources, None)
+                    if item is None:
+                        return
+
+                    document_id, file_path, filename = item
+                    found += 1
+
+                    # Duplicates within this run are in flight or
+                    # already stored by the time they come up
+                    if file_path is None or skip(document_id):
+                        skipped += 1
+                        continue
+
+                    future = pool.submit(_extract, file_path)
+                    in_flight[future] = (document_id, file_path, filename)
+                    in_flight_ids.add(document_id)
+
+            fill()
+
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    document_id, file_path, filename = in_flight.pop(future)
+
+                    try:
+                        extracted, elapsed = future.result()
+                    except Exception as e:
+                        in_flight_ids.discard(document_id)
+                        fail(filename, e)
+                        continue
+
+                    row = {
+                        **metadata_row(filename, file_path, extracted["sections"]),
+                        "document_id": document_id,
+                    }
+                    batch.journal_row(row)
+
+                    try:
+                        result = store_document(
+                            document_id, filename, file_path, extracted,
+                            insert_metadata=False,
+                            index_vectors=args.vectors,
+                        )
+                    except Exception as e:
+                        fail(filename, e)
+                        # Stored before failing: later runs skip it,
+                        # so its row goes in anyway
+                        if is_ingested(document_id):
+                            batch.add(row)
+                        continue
+                    finally:
+                        in_flight_ids.discard(document_id)
+
+                    if result.get("vectors_per_sec"):
+                        vectors += result["vectors_indexed"]
+                        vector_seconds += result["vectors_indexed"] / result["vectors_per_sec"]
+                    if "vector_index_error" in result:
+                        print(f"  VECTORS FAILED {filename}: {result['vector_index_error']}")
+
+                    batch.add(row)
+
+                    ingested += 1
+                    pages += extracted["num_pages"]
+                    num_bytes += os.path.getsize(file_path)
+
+                    timing = (elapsed, extracted["num_pages"], filename)
+                    if len(slowest) < args.slowest:
+                        heapq.heappush(slowest, timing)
+                    elif slowest and timing > slowest[0]:
+                        heapq.heapreplace(slowest, timing)
+
+                    print(
+                        f"  [{ingested + len(failed)}] {filename}: "
+                        f"{extracted['num_pages']} pages in {elapsed:.2f} s"
+                    )
+
+                fill()
+    finally:
+        # Rows of stored documents go in even if the run stops
+        # early (if this fails too, they stay journaled)
+        batch.flush()
+
+    elapsed = time.perf_counter() - start
+
+    # ---------------------------------------------------------------
+    # Report
+    # ---------------------------------------------------------------
+
+    megabytes = num_bytes / (1024 * 1024)
+
+    print(f"\nfound     {found} PDFs, {skipped} duplicates or already ingested")
+    print(f"ingested  {ingested} documents, {len(failed)} failed")
+    print(f"rows      {batch.inserted} documents rows inserted")
+    print(f"pages     {pages} ({megabytes:.1f} MB) in {elapsed:.2f} s")
+    print(
+        f"rate      {pages / elapsed:.1f} pages/s  "
+        f"{megabytes / elapsed:.2f} MB/s"
+    )
+    if vectors:
+        # Loaded by the vector stage already
+        from app.utils.embedding_utils import EMBEDDING_CACHE
+
+        cache = EMBEDDING_CACHE.stats()
+        print(
+            f"vectors   {vectors} in {vector_seconds:.2f} s  "
+            f"{vectors / vector_seconds:.1f} vectors/s"
+        )
+        print(
+            f"cache     {cache['hits']} hits, {cache['misses']} misses "
+            f"({cache['hit_rate']:.1%}), {cache['entries']} cached"
+        )
+
+    if slowest:
+        print("\nslowest files:")
+        for t, n, filename in sorted(slowest, reverse=True):
+            print(f"  {t:8.2f} s  {n:5d} pages  {filename}")
+
+    if failed:
+        print("\nfailed files:")
+        for filename, error in failed:
+            print(f"  {filename}: {error}")
+
+    print()
+
+
+if __name__ == "__main__":
+    main()
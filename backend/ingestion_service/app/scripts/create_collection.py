@@ -1,10 +1,10 @@
-from qdrant_client import QdrantClient
 from qdrant_client.models import VectorParams, Distance
 
-COLLECTION_NAME = "documents"
+from app.utils.qdrant_utils import COLLECTION_NAME, get_qdrant_client
+
 VECTOR_SIZE = 384  # all-MiniLM-L6-v2
 
-client = QdrantClient(host="localhost", port=6333)
+client = get_qdrant_client()
 
 collections = client.get_collections().collections
 existing_names = [c.name for c in collections]
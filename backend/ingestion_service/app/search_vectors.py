@@ -1,10 +1,12 @@
-from qdrant_client import QdrantClient
-from utils.embedding_utils import EmbeddingService
+# Run from backend/ingestion_service: python -m app.search_vectors
+
+from app.utils.embedding_utils import EmbeddingService
+from app.utils.qdrant_utils import get_qdrant_client
 
 COLLECTION_NAME = "documents_chunks"
 
-# Connect to Qdrant
-client = QdrantClient(host="localhost", port=6333)
+# Connect to Qdrant (core/qdrant_config.py)
+client = get_qdrant_client()
 
 # Initialize embedding service
 embedding_service = EmbeddingService()
@@ -0,0 +1,251 @@
+# app/services/ingest_jobs.py
+
+import multiprocessing
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+from app.services.ingest_service import (
+    duplicate_result,
+    extract_document,
+    is_ingested,
+    store_document,
+)
+
+
+# -------------------------------------------------------------------
+# Configuration
+# -------------------------------------------------------------------
+
+# Concurrent ingestions; the rest wait in the queue
+INGEST_WORKERS = 2
+
+# Queued (not yet running) jobs before uploads are refused
+INGEST_QUEUE_SIZE = 16
+
+# Run extraction + indexing in worker processes instead of
+# threads (keeps CPU-heavy parsing off the API process's GIL).
+# Each process then parses its PDF serially.
+INGEST_USE_PROCESSES = False
+
+# Finished jobs stay queryable this long
+JOB_RETENTION_SECONDS = 3600
+
+
+class IngestQueueFull(Exception):
+    """Raised when the ingest queue can't take another job."""
+
+
+# -------------------------------------------------------------------
+# Job record
+# -------------------------------------------------------------------
+
+class IngestJob:
+    def __init__(self, document_id: str, filename: str, file_path: str):
+        self.id = uuid.uuid4().hex
+        self.document_id = document_id
+        self.filename = filename
+        self.file_path = file_path
+
+        self.status = "queued"          # queued | running | done | failed
+        self.pages_processed = 0
+        self.pages_total: Optional[int] = None
+        self.result: Optional[Dict] = None
+        self.error: Optional[str] = None
+
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def progress(self, pages_done: int, pages_total: int) -> None:
+        self.pages_processed = pages_done
+        self.pages_total = pages_total
+
+    def to_dict(self) -> Dict:
+        return {
+            "job_id": self.id,
+            "document_id": self.document_id,
+            "filename": self.filename,
+            "status": self.status,
+            "pages_processed": self.pages_processed,
+            "pages_total": self.pages_total,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+# -------------------------------------------------------------------
+# Process-worker entry (module level, so it can be pickled)
+# -------------------------------------------------------------------
+
+def _extract_in_process(file_path: str, job_id: str, progress_map) -> Dict:
+    def progress(pages_done: int, pages_total: int) -> None:
+        progress_map[job_id] = (pages_done, pages_total)
+
+    return extract_document(file_path, progress=progress, pdf_workers=1)
+
+
+# -------------------------------------------------------------------
+# Bounded queue + worker pool
+# -------------------------------------------------------------------
+
+class IngestJobQueue:
+    """
+    In-process ingestion queue.
+
+    - submit() returns immediately; raises IngestQueueFull
+      when max_queued jobs are already waiting
+    - `workers` threads take jobs in order; each extracts
+      (in a thread, or a worker process) then stores the
+      document in this process
+    - a document already queued or running is not queued twice
+    """
+
+    def __init__(
+        self,
+        workers: int = INGEST_WORKERS,
+        max_queued: int = INGEST_QUEUE_SIZE,
+        use_processes: bool = INGEST_USE_PROCESSES,
+        retention_seconds: float = JOB_RETENTION_SECONDS,
+    ):
+        self.workers = workers
+        self.use_processes = use_processes
+        self.retention_seconds = retention_seconds
+
+        self._queue: "queue.Queue[IngestJob]" = queue.Queue(maxsize=max_queued)
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, IngestJob] = {}
+        self._active: Dict[str, IngestJob] = {}     # document_id -> job
+        self._threads = []
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._progress_map = None
+
+    # ---------------------------------------------------------------
+
+    def _start(self) -> None:
+        if self._threads:
+            return
+
+        if self.use_processes:
+            context = multiprocessing.get_context("spawn")
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=context
+            )
+            self._progress_map = context.Manager().dict()
+
+        for i in range(self.workers):
+            t = threading.Thread(
+                target=self._worker, name=f"ingest-{i}", daemon=True
+            )
+            t.start()
+            self._threads.append(t)
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.retention_seconds
+        for job_id, job in list(self._jobs.items()):
+            if job.finished_at is not None and job.finished_at < cutoff:
+                del self._jobs[job_id]
+
+    def submit(self, document_id: str, filename: str, file_path: str) -> IngestJob:
+        with self._lock:
+            self._start()
+            self._prune()
+
+            active = self._active.get(document_id)
+            if active is not None:
+                return active
+
+            job = IngestJob(document_id, filename, file_path)
+
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                raise IngestQueueFull(
+                    f"Ingest queue is full ({self._queue.maxsize} jobs waiting)"
+                )
+
+            self._jobs[job.id] = job
+            self._active[document_id] = job
+            return job
+
+    def is_active(self, document_id: str) -> bool:
+        """Whether a job for the document is queued or running."""
+
+        with self._lock:
+            return document_id in self._active
+
+    def get(self, job_id: str) -> Optional[IngestJob]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+
+        if job is not None and self._progress_map is not None:
+            progress = self._progress_map.get(job.id)
+            if progress:
+                job.progress(*progress)
+
+        return job
+
+    def stats(self) -> Dict:
+        with self._lock:
+            by_status: Dict[str, int] = {}
+            for job in self._jobs.values():
+                by_status[job.status] = by_status.get(job.status, 0) + 1
+
+            return {
+                "workers": self.workers,
+                "use_processes": self.use_processes,
+                "queued": self._queue.qsize(),
+                "max_queued": self._queue.maxsize,
+                "jobs": by_status,
+            }
+
+    # ---------------------------------------------------------------
+
+    def _run(self, job: IngestJob) -> Dict:
+        if is_ingested(job.document_id):
+            return duplicate_result(job.document_id, job.filename, job.file_path)
+
+        if self._pool is not None:
+            extracted = self._pool.submit(
+                _extract_in_process, job.file_path, job.id, self._progress_map
+            ).result()
+            self._progress_map.pop(job.id, None)
+            job.pages_processed = job.pages_total = extracted["num_pages"]
+        else:
+            extracted = extract_document(job.file_path, progress=job.progress)
+
+        return store_document(
+            job.document_id, job.filename, job.file_path, extracted
+        )
+
+    def _worker(self) -> None:
+        while True:
+            job = self._queue.get()
+            job.status = "running"
+            job.started_at = time.time()
+
+            try:
+                job.result = self._run(job)
+                job.status = "done"
+            except Exception as e:
+                job.error = str(e) or e.__class__.__name__
+                job.status = "failed"
+            finally:
+                job.finished_at = time.time()
+                with self._lock:
+                    self._active.pop(job.document_id, None)
+                self._queue.task_done()
+
+
+# -------------------------------------------------------------------
+# Process-wide queue (used by /upload)
+# -------------------------------------------------------------------
+
+INGEST_QUEUE = IngestJobQueue()
@@ -1,100 +1,373 @@
+import time
 import uuid
-from typing import Dict
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
 
-from app.utils.file_utils import save_temp_file
-from app.utils.pdf_parser import extract_structured_sections_from_pdf
+from app.utils.file_utils import save_upload_file
+from app.utils.pdf_pages import ProgressCallback
+from app.utils.pdf_parser import (
+    iter_parsed_pages,
+    iter_sections,
+    page_courses,
+    resolve_pdf_backend,
+)
 from app.utils.db_utils import insert_document_metadata
-from app.utils.file_hash_utils import generate_file_hash
+from app.utils.embedding_utils import EmbeddingService
+from app.utils.qdrant_utils import write_points
+from app.utils.text_chunker import chunk_words
+from app.core.edue_index import build_edue_index
+from app.core.course_index import build_course_index
+from app.core.edue_store import EDUE_DATA_DIR, EDUEDocumentStore
+from app.services.query_cache import QUERY_CACHE
 
 
 # -------------------------------------------------------------------
-# In-memory EDUE document store (can be DB later)
+# Persistent EDUE document store (.edue files, mapped lazily)
 # -------------------------------------------------------------------
 
-EDUE_DOCUMENT_STORE: Dict[str, Dict] = {}
+EDUE_DOCUMENT_STORE = EDUEDocumentStore(EDUE_DATA_DIR)
 
 
 # -------------------------------------------------------------------
-# Ingestion entrypoint
+# Vector indexing (Qdrant collection searched by rag_utils)
 # -------------------------------------------------------------------
 
-def process_file(file):
-    """
-    Generic PDF ingestion for EDUE.
+# Needs the embedding model and a vector backend (see
+# app.utils.qdrant_utils). Without them the document is still
+# stored; store_document reports vector_index_error instead.
+VECTOR_INDEX_ENABLED = True
 
-    - Stable document_id based on file content
-    - Supports ANY PDF
-    - No loss of existing functionality
+# Characters per chunk, and shared between neighbouring chunks
+CHUNK_SIZE = 500
+CHUNK_OVERLAP = 50
+
+# Texts per encode call; points per upsert request; upsert
+# requests in flight while the next batch is being encoded
+EMBED_BATCH_SIZE = 64
+UPSERT_BATCH_SIZE = 256
+UPSERT_CONCURRENCY = 4
+
+
+# -------------------------------------------------------------------
+# Ingestion stages
+# -------------------------------------------------------------------
+#
+# save_upload (request thread) -> extract_document (CPU, may run
+# in another process) -> store_document (this process: store,
+# cache, DB). process_file runs all three inline; the upload
+# route queues the last two (see app.services.ingest_jobs).
+
+def save_upload(file) -> Tuple[str, str]:
+    """
+    Validate and stream an upload to disk.
+    Returns (file_path, document_id).
     """
 
     if not file.filename.lower().endswith(".pdf"):
         raise ValueError("Only PDF files are supported")
 
-    file_path = save_temp_file(file)
+    # 🔑 STABLE DOCUMENT ID, hashed while the upload is written
+    return save_upload_file(file)
 
-    # 🔑 STABLE DOCUMENT ID
-    document_id = generate_file_hash(file_path)
 
-    # ---------------------------------------------------------------
-    # If document already exists, short-circuit
-    # ---------------------------------------------------------------
+def is_ingested(document_id: str) -> bool:
+    return document_id in EDUE_DOCUMENT_STORE
 
-    if document_id in EDUE_DOCUMENT_STORE:
-        return {
-            "document_id": document_id,
-            "filename": file.filename,
-            "saved_as": file_path,
-            "message": "Document already ingested (reused existing document_id)",
-        }
 
-    # ---------------------------------------------------------------
-    # Extract semantic structure
-    # ---------------------------------------------------------------
+def duplicate_result(document_id: str, filename: str, file_path: str) -> Dict:
+    return {
+        "document_id": document_id,
+        "filename": filename,
+        "saved_as": file_path,
+        "message": "Document already ingested (reused existing document_id)",
+    }
+
+
+def extract_document(
+    file_path: str,
+    progress: Optional[ProgressCallback] = None,
+    pdf_workers: Optional[int] = None,
+) -> Dict:
+    """
+    Parse + index a PDF. Pure function of the file, so it can
+    run in a worker process; the result is picklable.
+
+    Only page parsing is streamed: page records (word boxes
+    included) are dropped once grouped. The sections and the
+    index built from them are held for the whole document,
+    since BM25 needs document-wide term statistics and the
+    .edue writer the finished index.
+    """
+
+    courses: List[Dict] = []
+    counts = {"pages": 0, "parsed": 0}
+
+    # Word boxes (and their cost) only where courses may be,
+    # if PDF_BACKEND is "auto"
+    backend = resolve_pdf_backend(file_path, pdf_workers)
+
+    def pages():
+        # One parse per page feeds both extractors
+        for record in iter_parsed_pages(
+            file_path, pdf_workers, progress, backend
+        ):
+            counts["pages"] += 1
+            counts["parsed"] += not record["cached"]
+            courses.extend(page_courses(record))
+            yield record
 
-    sections = extract_structured_sections_from_pdf(file_path)
+    sections = list(iter_sections(pages()))
 
     if not sections:
         raise ValueError("No readable content found in PDF")
 
+    return {
+        "sections": sections,
+        # Sentence table + postings, so queries skip re-splitting
+        "index": build_edue_index(sections),
+        # Course catalogs additionally get an exact-lookup index
+        "courses": build_course_index(courses) if courses else None,
+        "num_courses": len(courses),
+        "num_pages": counts["pages"],
+        # Pages not served from the per-page extraction cache
+        "pages_parsed": counts["parsed"],
+        "pdf_backend": backend,
+    }
+
+
+def metadata_row(filename: str, file_path: str, sections: List[Dict]) -> Dict:
+    """
+    The documents table row for an extracted document.
+    """
+
+    total_text_len = sum(
+        len(p)
+        for sec in sections
+        for p in sec.get("paragraphs", [])
+    )
+
+    return {
+        "filename": filename,
+        "file_path": file_path,
+        "text_length": total_text_len,
+        "num_chunks": len(sections),
+    }
+
+
+def document_chunks(
+    document_id: str,
+    filename: str,
+    sections: List[Dict],
+) -> Iterator[Dict]:
+    """
+    Chunk payloads for the vector index, numbered across the
+    document.
+    """
+
+    n = 0
+    for sec in sections:
+        for text in chunk_words(sec.get("paragraphs", []), CHUNK_SIZE, CHUNK_OVERLAP):
+            yield {
+                "document_id": document_id,
+                "filename": filename,
+                "section": sec["title"],
+                "pages": sec["pages"],
+                "chunk": n,
+                "text": text,
+            }
+            n += 1
+
+
+def index_document_vectors(
+    document_id: str,
+    filename: str,
+    sections: List[Dict],
+) -> Dict:
+    """
+    Chunk, embed (fixed-size batches) and upsert a document's
+    sections. Upserts overlap with encoding the next batch.
+    Point ids derive from (document_id, chunk), so indexing a
+    document again overwrites its points.
+    """
+
+    from qdrant_client.models import PointStruct
+
+    start = time.perf_counter()
+
+    # Chunks are drawn one encode batch at a time
+    chunks = document_chunks(document_id, filename, sections)
+
+    first = list(islice(chunks, EMBED_BATCH_SIZE))
+    if not first:
+        return {"vectors_indexed": 0, "vectors_per_sec": 0.0}
+
+    embedder = EmbeddingService()
+
+    def batches():
+        points = []
+        batch = first
+
+        while batch:
+            vectors = embedder.embed_texts(
+                [c["text"] for c in batch],
+                batch_size=EMBED_BATCH_SIZE,
+                show_progress_bar=False,
+            )
+
+            points.extend(
+                PointStruct(
+                    id=str(uuid.uuid5(uuid.NAMESPACE_URL, f"{document_id}/{c['chunk']}")),
+                    vector=vector,
+                    payload=c,
+                )
+                for c, vector in zip(batch, vectors)
+            )
+
+            while len(points) >= UPSERT_BATCH_SIZE:
+                yield points[:UPSERT_BATCH_SIZE]
+                points = points[UPSERT_BATCH_SIZE:]
+
+            batch = list(islice(chunks, EMBED_BATCH_SIZE))
+
+        if points:
+            yield points
+
+    written = write_points(batches(), UPSERT_CONCURRENCY)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "vectors_indexed": written,
+        "vectors_per_sec": round(written / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def store_document(
+    document_id: str,
+    filename: str,
+    file_path: str,
+    extracted: Dict,
+    insert_metadata: bool = True,
+    index_vectors: Optional[bool] = None,
+) -> Dict:
+    """
+    Persist an extracted document, index its chunks for RAG
+    and record its metadata.
+
+    insert_metadata=False leaves the DB row to the caller
+    (bulk ingestion batches them; see metadata_row).
+    index_vectors=None follows VECTOR_INDEX_ENABLED.
+    """
+
+    if index_vectors is None:
+        index_vectors = VECTOR_INDEX_ENABLED
+
+    sections = extracted["sections"]
+
     # ---------------------------------------------------------------
     # Persist in EDUE store
     # ---------------------------------------------------------------
 
     EDUE_DOCUMENT_STORE[document_id] = {
         "document_id": document_id,
-        "filename": file.filename,
+        "filename": filename,
         "sections": sections,
+        "index": extracted["index"],
+        "courses": extracted["courses"],
     }
 
+    # Cached answers for this content hash are stale now
+    QUERY_CACHE.invalidate_document(document_id)
+
     # ---------------------------------------------------------------
-    # Metadata for DB / observability
+    # Chunk vectors for RAG
     # ---------------------------------------------------------------
 
-    total_text_len = sum(
-        len(p)
-        for sec in sections
-        for p in sec.get("paragraphs", [])
-    )
+    vectors: Dict = {}
+    if index_vectors:
+        try:
+            vectors = index_document_vectors(document_id, filename, sections)
+        except Exception as e:
+            # The EDUE store has the document; only RAG misses it
+            vectors = {"vector_index_error": str(e) or e.__class__.__name__}
 
-    insert_document_metadata(
-        filename=file.filename,
-        file_path=file_path,
-        text_length=total_text_len,
-        num_chunks=len(sections),
-    )
+    # ---------------------------------------------------------------
+    # Metadata for DB / observability
+    # ---------------------------------------------------------------
+
+    if insert_metadata:
+        insert_document_metadata(**metadata_row(filename, file_path, sections))
 
     return {
         "document_id": document_id,
-        "filename": file.filename,
+        "filename": filename,
         "saved_as": file_path,
         "sections_extracted": len(sections),
+        "courses_indexed": extracted["num_courses"],
+        "pages": extracted["num_pages"],
+        "pages_parsed": extracted["pages_parsed"],
+        "pdf_backend": extracted["pdf_backend"],
+        **vectors,
         "message": "File uploaded and processed successfully",
     }
 
 
+# -------------------------------------------------------------------
+# Ingestion entrypoint (synchronous)
+# -------------------------------------------------------------------
+
+def process_file(file):
+    """
+    Generic PDF ingestion for EDUE.
+
+    - Stable document_id based on file content
+    - Supports ANY PDF
+    - No loss of existing functionality
+    """
+
+    file_path, document_id = save_upload(file)
+
+    # ---------------------------------------------------------------
+    # If document already exists, short-circuit
+    # ---------------------------------------------------------------
+
+    if is_ingested(document_id):
+        return duplicate_result(document_id, file.filename, file_path)
+
+    # ---------------------------------------------------------------
+    # Extract semantic structure
+    # ---------------------------------------------------------------
+
+    extracted = extract_document(file_path)
+
+    return store_document(document_id, file.filename, file_path, extracted)
+
+
 # -------------------------------------------------------------------
 # Document fetch
 # -------------------------------------------------------------------
 
 def get_document_by_id(document_id: str):
     return EDUE_DOCUMENT_STORE.get(document_id)
+
+
+def get_documents(
+    document_ids: Optional[List[str]] = None,
+    terms: Optional[List[str]] = None,
+) -> List[Dict]:
+    """
+    All ingested documents, or only the requested ids
+    (unknown ids are skipped). With terms, only documents
+    holding at least one of them (the rest aren't mapped).
+    """
+
+    if terms is not None:
+        document_ids = EDUE_DOCUMENT_STORE.with_terms(terms, document_ids)
+
+    if document_ids is None:
+        return list(EDUE_DOCUMENT_STORE.values())
+
+    return [
+        EDUE_DOCUMENT_STORE[d]
+        for d in document_ids
+        if d in EDUE_DOCUMENT_STORE
+    ]
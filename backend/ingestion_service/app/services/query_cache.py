@@ -0,0 +1,184 @@
+# app/services/query_cache.py
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Set, Tuple
+
+from app.core.edue_query import ENGINES, query_key
+
+
+# -------------------------------------------------------------------
+# Configuration
+# -------------------------------------------------------------------
+
+CACHE_MAX_ENTRIES = 4096
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+CACHE_TTL_SECONDS = 3600
+
+
+def normalize_question(question: str, engine: Hashable) -> Hashable:
+    """
+    The question part of a cache key: only what changes the
+    result of `engine`. EDUE engines key on what query_edue
+    reads (see query_key), so "What is a data warehouse?" and
+    "what a data warehouse" stay apart while "What is X?" and
+    "WHAT IS X?" share an entry. Any other engine keys on
+    the whitespace-folded question.
+    """
+
+    if engine in ENGINES:
+        return query_key(question, engine)
+
+    return " ".join(question.split())
+
+
+# -------------------------------------------------------------------
+# Bounded LRU + TTL cache
+# -------------------------------------------------------------------
+
+class QueryResultCache:
+    """
+    Thread-safe LRU cache for query results.
+
+    - bounded by entry count and by approximate result size
+    - entries expire after ttl_seconds
+    - keys are (document_id, engine, normalized question);
+      document_id is the file content hash, so every entry
+      of a document can be dropped when it is re-ingested
+    """
+
+    def __init__(
+        self,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        max_bytes: int = CACHE_MAX_BYTES,
+        ttl_seconds: float = CACHE_TTL_SECONDS,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        # key -> (expires_at, size, value)
+        self._entries: "OrderedDict[Tuple, Tuple[float, int, Dict]]" = OrderedDict()
+        self._by_document: Dict[str, Set[Tuple]] = {}
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    # ---------------------------------------------------------------
+
+    def _drop(self, key: Tuple) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+        keys = self._by_document.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_document[key[0]]
+
+    def get(self, key: Tuple):
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            if entry[0] < time.monotonic():
+                self._drop(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key: Tuple, value: Dict) -> None:
+        size = len(json.dumps(value, default=str))
+
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+
+            self._entries[key] = (
+                time.monotonic() + self.ttl_seconds, size, value
+            )
+            self._bytes += size
+            self._by_document.setdefault(key[0], set()).add(key)
+
+            while (
+                len(self._entries) > self.max_entries
+                or self._bytes > self.max_bytes
+            ):
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def invalidate_document(self, document_id: str) -> int:
+        with self._lock:
+            keys = list(self._by_document.get(document_id, ()))
+            for key in keys:
+                self._drop(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_document.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+    # ---------------------------------------------------------------
+
+    def get_or_compute(
+        self,
+        document_id: str,
+        engine: Hashable,
+        question: str,
+        compute: Callable[[], Dict],
+    ) -> Dict:
+        key = (document_id, engine, normalize_question(question, engine))
+
+        cached = self.get(key)
+        if cached is not None:
+            # Same normalized question, possibly different wording
+            return {**cached, "question": question}
+
+        result = compute()
+        self.put(key, result)
+        return result
+
+
+# -------------------------------------------------------------------
+# Process-wide cache (/edue/query)
+# -------------------------------------------------------------------
+
+QUERY_CACHE = QueryResultCache()
@@ -1,4 +1,6 @@
-from utils.db_utils import get_db_connection
+# Run from backend/ingestion_service: python -m app.test_db
+
+from app.utils.db_utils import get_db_connection
 
 def test_connection():
     conn = get_db_connection()
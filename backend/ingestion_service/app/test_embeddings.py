@@ -1,4 +1,6 @@
-from utils.embedding_utils import EmbeddingService
+# Run from backend/ingestion_service: python -m app.test_embeddings
+
+from app.utils.embedding_utils import EmbeddingService
 
 if __name__ == "__main__":
     service = EmbeddingService()
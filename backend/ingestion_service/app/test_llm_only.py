@@ -1,4 +1,6 @@
-from utils.ollama_utils import generate_answer_from_context
+# Run from backend/ingestion_service: python -m app.test_llm_only
+
+from app.utils.ollama_utils import generate_answer_from_context
 
 
 def ask(question: str):
@@ -1,4 +1,6 @@
-from utils.qdrant_utils import get_qdrant_client
+# Run from backend/ingestion_service: python -m app.test_qdrant
+
+from app.utils.qdrant_utils import get_qdrant_client
 
 def test_qdrant():
     client = get_qdrant_client()
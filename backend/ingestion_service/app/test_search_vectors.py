@@ -1,5 +1,7 @@
-from utils.embedding_utils import embed_query
-from utils.qdrant_utils import search_vectors
+# Run from backend/ingestion_service: python -m app.test_search_vectors
+
+from app.utils.embedding_utils import embed_query
+from app.utils.qdrant_utils import search_vectors
 
 query = "financial highlights"
 
@@ -1,8 +1,10 @@
-import psycopg
 from app.core.db_config import DB_CONFIG
 
 
 def get_db_connection():
+    # Imported on first use (startup cost; EDUE-only use never connects)
+    import psycopg
+
     return psycopg.connect(
         host=DB_CONFIG["host"],
         port=DB_CONFIG["port"],
@@ -27,3 +29,30 @@ def insert_document_metadata(filename, file_path, text_length, num_chunks):
     conn.commit()
     cur.close()
     conn.close()
+
+
+def insert_document_metadata_batch(rows):
+    """
+    Insert many documents rows in one transaction.
+    rows: dicts with filename, file_path, text_length, num_chunks.
+    """
+    if not rows:
+        return
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+
+    cur.executemany(
+        """
+        INSERT INTO documents (filename, file_path, text_length, num_chunks)
+        VALUES (%s, %s, %s, %s)
+        """,
+        [
+            (r["filename"], r["file_path"], r["text_length"], r["num_chunks"])
+            for r in rows
+        ],
+    )
+
+    conn.commit()
+    cur.close()
+    conn.close()
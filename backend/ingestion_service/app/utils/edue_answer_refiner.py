@@ -1,54 +1,108 @@
 # app/utils/edue_answer_refiner.py
 
-import re
-from typing import List, Dict, Tuple
+import heapq
+from typing import Dict, Iterator, List, Set, Tuple
+
+# STOPWORDS / tokenize are shared with EDUE and re-exported here
+from app.utils.text_normalizer import (
+    STOPWORDS,
+    fold_whitespace,
+    split_sentences,
+    tokenize,
+)
+
+__all__ = [
+    # Re-exported for code that imported them from here
+    "STOPWORDS",
+    "tokenize",
+    "split_into_sentences",
+    "score_sentence",
+    "refine_edue_answer",
+]
 
 
-STOPWORDS = {
-    "the", "is", "are", "and", "or", "of", "to", "in", "for",
-    "with", "on", "by", "an", "a", "as", "from", "that"
-}
+def split_into_sentences(text: str) -> List[str]:
+    # Robust sentence splitting for PDFs
+    return split_sentences(fold_whitespace(text))
 
 
-def tokenize(text: str) -> List[str]:
-    return [
-        t.lower()
-        for t in re.findall(r"[a-zA-Z0-9]+", text)
-        if t.lower() not in STOPWORDS
-    ]
+def _has_phrase(sentence_tokens: List[str], question_tokens: List[str]) -> bool:
+    """
+    Exact token match: a one-word question must appear as a
+    whole token, longer ones need an adjacent question bigram
+    in the same order.
+    """
 
+    if len(question_tokens) == 1:
+        return question_tokens[0] in sentence_tokens
 
-def split_into_sentences(text: str) -> List[str]:
-    # Robust sentence splitting for PDFs
-    text = re.sub(r"\s+", " ", text)
-    return re.split(r"(?<=[.!?])\s+", text)
+    positions: Dict[str, List[int]] = {}
+    for pos, t in enumerate(sentence_tokens):
+        positions.setdefault(t, []).append(pos)
 
+    for a, b in zip(question_tokens, question_tokens[1:]):
+        following = positions.get(b)
+        if following and any(p + 1 in following for p in positions.get(a, ())):
+            return True
 
-def score_sentence(
-    sentence: str,
+    return False
+
+
+def _score_tokens(
+    sentence_tokens: List[str],
     question_tokens: List[str],
-    header: str = ""
+    header_tokens: Set[str],
 ) -> float:
-    sentence_tokens = tokenize(sentence)
     if not sentence_tokens:
         return 0.0
 
     overlap = len(set(sentence_tokens) & set(question_tokens))
     overlap_score = overlap / max(len(question_tokens), 1)
 
-    phrase_bonus = 0.2 if any(
-        q in sentence.lower() for q in question_tokens
+    phrase_bonus = 0.2 if question_tokens and _has_phrase(
+        sentence_tokens, question_tokens
     ) else 0.0
 
-    header_bonus = 0.1 if header and any(
-        q in header.lower() for q in question_tokens
-    ) else 0.0
+    header_bonus = 0.1 if header_tokens.intersection(question_tokens) else 0.0
 
     length_penalty = 0.1 if len(sentence_tokens) > 40 else 0.0
 
     return overlap_score + phrase_bonus + header_bonus - length_penalty
 
 
+def score_sentence(
+    sentence: str,
+    question_tokens: List[str],
+    header: str = ""
+) -> float:
+    return _score_tokens(
+        tokenize(sentence),
+        question_tokens,
+        set(tokenize(header)),
+    )
+
+
+def _scored_sentences(
+    question_tokens: List[str],
+    sections: List[Dict],
+) -> Iterator[Dict]:
+    for sec in sections:
+        header_tokens = set(tokenize(sec.get("header", "")))
+        page = sec.get("page")
+
+        for para in sec.get("paragraphs", []):
+            for s in split_into_sentences(para):
+                score = _score_tokens(
+                    tokenize(s), question_tokens, header_tokens
+                )
+                if score > 0:
+                    yield {
+                        "sentence": s.strip(),
+                        "score": score,
+                        "page": page
+                    }
+
+
 def refine_edue_answer(
     question: str,
     sections: List[Dict],
@@ -63,32 +117,16 @@ def refine_edue_answer(
 
     question_tokens = tokenize(question)
 
-    scored_sentences = []
-
-    for sec in sections:
-        header = sec.get("header", "")
-        page = sec.get("page")
-
-        for para in sec.get("paragraphs", []):
-            sentences = split_into_sentences(para)
-            for s in sentences:
-                score = score_sentence(s, question_tokens, header)
-                if score > 0:
-                    scored_sentences.append({
-                        "sentence": s.strip(),
-                        "score": score,
-                        "page": page
-                    })
-
-    if not scored_sentences:
-        return "Information is not available.", 0.05, []
-
-    scored_sentences.sort(
+    # Bounded top-k: only top_k sentences are ever kept,
+    # ties stay in document order (same as a stable sort)
+    top_sentences = heapq.nlargest(
+        top_k,
+        _scored_sentences(question_tokens, sections),
         key=lambda x: x["score"],
-        reverse=True
     )
 
-    top_sentences = scored_sentences[:top_k]
+    if not top_sentences:
+        return "Information is not available.", 0.05, []
 
     answer = " ".join(s["sentence"] for s in top_sentences)
     pages = sorted(set(s["page"] for s in top_sentences if s["page"]))
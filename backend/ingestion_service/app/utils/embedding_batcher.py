@@ -0,0 +1,182 @@
+# app/utils/embedding_batcher.py
+
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+
+# ============================================================
+# Dynamic micro-batching
+# ============================================================
+#
+# A model call costs a fixed overhead plus a small per-item
+# cost, so N concurrent single-item calls waste most of their
+# CPU. Callers enqueue one item and block on a future; one
+# collector thread takes the first waiting item, keeps
+# collecting until max_batch items or max_wait_ms after that
+# item arrived, runs fn once on the batch and fans the results
+# back out.
+#
+# Items that queued while the previous batch was running are
+# already past their deadline, so under load batches fill
+# without any added wait; a lone request waits max_wait_ms.
+#
+# Every future of a batch is resolved, whatever happens: callers
+# that cancelled are dropped before fn runs, and a failing or
+# short fn fails the whole batch. The collector thread survives
+# any error in a batch.
+
+_Entry = Tuple[Any, Future, float]
+
+
+class MicroBatcher:
+    """
+    Thread-safe micro-batcher around fn(items) -> results
+    (same length and order).
+
+    - __call__(item) blocks until its result is ready;
+      submit(item) returns the Future
+    - an exception from fn, or a result count that doesn't
+      match the batch, is raised in every caller of that batch
+    - cancelled futures are skipped (fn never sees their items)
+    - stats(): batch fill and queueing delay
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[List[Any]], Sequence[Any]],
+        max_batch: int = 32,
+        max_wait_ms: float = 5.0,
+    ):
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+
+        self._queue: "queue.Queue[_Entry]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+        self.batches = 0
+        self.items = 0
+        self.full_batches = 0
+        self.errors = 0
+        self.cancelled = 0
+        self._delay_total = 0.0
+        self._delay_max = 0.0
+        self._run_total = 0.0
+
+    # ---------------------------------------------------------------
+
+    def submit(self, item: Any) -> Future:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._worker, name="micro-batcher", daemon=True
+                    )
+                    self._thread.start()
+
+        future: Future = Future()
+        self._queue.put((item, future, time.perf_counter()))
+        return future
+
+    def __call__(self, item: Any) -> Any:
+        return self.submit(item).result()
+
+    # ---------------------------------------------------------------
+
+    def _collect(self) -> List[_Entry]:
+        batch = [self._queue.get()]
+        deadline = batch[0][2] + self.max_wait_ms / 1000
+
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.perf_counter()
+            try:
+                if timeout > 0:
+                    batch.append(self._queue.get(timeout=timeout))
+                else:
+                    # Past the deadline: take only what's waiting
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _worker(self) -> None:
+        while True:
+            batch = self._collect()
+
+            try:
+                self._run(batch)
+            except Exception as e:
+                # Never leave a caller waiting
+                for _, future, _ in batch:
+                    try:
+                        future.set_exception(e)
+                    except InvalidStateError:
+                        pass
+
+    def _run(self, collected: List[_Entry]) -> None:
+        # Running futures can't be cancelled any more
+        batch = [e for e in collected if e[1].set_running_or_notify_cancel()]
+
+        with self._lock:
+            self.cancelled += len(collected) - len(batch)
+
+        if not batch:
+            return
+
+        start = time.perf_counter()
+
+        try:
+            results = self.fn([item for item, _, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(
+                    f"Batch function returned {len(results)} results "
+                    f"for {len(batch)} items"
+                )
+        except Exception as e:
+            for _, future, _ in batch:
+                future.set_exception(e)
+            results = None
+
+        finished = time.perf_counter()
+
+        if results is not None:
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
+
+        delays = [start - queued for _, _, queued in batch]
+
+        with self._lock:
+            self.batches += 1
+            self.items += len(batch)
+            self.full_batches += len(batch) == self.max_batch
+            self.errors += results is None
+            self._delay_total += sum(delays)
+            self._delay_max = max(self._delay_max, max(delays))
+            self._run_total += finished - start
+
+    # ---------------------------------------------------------------
+
+    def stats(self) -> Dict:
+        with self._lock:
+            batches = self.batches or 1
+            items = self.items or 1
+            return {
+                "max_batch": self.max_batch,
+                "max_wait_ms": self.max_wait_ms,
+                "batches": self.batches,
+                "items": self.items,
+                "avg_batch_size": round(self.items / batches, 2),
+                "avg_fill": round(self.items / batches / self.max_batch, 4),
+                "full_batches": self.full_batches,
+                "errors": self.errors,
+                "cancelled": self.cancelled,
+                "avg_queue_delay_ms": round(self._delay_total / items * 1000, 3),
+                "max_queue_delay_ms": round(self._delay_max * 1000, 3),
+                "avg_batch_ms": round(self._run_total / batches * 1000, 3),
+                "queued": self._queue.qsize(),
+            }
@@ -0,0 +1,327 @@
+# app/utils/embedding_cache.py
+
+import hashlib
+import os
+import re
+import struct
+import threading
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.utils.file_lock import exclusive_lock, shared_lock
+from app.utils.text_normalizer import fold_whitespace
+
+
+# ============================================================
+# Persistent embedding cache
+# ============================================================
+#
+# Catalog revisions and boilerplate sections (policies,
+# learning outcomes) produce the same chunk text again and
+# again. Vectors are cached on disk, keyed by a hash of
+# (model name, normalized text), one file per model:
+#
+#   <model>.emb = header | row | row | ...
+#   header      = magic "EMBC" | version u32 | dim u32 | u32 0
+#   row         = 16-byte key | float32[dim]
+#
+# Rows are only ever appended, a whole batch per os.write, so
+# other processes (API server, bulk ingest) can share the file.
+# Writers append (and compact, or replace a file in another
+# format) under an exclusive lock on <model>.emb.lock; readers
+# hold it shared while they read the file. A torn trailing row
+# can only be left by a crash: readers ignore it, the next
+# writer cuts it off. The key -> row index is kept in memory,
+# built from the key column on first use and extended as the
+# file grows. Vectors are read through a memory map (mapped
+# per lookup, so the file can be replaced).
+#
+# Past the size limits the file is compacted: the rows this
+# process used most recently (then the newest) are rewritten
+# to a new file that replaces the old one.
+
+EMBEDDING_CACHE_DIR = Path("data") / "embedding_cache"
+EMBEDDING_CACHE_MAX_BYTES = 512 * 1024 * 1024
+EMBEDDING_CACHE_MAX_ENTRIES = 250_000
+EMBEDDING_CACHE_ENABLED = True
+
+# Fraction of the limits a compaction keeps
+EMBEDDING_CACHE_KEEP = 0.5
+
+_HEADER = struct.Struct("<4sIII")
+_MAGIC = b"EMBC"
+_VERSION = 1
+_KEY_BYTES = 16
+
+# Model name -> file name
+_UNSAFE_FILENAME = re.compile(r"[^\w.-]+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Unicode-composed, whitespace folded and stripped: the
+    tokenizer sees these variants as the same text.
+    """
+
+    return fold_whitespace(unicodedata.normalize("NFC", text)).strip()
+
+
+def text_key(model_name: str, text: str) -> bytes:
+    h = hashlib.blake2b(digest_size=_KEY_BYTES)
+    h.update(model_name.encode("utf-8"))
+    h.update(b"\0")
+    h.update(normalize_text(text).encode("utf-8"))
+    return h.digest()
+
+
+class EmbeddingCache:
+    """
+    Append-only, memory-mapped vector cache for one model.
+
+    - lookup() returns the cached vectors and which texts
+      still need encoding; put() appends the new vectors
+    - thread-safe; processes share the file (see above)
+    - bounded by file size and row count (compaction)
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        root: Path = EMBEDDING_CACHE_DIR,
+        max_bytes: int = EMBEDDING_CACHE_MAX_BYTES,
+        max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES,
+    ):
+        self.model_name = model_name
+        self.path = Path(root) / (_UNSAFE_FILENAME.sub("_", model_name) + ".emb")
+        self.lock_path = self.path.with_name(self.path.name + ".lock")
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._tick = 0
+        self._reset()
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.compactions = 0
+
+    # ---------------------------------------------------------------
+    # File state (all under self._lock and the file lock)
+    # ---------------------------------------------------------------
+
+    def _reset(self) -> None:
+        self._dim: Optional[int] = None
+        self._inode: Optional[int] = None
+        self._rows: Dict[bytes, int] = {}
+        self._count = 0
+        # Per row: last lookup/put tick in this process
+        self._last_used = np.zeros(0, dtype=np.int64)
+
+    def _row_dtype(self) -> np.dtype:
+        return np.dtype([
+            ("key", f"V{_KEY_BYTES}"),
+            ("vector", "<f4", (self._dim,)),
+        ])
+
+    def _map(self, rows: int) -> np.memmap:
+        return np.memmap(
+            self.path, dtype=self._row_dtype(), mode="r",
+            offset=_HEADER.size, shape=(rows,),
+        )
+
+    def _refresh(self) -> int:
+        """
+        Index rows appended since the last call (by any
+        process). Returns the file size.
+        """
+
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self._reset()
+            return 0
+
+        # Replaced by a compaction (here or elsewhere)
+        if self._inode is not None and st.st_ino != self._inode:
+            self._reset()
+
+        if self._dim is None:
+            with open(self.path, "rb") as f:
+                header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                return st.st_size
+
+            magic, version, dim, _ = _HEADER.unpack(header)
+            if magic != _MAGIC or version != _VERSION:
+                # Foreign / old format: empty until put replaces it
+                return 0
+
+            self._dim, self._inode = dim, st.st_ino
+
+        rows = (st.st_size - _HEADER.size) // self._row_dtype().itemsize
+
+        if rows > self._count:
+            keys = np.ascontiguousarray(self._map(rows)["key"][self._count:])
+            raw = keys.tobytes()
+            for i in range(rows - self._count):
+                self._rows[raw[i * _KEY_BYTES:(i + 1) * _KEY_BYTES]] = self._count + i
+
+            self._last_used = np.concatenate(
+                [self._last_used, np.zeros(rows - self._count, dtype=np.int64)]
+            )
+            self._count = rows
+
+        return st.st_size
+
+    def _create(self, dim: int) -> None:
+        # Missing, or no usable header (foreign format, crash
+        # while creating); the exclusive lock keeps others out
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, dim, 0))
+
+    def _compact(self) -> None:
+        row_bytes = self._row_dtype().itemsize
+        keep = int(
+            min(self.max_entries, (self.max_bytes - _HEADER.size) // row_bytes)
+            * EMBEDDING_CACHE_KEEP
+        )
+
+        # Most recently used last; never used -> newest last
+        order = np.zeros(0, dtype=np.intp)
+        if keep > 0:
+            order = np.sort(np.argsort(self._last_used, kind="stable")[-keep:])
+
+        tmp = self.path.with_suffix(".tmp")
+        try:
+            with open(tmp, "wb") as f:
+                f.write(_HEADER.pack(_MAGIC, _VERSION, self._dim, 0))
+                if len(order):
+                    f.write(self._map(self._count)[order].tobytes())
+            os.replace(tmp, self.path)
+        except OSError:
+            # e.g. mapped by another process on Windows: retry
+            # on a later put
+            if tmp.exists():
+                tmp.unlink()
+            return
+
+        last_used = self._last_used[order]
+        self._reset()
+        self._refresh()
+        self._last_used[:len(last_used)] = last_used
+        self.compactions += 1
+
+    # ---------------------------------------------------------------
+    # Public API
+    # ---------------------------------------------------------------
+
+    def keys(self, texts: Sequence[str]) -> List[bytes]:
+        return [text_key(self.model_name, t) for t in texts]
+
+    def lookup(
+        self, keys: Sequence[bytes]
+    ) -> Tuple[Optional[np.ndarray], List[int]]:
+        """
+        (vectors, missing): a float32 (len(keys), dim) array
+        with the cached rows filled in (None if nothing is
+        cached), and the positions that weren't found.
+        """
+
+        # No compaction replaces the file while it's mapped
+        with self._lock, shared_lock(self.lock_path):
+            self._refresh()
+
+            rows = [self._rows.get(k, -1) for k in keys]
+            found = [i for i, r in enumerate(rows) if r >= 0]
+            missing = [i for i, r in enumerate(rows) if r < 0]
+
+            self.hits += len(found)
+            self.misses += len(missing)
+
+            if not found:
+                return None, missing
+
+            row_ids = np.asarray([rows[i] for i in found], dtype=np.intp)
+            self._tick += 1
+            self._last_used[row_ids] = self._tick
+
+            vectors = np.zeros((len(keys), self._dim), dtype=np.float32)
+            vectors[found] = self._map(self._count)["vector"][row_ids]
+
+        return vectors, missing
+
+    def put(self, keys: Sequence[bytes], vectors) -> None:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if not len(keys):
+            return
+
+        with self._lock, exclusive_lock(self.lock_path):
+            # No other writer is mid-append while the lock is held
+            size = self._refresh()
+            if self._dim is None:
+                self._create(vectors.shape[1])
+                size = self._refresh()
+
+            if self._dim != vectors.shape[1]:
+                return
+
+            # New keys only (also once per batch)
+            new: Dict[bytes, int] = {}
+            for i, k in enumerate(keys):
+                if k not in self._rows and k not in new:
+                    new[k] = i
+            if not new:
+                return
+
+            records = np.empty(len(new), dtype=self._row_dtype())
+            records["key"] = np.frombuffer(
+                b"".join(new), dtype=f"V{_KEY_BYTES}"
+            )
+            records["vector"] = vectors[list(new.values())]
+
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | getattr(os, "O_BINARY", 0))
+            try:
+                # Drop a torn row from a crashed write first
+                torn = (size - _HEADER.size) % records.itemsize
+                if torn:
+                    os.ftruncate(fd, size - torn)
+                data = memoryview(records.tobytes())
+                while data:
+                    data = data[os.write(fd, data):]
+            finally:
+                os.close(fd)
+
+            self.writes += len(new)
+            self._refresh()
+
+            self._tick += 1
+            self._last_used[[self._rows[k] for k in new]] = self._tick
+
+            if (
+                self._count > self.max_entries
+                or _HEADER.size + self._count * records.itemsize > self.max_bytes
+            ):
+                self._compact()
+
+    def stats(self) -> Dict:
+        with self._lock, shared_lock(self.lock_path):
+            size = self._refresh()
+            lookups = self.hits + self.misses
+            return {
+                "model": self.model_name,
+                "entries": self._count,
+                "bytes": size,
+                "dim": self._dim,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "writes": self.writes,
+                "compactions": self.compactions,
+            }
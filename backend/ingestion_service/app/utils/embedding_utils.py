@@ -1,17 +1,75 @@
-from sentence_transformers import SentenceTransformer
+import threading
 from typing import List
 
+import numpy as np
+
+from app.utils import embedding_cache
+from app.utils.embedding_batcher import MicroBatcher
+from app.utils.embedding_cache import EmbeddingCache
+
 MODEL_NAME = "all-MiniLM-L6-v2"
 
-# Singleton model (important: load once)
-_model = SentenceTransformer(MODEL_NAME)
+# Singleton model (important: load once), loaded on first use
+# or by warm_up(): importing this module must stay cheap, since
+# sentence_transformers pulls in torch (seconds, hundreds of MB)
+_model = None
+_model_lock = threading.Lock()
+
+# Vectors of previously embedded texts (see app.utils.embedding_cache)
+EMBEDDING_CACHE = EmbeddingCache(MODEL_NAME)
+
+# Concurrent embed_query calls share one encode: a batch runs
+# at QUERY_BATCH_MAX_SIZE queries, or QUERY_BATCH_MAX_WAIT_MS
+# after its first query arrived (see app.utils.embedding_batcher)
+QUERY_BATCHING_ENABLED = True
+QUERY_BATCH_MAX_SIZE = 32
+QUERY_BATCH_MAX_WAIT_MS = 5.0
+
+
+def get_model():
+    global _model
+
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                from sentence_transformers import SentenceTransformer
+
+                _model = SentenceTransformer(MODEL_NAME)
+    return _model
+
+
+def warm_up() -> None:
+    """
+    Load the model and run one encode (first calls also pay
+    for lazy torch initialisation). Call at startup to keep
+    that off the first request.
+    """
+    get_model().encode(["warm up"], convert_to_numpy=True)
+
+
+def _encode_queries(texts: List[str]) -> np.ndarray:
+    return get_model().encode(
+        texts,
+        batch_size=len(texts),
+        convert_to_numpy=True
+    )
+
+
+QUERY_BATCHER = MicroBatcher(
+    _encode_queries,
+    max_batch=QUERY_BATCH_MAX_SIZE,
+    max_wait_ms=QUERY_BATCH_MAX_WAIT_MS,
+)
 
 
 def embed_query(text: str) -> List[float]:
     """
     Embed a single query string into a vector
     """
-    embedding = _model.encode(
+    if QUERY_BATCHING_ENABLED:
+        return QUERY_BATCHER(text).tolist()
+
+    embedding = get_model().encode(
         text,
         convert_to_numpy=True
     )
@@ -23,13 +81,47 @@ class EmbeddingService:
     Used for bulk embeddings (PDF ingestion, chunking, etc.)
     """
 
-    def __init__(self):
-        self.model = _model
+    @property
+    def model(self):
+        return get_model()
+
+    def embed_texts(
+        self,
+        texts: List[str],
+        batch_size: int = 32,
+        show_progress_bar: bool = True,
+    ) -> List[List[float]]:
+        if not embedding_cache.EMBEDDING_CACHE_ENABLED or not texts:
+            return self._encode(texts, batch_size, show_progress_bar).tolist()
+
+        # Only cache misses are encoded, each distinct text once
+        keys = EMBEDDING_CACHE.keys(texts)
+        vectors, missing = EMBEDDING_CACHE.lookup(keys)
+
+        if missing:
+            todo = {}
+            for i in missing:
+                todo.setdefault(keys[i], i)
+
+            encoded = self._encode(
+                [texts[i] for i in todo.values()], batch_size, show_progress_bar
+            )
+            EMBEDDING_CACHE.put(list(todo), encoded)
+
+            if vectors is None:
+                vectors = np.empty((len(texts), encoded.shape[1]), dtype=np.float32)
+
+            row = {k: j for j, k in enumerate(todo)}
+            vectors[missing] = encoded[[row[keys[i]] for i in missing]]
+
+        return vectors.tolist()
 
-    def embed_texts(self, texts: List[str]) -> List[List[float]]:
-        embeddings = self.model.encode(
+    def _encode(
+        self, texts: List[str], batch_size: int, show_progress_bar: bool
+    ) -> np.ndarray:
+        return self.model.encode(
             texts,
+            batch_size=batch_size,
             convert_to_numpy=True,
-            show_progress_bar=True
+            show_progress_bar=show_progress_bar
         )
-        return embeddings.tolist()
@@ -2,14 +2,20 @@
 
 import hashlib
 
+from app.utils.file_utils import UPLOAD_CHUNK_SIZE
+
+
 def generate_file_hash(file_path: str) -> str:
     """
     Generate a stable document ID based on file content.
+
+    Uploads get the same hash from save_upload_file while
+    they are written; this is for files already on disk.
     """
     sha256 = hashlib.sha256()
 
     with open(file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
+        for chunk in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b""):
             sha256.update(chunk)
 
     return sha256.hexdigest()
@@ -0,0 +1,62 @@
+# app/utils/file_lock.py
+
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import ContextManager, Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+# ============================================================
+# Inter-process locks
+# ============================================================
+#
+# Held on a side file (created on first use, never removed).
+# Blocking, and released by the OS when the holder dies, so a
+# crashed writer never leaves it held. Separate opens conflict
+# even within one process, so threads are serialized too.
+#
+# A shared lock lets other shared holders in but no exclusive
+# one. Windows has no shared file locks: there it is exclusive.
+
+
+@contextmanager
+def _file_lock(path: Path, shared: bool) -> Iterator[None]:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        else:
+            # LK_LOCK gives up after ~10 s of retries: keep waiting
+            while True:
+                try:
+                    msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+
+        try:
+            yield
+        finally:
+            if fcntl is None:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    finally:
+        # Closing also drops a flock
+        os.close(fd)
+
+
+def exclusive_lock(path: Path) -> ContextManager[None]:
+    return _file_lock(path, shared=False)
+
+
+def shared_lock(path: Path) -> ContextManager[None]:
+    return _file_lock(path, shared=True)
@@ -1,17 +1,55 @@
+import hashlib
 import os
+import tempfile
+from typing import Tuple
 
 UPLOAD_DIR = "uploaded_files"
 
+# Uploads are streamed to disk in chunks of this size
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
 # Create directory if not exists
 if not os.path.exists(UPLOAD_DIR):
     os.makedirs(UPLOAD_DIR)
 
+
+def save_upload_file(file) -> Tuple[str, str]:
+    """
+    Stream an upload to UPLOAD_DIR, computing its SHA-256 in
+    the same pass. Returns (file_path, sha256 hex).
+
+    The bytes go to a private temp file first and are renamed
+    to "<hash prefix>_<filename>", so concurrent uploads that
+    share a filename never overwrite each other's content.
+    """
+
+    sha256 = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(
+        dir=UPLOAD_DIR, prefix=".upload-", suffix=".part"
+    )
+
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in iter(lambda: file.file.read(UPLOAD_CHUNK_SIZE), b""):
+                sha256.update(chunk)
+                f.write(chunk)
+
+        digest = sha256.hexdigest()
+        name = os.path.basename(file.filename or "upload")
+        file_path = f"{UPLOAD_DIR}/{digest[:16]}_{name}"
+
+        # Same name + same hash means same bytes: replacing is safe
+        os.replace(tmp_path, file_path)
+
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    return file_path, digest
+
+
 def save_temp_file(file):
     """Save uploaded file temporarily."""
-    file_path = f"{UPLOAD_DIR}/{file.filename}"
-
-    with open(file_path, "wb") as f:
-        content = file.file.read()
-        f.write(content)
-    
+    file_path, _ = save_upload_file(file)
     return file_path
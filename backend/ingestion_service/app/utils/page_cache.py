@@ -0,0 +1,240 @@
+# app/utils/page_cache.py
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+# ============================================================
+# Content-addressed per-page extraction cache
+# ============================================================
+#
+# A revised catalog is a new document (new file hash), but most
+# of its pages are byte-for-byte the same drawing. Pages are
+# keyed by a hash of what text extraction depends on:
+#
+#   - the decoded content stream(s)
+#   - the page resources (fonts, widths, ToUnicode maps, form
+#     XObjects), minus embedded font programs and image data
+#   - page box and rotation
+#
+# so an unchanged page skips pdfplumber layout analysis.
+# Entries are one JSON file each (safe across pool workers);
+# least recently used entries are evicted past the limits.
+#
+# Each process tallies the cache size once (first write) and
+# then counts its own writes; only when the tally passes a
+# limit does it scan again and evict down to the low-water
+# mark. Writes of other processes since their last scan can
+# overshoot the limits by that much until the next eviction.
+
+PAGE_CACHE_DIR = Path("data") / "page_cache"
+PAGE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+PAGE_CACHE_MAX_ENTRIES = 50_000
+PAGE_CACHE_ENABLED = True
+
+# evict() trims to this share of the limits, so the next scan
+# is many writes away
+PAGE_CACHE_LOW_WATER = 0.9
+
+# Bump when the cached record layout or the extraction changes
+PAGE_CACHE_VERSION = 4
+
+# Don't affect extracted text, expensive to decode
+_SKIP_KEYS = {"Parent", "FontFile", "FontFile2", "FontFile3"}
+
+
+def page_key(page) -> str:
+    """
+    Content hash of a pdfplumber page.
+    """
+
+    # pdfminer is loaded with the page already; importing it
+    # here keeps it out of `import app.main`
+    from pdfminer.pdftypes import PDFObjRef, PDFStream
+
+    h = hashlib.sha256(f"v{PAGE_CACHE_VERSION}".encode("utf-8"))
+    h.update(repr((page.bbox, page.rotation)).encode("utf-8"))
+
+    seen: set = set()
+
+    def feed(obj) -> None:
+        # Stable digest of a PDF object graph. Object numbers
+        # are not hashed (they change between revisions); an
+        # object reached twice is hashed once.
+
+        if isinstance(obj, PDFObjRef):
+            if obj.objid in seen:
+                h.update(b"@")
+                return
+            seen.add(obj.objid)
+            obj = obj.resolve()
+
+        if isinstance(obj, PDFStream):
+            h.update(b"S")
+            feed(obj.attrs)
+            subtype = obj.attrs.get("Subtype")
+            if getattr(subtype, "name", None) != "Image":
+                h.update(obj.get_data())
+        elif isinstance(obj, dict):
+            h.update(b"{")
+            for k in sorted(obj):
+                if k not in _SKIP_KEYS:
+                    h.update(str(k).encode("utf-8"))
+                    feed(obj[k])
+            h.update(b"}")
+        elif isinstance(obj, (list, tuple)):
+            h.update(b"[")
+            for item in obj:
+                feed(item)
+            h.update(b"]")
+        else:
+            h.update(repr(obj).encode("utf-8"))
+
+    page_obj = page.page_obj
+
+    for stream in page_obj.contents:
+        feed(stream)
+
+    feed(page_obj.resources)
+
+    return h.hexdigest()
+
+
+class PageCache:
+    """
+    Disk-backed cache of per-page extraction records.
+
+    - one JSON file per page key, sharded by key prefix
+    - writes are temp file + rename (pool workers share it)
+    - hits refresh the file mtime; evict() drops the oldest
+      entries until both the byte and entry limits hold
+    - put() evicts (to the low-water mark) once this
+      process's tally of the cache size passes a limit
+    """
+
+    def __init__(
+        self,
+        root: Path = PAGE_CACHE_DIR,
+        max_bytes: int = PAGE_CACHE_MAX_BYTES,
+        max_entries: int = PAGE_CACHE_MAX_ENTRIES,
+    ):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        # [bytes, entries], None until the first write scans
+        self._usage: Optional[List[int]] = None
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict]:
+        path = self._path(key)
+
+        try:
+            record = json.loads(path.read_text(encoding="utf-8"))
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+
+        return record
+
+    def put(self, key: str, record: Dict) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(record, f)
+                size = f.tell()
+            os.replace(tmp, path)
+        except OSError:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            return
+
+        self._added(size)
+
+    def _added(self, size: int) -> None:
+        with self._lock:
+            if self._usage is None:
+                # Includes the entry just written
+                entries = self._entries()
+                self._usage = [sum(s for _, s, _ in entries), len(entries)]
+            else:
+                self._usage[0] += size
+                self._usage[1] += 1
+
+            over = (
+                self._usage[0] > self.max_bytes
+                or self._usage[1] > self.max_entries
+            )
+
+        if over:
+            self.evict(PAGE_CACHE_LOW_WATER)
+
+    def _entries(self):
+        if not self.root.exists():
+            return []
+
+        entries = []
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".json"):
+                    st = entry.stat()
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+        return entries
+
+    def evict(self, low_water: float = 1.0) -> int:
+        """
+        Drop least recently used entries until both limits
+        (scaled by low_water) hold. Returns the number of
+        entries removed.
+        """
+
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        count = len(entries)
+        removed = 0
+
+        max_bytes = self.max_bytes * low_water
+        max_entries = self.max_entries * low_water
+
+        for _, size, path in sorted(entries):
+            if total <= max_bytes and count <= max_entries:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            count -= 1
+            removed += 1
+
+        with self._lock:
+            self._usage = [total, count]
+
+        return removed
+
+    def stats(self) -> Dict:
+        entries = self._entries()
+        return {
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+        }
+
+
+# Process-wide instance (each pool worker gets its own handle
+# on the same directory)
+PAGE_CACHE = PageCache()
@@ -0,0 +1,188 @@
+# app/utils/pdf_pages.py
+
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Iterator, List, Optional
+
+
+# ============================================================
+# Per-page PDF fan-out
+# ============================================================
+#
+# pdfplumber layout analysis is CPU-bound and pages are
+# independent, so extraction runs a page function over
+# contiguous page ranges in a process pool. Each worker opens
+# the file itself and returns one result per page; results
+# come back in page order.
+#
+# iter_pages streams results: only a bounded number of ranges
+# are submitted or finished-but-unconsumed at any time, so a
+# very long PDF never has all of its page records in memory.
+
+PDF_WORKERS = os.cpu_count() or 1
+
+# Below this many pages per worker the pool costs more than
+# it saves (file open + IPC per range)
+MIN_PAGES_PER_WORKER = 8
+
+# More ranges than workers so uneven pages balance out; also
+# the number of ranges per worker kept in flight when streaming
+RANGES_PER_WORKER = 2
+
+# Long documents are split further so a range's results stay
+# small (bounds memory when streaming)
+MAX_PAGES_PER_RANGE = 32
+
+# page_fn(page, page_number) -> per-page result (picklable,
+# module-level so workers can import it)
+PageFunction = Callable[[Any, int], Any]
+
+# progress(pages_done, pages_total), called in the caller's process
+ProgressCallback = Callable[[int, int], None]
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            # spawn: the API process runs threads, fork isn't safe
+            _pool = ProcessPoolExecutor(
+                max_workers=PDF_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+# pdfplumber (and pdfminer under it) is imported where a file
+# is opened: the API process starts without it, pool workers
+# load it once on their first range.
+
+def count_pages(file_path: str) -> int:
+    import pdfplumber
+
+    with pdfplumber.open(file_path) as pdf:
+        return len(pdf.pages)
+
+
+def iter_page_range(
+    file_path: str,
+    start: int,
+    end: int,
+    page_fn: PageFunction,
+    progress: Optional[ProgressCallback] = None,
+) -> Iterator[Any]:
+    """
+    page_fn over pages [start, end) (0-based) of one open
+    file, one result at a time.
+    """
+
+    import pdfplumber
+
+    with pdfplumber.open(file_path, pages=list(range(start + 1, end + 1))) as pdf:
+        for done, page in enumerate(pdf.pages, 1):
+            result = page_fn(page, page.page_number)
+            # Drop pdfplumber's per-page layout cache
+            page.close()
+
+            if progress:
+                progress(done, end - start)
+
+            yield result
+
+
+def extract_page_range(
+    file_path: str,
+    start: int,
+    end: int,
+    page_fn: PageFunction,
+    progress: Optional[ProgressCallback] = None,
+) -> List[Any]:
+    """
+    Run page_fn over pages [start, end) (0-based) of one open
+    file. Used as the pool worker.
+    """
+
+    return list(iter_page_range(file_path, start, end, page_fn, progress))
+
+
+def iter_pages(
+    file_path: str,
+    page_fn: PageFunction,
+    workers: Optional[int] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> Iterator[Any]:
+    """
+    page_fn applied to every page, yielded in page order.
+
+    workers=None uses PDF_WORKERS; small files (or workers=1)
+    are handled serially in the calling process. progress is
+    called per page (serial) or per range (pool).
+    """
+
+    num_pages = count_pages(file_path)
+
+    workers = PDF_WORKERS if workers is None else workers
+    workers = min(workers, PDF_WORKERS, num_pages // MIN_PAGES_PER_WORKER)
+
+    if workers <= 1:
+        yield from iter_page_range(file_path, 0, num_pages, page_fn, progress)
+        return
+
+    ranges = max(
+        workers * RANGES_PER_WORKER,
+        -(-num_pages // MAX_PAGES_PER_RANGE),
+    )
+    ranges = min(num_pages, ranges)
+    bounds = [num_pages * i // ranges for i in range(ranges + 1)]
+    pending = iter(zip(bounds, bounds[1:]))
+
+    pool = _get_pool()
+    in_flight = deque()
+
+    def submit() -> None:
+        page_range = next(pending, None)
+        if page_range is not None:
+            start, end = page_range
+            in_flight.append(
+                pool.submit(extract_page_range, file_path, start, end, page_fn)
+            )
+
+    for _ in range(workers * RANGES_PER_WORKER):
+        submit()
+
+    done = 0
+
+    try:
+        while in_flight:
+            chunk = in_flight.popleft().result()
+            submit()
+
+            done += len(chunk)
+            if progress:
+                progress(done, num_pages)
+
+            yield from chunk
+    finally:
+        # Consumer stopped early: don't parse the rest
+        for future in in_flight:
+            future.cancel()
+
+
+def map_pages(
+    file_path: str,
+    page_fn: PageFunction,
+    workers: Optional[int] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> List[Any]:
+    """
+    page_fn applied to every page, in page order.
+    """
+
+    return list(iter_pages(file_path, page_fn, workers, progress))
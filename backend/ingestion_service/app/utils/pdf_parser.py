@@ -1,6 +1,12 @@
-import pdfplumber
 import re
-from typing import List, Dict
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from app.utils import page_cache
+from app.utils.pdf_pages import ProgressCallback, iter_pages
+from app.utils.text_normalizer import fold_whitespace
 
 
 # ============================================================
@@ -11,77 +17,500 @@ COURSE_HEADER_PATTERN = re.compile(
     r"(AE\*?\s*ZG\d{3})\s+(.+?)\s+(\d)$"
 )
 
+# A course code anywhere in a line (backend detection: plain
+# text lines interleave columns, so headers rarely end a line)
+COURSE_CODE_PATTERN = re.compile(r"AE\*?\s*ZG\d{3}")
+
 
 def normalize_course_code(text: str) -> str:
     text = text.upper().replace("*", "")
-    text = re.sub(r"\s+", " ", text)
-    return text.strip()
+    return fold_whitespace(text).strip()
+
 
+# ============================================================
+# SINGLE-PASS PAGE PARSE (shared by both extractors)
+# ============================================================
+#
+# pdfplumber caches a page's characters on the Page object, so
+# words and text lines taken from the same page pay for layout
+# analysis once. Each page becomes one record:
+#
+#   {"page": n, "width": w, "lines": [...], "cached": bool,
+#    "words": {"x0": array, "x1": array, "top": array, "text": [...]}}
+#
+# Word boxes are float64 arrays, column-wise: compact and cheap
+# to pickle out of pool workers (the disk cache stores them as
+# lists).
+#
+# Records are also cached on disk by page content hash (see
+# app.utils.page_cache), so unchanged pages of a revised PDF
+# skip layout analysis altogether.
+
+def _page_cache_key(page, backend: str) -> Optional[str]:
+    if not page_cache.PAGE_CACHE_ENABLED:
+        return None
+
+    try:
+        # Backends produce different records for the same page
+        return f"{page_cache.page_key(page)}-{backend}"
+    except Exception:
+        # Malformed page objects: just don't cache the page
+        return None
+
+
+_BOX_FIELDS = ("x0", "x1", "top")
+
+
+def _with_box_arrays(record: Dict) -> Dict:
+    words = record["words"]
+    for field in _BOX_FIELDS:
+        words[field] = np.asarray(words[field], dtype=np.float64)
+    return record
+
+
+def _split_lines(text: str) -> List[str]:
+    return [l.strip() for l in text.split("\n") if l.strip()] if text else []
+
+
+def _parse_page(page, page_idx: int) -> Dict:
+    key = _page_cache_key(page, "layout")
+
+    cached = page_cache.PAGE_CACHE.get(key) if key else None
+    if cached is not None:
+        return {"page": page_idx, "cached": True, **_with_box_arrays(cached)}
+
+    text = page.extract_text()
+    words = page.extract_words(use_text_flow=True)
+
+    record = {
+        "width": page.width,
+        "words": {
+            field: [w[field] for w in words]
+            for field in (*_BOX_FIELDS, "text")
+        },
+        "lines": _split_lines(text),
+    }
 
-def extract_courses_from_pdf(file_path: str) -> List[Dict]:
+    if key:
+        page_cache.PAGE_CACHE.put(key, record)
+
+    return {"page": page_idx, "cached": False, **_with_box_arrays(record)}
+
+
+# ------------------------------------------------------------
+# Text-only backend
+# ------------------------------------------------------------
+#
+# Most of pdfplumber's per-page cost is not pdfminer's content
+# stream interpretation but what it does afterwards: one dict
+# per character, then word grouping over those dicts. Generic
+# documents only need text lines, so this backend reads the
+# characters straight off pdfminer's layout tree (pdfplumber
+# leaves pdfminer's own layout analysis off) and rebuilds
+# extract_text()'s lines with NumPy:
+#
+#   chars -> line clusters by top -> words (gap / overlap /
+#   whitespace breaks) -> word line clusters -> joined lines
+#
+# Records carry no word boxes, so they can't feed the course
+# extractor.
+
+# pdfplumber's extract_text() defaults
+TEXT_X_TOLERANCE = 3
+TEXT_Y_TOLERANCE = 3
+
+_LIGATURES = {
+    "\ufb00": "ff",
+    "\ufb03": "ffi",
+    "\ufb04": "ffl",
+    "\ufb01": "fi",
+    "\ufb02": "fl",
+    "\ufb06": "st",
+    "\ufb05": "st",
+}
+
+
+def _layout_chars(objs) -> List:
     """
-    Layout-aware course extractor.
-    Returns structured course entities with page numbers.
+    LTChar objects of a layout tree, in layout order. Walked
+    with an explicit stack, so pdfminer is looked up once per
+    page rather than once per container.
     """
 
-    courses = []
+    # Page workers have pdfminer loaded already; the API
+    # process imports this module without it
+    from pdfminer.layout import LTChar, LTContainer
 
-    with pdfplumber.open(file_path) as pdf:
-        for page_idx, page in enumerate(pdf.pages, start=1):
-            words = page.extract_words(use_text_flow=True)
+    chars = []
+    stack = [iter(objs)]
 
-            if not words:
-                continue
+    while stack:
+        for obj in stack[-1]:
+            if isinstance(obj, LTChar):
+                chars.append(obj)
+            elif isinstance(obj, LTContainer):
+                stack.append(iter(obj))
+                break
+        else:
+            stack.pop()
 
-            page_width = page.width
-            mid_x = page_width / 2
+    return chars
 
-            left_col = [w for w in words if w["x0"] < mid_x]
-            right_col = [w for w in words if w["x0"] >= mid_x]
-            columns = [c for c in (left_col, right_col) if c]
 
-            page_lines = []
+def _top_clusters(top: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Cluster id per value: sorted distinct values chained while
+    each is within `tolerance` of the previous one.
+    """
 
-            for col in columns:
-                col.sort(key=lambda w: (w["top"], w["x0"]))
-                line, last_top = "", None
+    values, inverse = np.unique(top, return_inverse=True)
+    cluster = np.cumsum(np.diff(values, prepend=values[0]) > tolerance)
+    return cluster[inverse.ravel()]
+
+
+def _text_lines(texts: List[str], x0, x1, top) -> List[str]:
+    # Characters into lines, left to right within each
+    line = _top_clusters(top, TEXT_Y_TOLERANCE)
+    order = np.argsort(x0, kind="stable")
+    order = order[np.argsort(line[order], kind="stable")]
+
+    # Whitespace only ends words
+    blank = np.fromiter((t.isspace() for t in texts), bool, len(texts))
+    after_blank = np.zeros(len(order), dtype=bool)
+    after_blank[1:] = blank[order][:-1]
+    order, after_blank = order[~blank[order]], after_blank[~blank[order]]
+
+    if not len(order):
+        return []
+
+    line, x0, x1, top = line[order], x0[order], x1[order], top[order]
+
+    # A word breaks on a new line, after whitespace, when a char
+    # starts left of the previous one or past its gap tolerance
+    # (pdfplumber's char_begins_new_word)
+    starts = np.ones(len(order), dtype=bool)
+    starts[1:] = (
+        (np.diff(line) != 0)
+        | after_blank[1:]
+        | (x0[1:] < x0[:-1])
+        | (x0[1:] > x1[:-1] + TEXT_X_TOLERANCE)
+        | (np.abs(np.diff(top)) > TEXT_Y_TOLERANCE)
+    )
+    first = np.flatnonzero(starts)
+    bounds = [*first.tolist(), len(order)]
+
+    chars = [texts[i] for i in order.tolist()]
+    words = [
+        "".join(_LIGATURES.get(c, c) for c in chars[start:end])
+        for start, end in zip(bounds, bounds[1:])
+    ]
+    word_x0 = x0[first]
+    word_top = np.minimum.reduceat(top, first)
+
+    # Words into lines: by cluster, then x0 (ties keep top order)
+    word_line = _top_clusters(word_top, TEXT_Y_TOLERANCE)
+    order = np.argsort(word_top, kind="stable")
+    order = order[np.argsort(word_x0[order], kind="stable")]
+    order = order[np.argsort(word_line[order], kind="stable")]
+
+    breaks = np.flatnonzero(np.diff(word_line[order]) != 0) + 1
+    bounds = [0, *breaks.tolist(), len(order)]
+    ordered = [words[i] for i in order.tolist()]
+
+    return [
+        " ".join(ordered[start:end])
+        for start, end in zip(bounds, bounds[1:])
+    ]
+
+
+def _parse_page_text(page, page_idx: int) -> Dict:
+    key = _page_cache_key(page, "text")
+
+    cached = page_cache.PAGE_CACHE.get(key) if key else None
+    if cached is not None:
+        return {"page": page_idx, "cached": True, **_with_box_arrays(cached)}
+
+    chars = _layout_chars(page.layout)
+    lines: List[str] = []
+
+    if chars:
+        # Same coordinates as pdfplumber's char dicts
+        mb_x0, mb_top = page.mediabox[:2]
+        texts = [c.get_text() for c in chars]
+        x0 = np.fromiter((c.x0 for c in chars), np.float64, len(chars)) + mb_x0
+        x1 = np.fromiter((c.x1 for c in chars), np.float64, len(chars))
+        top = page.height - np.fromiter(
+            (c.y1 for c in chars), np.float64, len(chars)
+        ) + mb_top
+
+        lines = _split_lines("\n".join(_text_lines(texts, x0, x1, top)))
+
+    record = {
+        "width": page.width,
+        "words": {field: [] for field in (*_BOX_FIELDS, "text")},
+        "lines": lines,
+    }
 
-                for w in col:
-                    if last_top is None or abs(w["top"] - last_top) < 5:
-                        line += " " + w["text"]
-                    else:
-                        page_lines.append(line.strip())
-                        line = w["text"]
-                    last_top = w["top"]
+    if key:
+        page_cache.PAGE_CACHE.put(key, record)
 
-                if line.strip():
-                    page_lines.append(line.strip())
+    return {"page": page_idx, "cached": False, **_with_box_arrays(record)}
 
-            current_course = None
 
-            for line in page_lines:
-                match = COURSE_HEADER_PATTERN.match(line)
-                if match:
-                    if current_course:
-                        courses.append(current_course)
+# ------------------------------------------------------------
+# Backend selection
+# ------------------------------------------------------------
 
-                    code_raw, title, credits = match.groups()
-                    current_course = {
-                        "course_code": normalize_course_code(code_raw),
-                        "title": title.strip(),
-                        "credits": int(credits),
-                        "description": "",
-                        "page": page_idx,
-                    }
-                elif current_course:
-                    current_course["description"] += " " + line
+# name -> page function (see app.utils.pdf_pages)
+#   layout: pdfplumber text + word boxes (course catalogs)
+#   text:   text lines only, several times cheaper per page
+PDF_BACKENDS = {
+    "layout": _parse_page,
+    "text": _parse_page_text,
+}
+
+DEFAULT_PDF_BACKEND = "layout"
+
+# Backend used for ingestion: a PDF_BACKENDS name, or "auto" to
+# pick one per document (detect_pdf_backend: an extra text pass
+# over the whole file). "layout" is always safe; "text" drops
+# the word boxes, so a course catalog would lose its courses.
+PDF_BACKEND = DEFAULT_PDF_BACKEND
+
+
+def iter_parsed_pages(
+    file_path: str,
+    workers: Optional[int] = None,
+    progress: Optional[ProgressCallback] = None,
+    backend: str = DEFAULT_PDF_BACKEND,
+) -> Iterator[Dict]:
+    """
+    Page records in page order, streamed: a record can be
+    dropped once consumed, so long PDFs never hold every
+    page's words at once.
+    """
+
+    if backend not in PDF_BACKENDS:
+        raise ValueError(f"Unknown PDF backend: {backend}")
+
+    # The page cache evicts on write, once it grows past its limits
+    yield from iter_pages(file_path, PDF_BACKENDS[backend], workers, progress)
+
+
+def parse_pdf(
+    file_path: str,
+    workers: Optional[int] = None,
+    progress: Optional[ProgressCallback] = None,
+    backend: str = DEFAULT_PDF_BACKEND,
+) -> List[Dict]:
+    """
+    One record per page, in page order. Pages are parsed in
+    parallel (see app.utils.pdf_pages).
+    """
+
+    return list(iter_parsed_pages(file_path, workers, progress, backend))
+
+
+# ============================================================
+# COURSE DETECTION
+# ============================================================
+
+# Words whose tops differ by less than this share a line
+LINE_TOP_TOLERANCE = 5
+
+# Candidate column margins: x positions where text resumes after
+# a horizontal gap at least this wide (pt), or a row begins;
+# starts within COLUMN_ALIGN pt of each other are one margin
+COLUMN_MIN_GAP = 10
+COLUMN_ALIGN = 3
+
+# A margin is a column edge if at most this many word boxes
+# cross it (centered titles, page numbers). Paragraph indents
+# are crossed by the lines around them.
+COLUMN_MAX_CROSSINGS = 2
+
+# Columns narrower than this fraction of the text width, or
+# with fewer words, are merged into a neighbour (wide spaces in
+# justified lines, centered page numbers)
+COLUMN_MIN_WIDTH = 0.25
+COLUMN_MIN_WORDS = 2
+
+
+def _column_bounds(
+    x0: np.ndarray,
+    x1: np.ndarray,
+    row: np.ndarray,
+) -> List[float]:
+    """
+    x positions splitting a page into columns, detected from
+    the word boxes and their rows. Empty for single-column
+    pages.
+    """
+
+    lo, hi = float(x0.min()), float(x1.max())
+
+    # Left to right in each row
+    order = np.argsort(row * (hi - lo + 1.0) + (x0 - lo))
+    sx0, sx1, srow = x0[order], x1[order], row[order]
+
+    # Segment starts: first word of a row, or after a wide gap
+    is_start = np.empty(len(order), dtype=bool)
+    is_start[0] = True
+    is_start[1:] = (np.diff(srow) != 0) | (sx0[1:] - sx1[:-1] >= COLUMN_MIN_GAP)
+    starts = np.sort(sx0[is_start])
+
+    # Aligned starts -> one candidate margin (support = rows)
+    first = np.flatnonzero(np.diff(starts, prepend=-np.inf) >= COLUMN_ALIGN)
+    support = np.diff(first, append=len(starts))
+    bounds = starts[first] - COLUMN_ALIGN / 2
+
+    # Boxes with x0 < b < x1: those starting left of b minus
+    # those also ending there (x0 <= x1)
+    crossings = (
+        np.searchsorted(np.sort(x0), bounds)
+        - np.searchsorted(np.sort(x1), bounds, side="right")
+    )
+    keep = (crossings <= COLUMN_MAX_CROSSINGS) & (bounds > lo)
+    bounds, support = bounds[keep], support[keep]
+
+    if not len(bounds):
+        return []
+
+    counts = np.bincount(
+        np.searchsorted(bounds, x0), minlength=len(bounds) + 1
+    ).tolist()
+    bounds, support = bounds.tolist(), support.tolist()
+
+    # Few columns: merge the offenders in plain Python
+    while bounds:
+        edges = [lo, *bounds, hi]
+        bad = [
+            (edges[i + 1] - edges[i], i)
+            for i in range(len(counts))
+            if edges[i + 1] - edges[i] < COLUMN_MIN_WIDTH * (hi - lo)
+            or counts[i] < COLUMN_MIN_WORDS
+        ]
+        if not bad:
+            break
+
+        # Narrowest offender loses its weaker edge (fewer rows
+        # start there); on a tie it joins the column before it
+        _, worst = min(bad)
+        drop = min(
+            (i for i in (worst - 1, worst) if 0 <= i < len(bounds)),
+            key=lambda i: support[i],
+        )
+        counts[drop:drop + 2] = [counts[drop] + counts[drop + 1]]
+        del bounds[drop], support[drop]
+
+    return bounds
+
+
+def _page_course_lines(record: Dict) -> List[str]:
+    """
+    Column-aware line reconstruction from word boxes: columns
+    in reading order, lines top to bottom within each. Rows
+    crossing a column edge (titles, page numbers) stay whole,
+    between the column text above and below them.
+    """
+
+    words = record["words"]
+    text = words["text"]
+
+    if not text:
+        return []
+
+    x0, x1, top = words["x0"], words["x1"], words["top"]
+
+    # By top, then x0 (two stable passes; cheaper than lexsort)
+    by_top = np.argsort(x0, kind="stable")
+    by_top = by_top[np.argsort(top[by_top], kind="stable")]
+
+    # Rows across the whole page
+    row = np.empty(len(x0), dtype=np.intp)
+    row[by_top] = np.cumsum(
+        np.diff(top[by_top], prepend=top[by_top[0]]) >= LINE_TOP_TOLERANCE
+    )
+
+    bounds = np.asarray(_column_bounds(x0, x1, row))
+    columns = len(bounds) + 1
+
+    # One group per column between spanning rows, one per
+    # spanning row; numbered in reading order
+    crosses = ((x0[:, None] < bounds) & (bounds < x1[:, None])).any(axis=1)
+    spanning = np.zeros(row[by_top[-1]] + 1, dtype=np.intp)
+    spanning[row[crosses]] = 1
+    band = 2 * (np.cumsum(spanning) - spanning) + spanning
+
+    group = band[row] * columns
+    group += np.where(spanning[row] == 1, 0, np.searchsorted(bounds, x0))
+
+    # Group, then top, then x0
+    order = by_top[np.argsort(group[by_top], kind="stable")]
+    top, group = top[order], group[order]
+
+    # New line when the group changes or the top jumps
+    breaks = np.flatnonzero(
+        (np.diff(top) >= LINE_TOP_TOLERANCE) | (np.diff(group) != 0)
+    ) + 1
+    edges = [0, *breaks.tolist(), len(order)]
+
+    ordered = itemgetter(*order.tolist())(text) if len(order) > 1 else text
 
+    # Each line joined once
+    return [
+        " ".join(ordered[start:end])
+        for start, end in zip(edges, edges[1:])
+    ]
+
+
+def page_courses(record: Dict) -> List[Dict]:
+    """
+    Course entities of one page (courses never span pages).
+    """
+
+    courses = []
+    current_course = None
+
+    for line in _page_course_lines(record):
+        match = COURSE_HEADER_PATTERN.match(line)
+        if match:
             if current_course:
                 courses.append(current_course)
 
+            code_raw, title, credits = match.groups()
+            current_course = {
+                "course_code": normalize_course_code(code_raw),
+                "title": title.strip(),
+                "credits": int(credits),
+                "description": "",
+                "page": record["page"],
+            }
+        elif current_course:
+            current_course["description"] += " " + line
+
+    if current_course:
+        courses.append(current_course)
+
     return courses
 
 
+def courses_from_pages(pages: Iterable[Dict]) -> List[Dict]:
+    return [course for record in pages for course in page_courses(record)]
+
+
+def extract_courses_from_pdf(
+    file_path: str,
+    workers: Optional[int] = None,
+) -> List[Dict]:
+    """
+    Layout-aware course extractor.
+    Returns structured course entities with page numbers.
+    """
+
+    return courses_from_pages(parse_pdf(file_path, workers))
+
+
 # ============================================================
 # GENERIC DOCUMENT PARSER (NEW)
 # ============================================================
@@ -91,68 +520,127 @@ GENERIC_HEADER_PATTERN = re.compile(
 )
 
 
-def extract_structured_sections_from_pdf(file_path: str) -> List[Dict]:
+def iter_sections(pages: Iterable[Dict]) -> Iterator[Dict]:
     """
-    Generic header + paragraph extractor.
-    Works for books, research papers, specs, manuals.
+    Header / paragraph grouping over page records in page
+    order. A section runs on across pages until the next
+    header, and is yielded as soon as that header appears.
     """
 
-    sections: List[Dict] = []
     current_section = None
 
-    with pdfplumber.open(file_path) as pdf:
-        for page_idx, page in enumerate(pdf.pages, start=1):
-            text = page.extract_text()
-            if not text:
-                continue
-
-            lines = [l.strip() for l in text.split("\n") if l.strip()]
-
-            for line in lines:
-                # Heuristic: header lines
-                is_header = (
-                    len(line) < 120
-                    and GENERIC_HEADER_PATTERN.match(line)
-                    and line.isupper()
-                )
-
-                if is_header:
-                    if current_section:
-                        sections.append(current_section)
-
+    for record in pages:
+        page_idx = record["page"]
+
+        for line in record["lines"]:
+            # Heuristic: header lines
+            is_header = (
+                len(line) < 120
+                and GENERIC_HEADER_PATTERN.match(line)
+                and line.isupper()
+            )
+
+            if is_header:
+                if current_section:
+                    yield current_section
+
+                current_section = {
+                    "title": line,
+                    "paragraphs": [],
+                    "pages": [page_idx],
+                }
+            else:
+                if not current_section:
                     current_section = {
-                        "title": line,
+                        "title": "Introduction",
                         "paragraphs": [],
                         "pages": [page_idx],
                     }
-                else:
-                    if not current_section:
-                        current_section = {
-                            "title": "Introduction",
-                            "paragraphs": [],
-                            "pages": [page_idx],
-                        }
 
-                    current_section["paragraphs"].append(line)
-                    if page_idx not in current_section["pages"]:
-                        current_section["pages"].append(page_idx)
+                current_section["paragraphs"].append(line)
+                # Pages arrive in order: only the last one can repeat
+                if current_section["pages"][-1] != page_idx:
+                    current_section["pages"].append(page_idx)
+
+    if current_section:
+        yield current_section
 
-        if current_section:
-            sections.append(current_section)
 
-    return sections
+def sections_from_pages(pages: Iterable[Dict]) -> List[Dict]:
+    return list(iter_sections(pages))
+
+
+def iter_structured_sections_from_pdf(
+    file_path: str,
+    workers: Optional[int] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> Iterator[Dict]:
+    """
+    Streaming form of extract_structured_sections_from_pdf:
+    the iterator itself holds the open section plus the pages
+    in flight; keeping the sections is up to the caller.
+    """
+
+    return iter_sections(iter_parsed_pages(file_path, workers, progress))
+
+
+def extract_structured_sections_from_pdf(
+    file_path: str,
+    workers: Optional[int] = None,
+) -> List[Dict]:
+    """
+    Generic header + paragraph extractor.
+    Works for books, research papers, specs, manuals.
+    """
+
+    return list(iter_structured_sections_from_pdf(file_path, workers))
 
 
 # ============================================================
 # AUTO-DETECTOR (used by ingest_service)
 # ============================================================
 
+def detect_pdf_backend(file_path: str, workers: Optional[int] = None) -> str:
+    """
+    "layout" when any page mentions a course code (the course
+    extractor needs word boxes), else "text".
+
+    Every page is read with the text backend until a code
+    turns up. Those pages go through the page cache, so the
+    extraction pass over a generic document reuses them.
+    """
+
+    probe = iter_parsed_pages(file_path, workers, backend="text")
+
+    try:
+        for record in probe:
+            if any(COURSE_CODE_PATTERN.search(l) for l in record["lines"]):
+                return "layout"
+    finally:
+        probe.close()
+
+    return "text"
+
+
+def resolve_pdf_backend(file_path: str, workers: Optional[int] = None) -> str:
+    """
+    The backend PDF_BACKEND selects for a file.
+    """
+
+    if PDF_BACKEND == "auto":
+        return detect_pdf_backend(file_path, workers)
+
+    return PDF_BACKEND
+
+
 def auto_extract_pdf(file_path: str) -> Dict:
     """
     Automatically chooses the best extraction strategy.
     """
 
-    courses = extract_courses_from_pdf(file_path)
+    backend = detect_pdf_backend(file_path)
+    pages = parse_pdf(file_path, backend=backend)
+    courses = courses_from_pages(pages)
 
     if courses:
         return {
@@ -167,8 +655,8 @@ def auto_extract_pdf(file_path: str) -> Dict:
             ],
         }
 
-    # Fallback to generic parsing
-    sections = extract_structured_sections_from_pdf(file_path)
+    # Fallback to generic parsing (same page records)
+    sections = sections_from_pages(pages)
     return {
         "type": "generic_document",
         "sections": sections,
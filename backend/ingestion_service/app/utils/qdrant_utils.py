@@ -1,33 +1,262 @@
-from typing import List, Dict, Any, Optional
+import asyncio
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Iterable, List, Dict, Any, Optional
 
-from qdrant_client import QdrantClient
-from qdrant_client.models import Filter, FieldCondition, MatchValue
+from app.core.qdrant_config import QDRANT_CONFIG
+
+# qdrant_client takes over a second to import: it's imported
+# where it's used, so startup (and EDUE-only use) doesn't pay
+if TYPE_CHECKING:
+    from qdrant_client import AsyncQdrantClient, QdrantClient
+    from qdrant_client.models import PointStruct
 
 # -------------------------
 # Qdrant configuration
 # -------------------------
-QDRANT_HOST = "localhost"
-QDRANT_PORT = 6333
+QDRANT_HOST = QDRANT_CONFIG["host"]
+QDRANT_PORT = QDRANT_CONFIG["port"]
 COLLECTION_NAME = "documents"
 
+# "qdrant": the server above. "numpy": the embedded index in
+# app.core.vector_index (single node, or offline runs and
+# benchmarks with no server); same results shape.
+VECTOR_BACKEND = "qdrant"
+
 
 # -------------------------
 # Client factory (SINGLE SOURCE)
 # -------------------------
-def get_qdrant_client() -> QdrantClient:
+#
+# One client per process, created on first use: it keeps a
+# pool of keep-alive HTTP connections (or gRPC channels), so
+# connection setup isn't paid per query. Clients are thread-
+# safe; a forked child builds its own. The async client is
+# per event loop (its connections belong to that loop).
+
+_client: Optional["QdrantClient"] = None
+_client_pid: Optional[int] = None
+_client_lock = threading.Lock()
+
+_async_clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _client_options() -> Dict[str, Any]:
+    return {
+        "host": QDRANT_CONFIG["host"],
+        "port": QDRANT_CONFIG["port"],
+        "grpc_port": QDRANT_CONFIG["grpc_port"],
+        "prefer_grpc": QDRANT_CONFIG["prefer_grpc"],
+        "timeout": QDRANT_CONFIG["timeout"],
+        "pool_size": QDRANT_CONFIG["pool_size"],
+        "check_compatibility": QDRANT_CONFIG["check_compatibility"],
+    }
+
+
+def get_qdrant_client() -> "QdrantClient":
     """
-    Single place to create Qdrant client.
+    Single place to get the Qdrant client.
     Used by app + tests.
     """
-    return QdrantClient(
-        host=QDRANT_HOST,
-        port=QDRANT_PORT,
+    global _client, _client_pid
+
+    if _client is None or _client_pid != os.getpid():
+        with _client_lock:
+            if _client is None or _client_pid != os.getpid():
+                from qdrant_client import QdrantClient
+
+                _client = QdrantClient(**_client_options())
+                _client_pid = os.getpid()
+    return _client
+
+
+def get_async_qdrant_client() -> "AsyncQdrantClient":
+    """
+    Async client for the running event loop. For async routes;
+    the current routes are sync and use get_qdrant_client.
+    """
+    from qdrant_client import AsyncQdrantClient
+
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = _async_clients[loop] = AsyncQdrantClient(**_client_options())
+    return client
+
+
+# -------------------------
+# Retries (transient failures only)
+# -------------------------
+def _retryable(e: Exception) -> bool:
+    from qdrant_client.http.exceptions import (
+        ResponseHandlingException,
+        UnexpectedResponse,
     )
 
+    # Connection errors / timeouts (REST)
+    if isinstance(e, ResponseHandlingException):
+        return True
+    if isinstance(e, UnexpectedResponse):
+        return e.status_code in (429, 502, 503, 504)
+
+    # grpc.RpcError
+    code = getattr(e, "code", None)
+    if callable(code):
+        return getattr(code(), "name", None) in (
+            "UNAVAILABLE", "DEADLINE_EXCEEDED", "RESOURCE_EXHAUSTED"
+        )
+    return False
+
+
+def _with_retries(call: Callable[[], Any]) -> Any:
+    for attempt in range(QDRANT_CONFIG["retries"] + 1):
+        try:
+            return call()
+        except Exception as e:
+            if attempt == QDRANT_CONFIG["retries"] or not _retryable(e):
+                raise
+        time.sleep(QDRANT_CONFIG["retry_backoff"] * 2 ** attempt)
+
+
+async def _with_retries_async(call: Callable[[], Any]) -> Any:
+    for attempt in range(QDRANT_CONFIG["retries"] + 1):
+        try:
+            return await call()
+        except Exception as e:
+            if attempt == QDRANT_CONFIG["retries"] or not _retryable(e):
+                raise
+        await asyncio.sleep(QDRANT_CONFIG["retry_backoff"] * 2 ** attempt)
+
+
+# -------------------------
+# Writes (document ingestion)
+# -------------------------
+def ensure_collection(client: "QdrantClient", vector_size: int) -> None:
+    """
+    Create the collection (cosine) if it doesn't exist yet.
+    """
+    from qdrant_client.models import Distance, VectorParams
+
+    def create():
+        try:
+            client.create_collection(
+                collection_name=COLLECTION_NAME,
+                vectors_config=VectorParams(
+                    size=vector_size,
+                    distance=Distance.COSINE,
+                ),
+            )
+        except Exception:
+            # Created anyway: by an attempt that timed out, or by
+            # another writer in the meantime
+            if not client.collection_exists(COLLECTION_NAME):
+                raise
+
+    if not _with_retries(lambda: client.collection_exists(COLLECTION_NAME)):
+        _with_retries(create)
+
+
+def upsert_batches(
+    client: "QdrantClient",
+    batches: Iterable[List["PointStruct"]],
+    concurrency: int = 4,
+) -> int:
+    """
+    Upsert point batches, up to `concurrency` requests at a
+    time. `batches` is consumed lazily, so a producer (e.g.
+    the embedder) keeps working while earlier batches upload.
+    Returns the number of points written.
+    """
+
+    in_flight = deque()
+    written = 0
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for points in batches:
+            # Bounded: wait for the oldest request first
+            if len(in_flight) >= concurrency:
+                written += in_flight.popleft().result()
+
+            in_flight.append(pool.submit(_upsert, client, points))
+
+        while in_flight:
+            written += in_flight.popleft().result()
+
+    return written
+
+
+def write_points(
+    batches: Iterable[List["PointStruct"]],
+    concurrency: int = 4,
+) -> int:
+    """
+    Write point batches to the configured backend, creating
+    the collection from the first batch's vector size.
+    Returns the number of points written.
+    """
+
+    if VECTOR_BACKEND == "numpy":
+        from app.core.vector_index import get_vector_index
+
+        index = get_vector_index(COLLECTION_NAME)
+        return sum(index.upsert(points) for points in batches)
+
+    client = get_qdrant_client()
+
+    def checked():
+        for i, points in enumerate(batches):
+            if i == 0:
+                ensure_collection(client, len(points[0].vector))
+            yield points
+
+    return upsert_batches(client, checked(), concurrency)
+
+
+def _upsert(client: "QdrantClient", points: List["PointStruct"]) -> int:
+    # Point ids are deterministic: a retried upsert is idempotent
+    _with_retries(lambda: client.upsert(
+        collection_name=COLLECTION_NAME, points=points, wait=True
+    ))
+    return len(points)
+
 
 # -------------------------
 # Core semantic search (STABLE)
 # -------------------------
+def _query_filter(metadata_filter: Optional[Dict[str, Any]]):
+    if not metadata_filter:
+        return None
+
+    from qdrant_client.models import FieldCondition, Filter, MatchValue
+
+    return Filter(
+        must=[
+            FieldCondition(
+                key=k,
+                match=MatchValue(value=v),
+            )
+            for k, v in metadata_filter.items()
+        ]
+    )
+
+
+def _normalize_hits(hits) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+
+    for hit in hits:
+        results.append({
+            "id": hit.id,
+            "score": hit.score,
+            "payload": hit.payload or {},
+        })
+
+    return results
+
+
 def search_vectors(
     query_vector: List[float],
     limit: int = 5,
@@ -38,38 +267,65 @@ def search_vectors(
     Always returns normalized dicts.
     """
 
+    if VECTOR_BACKEND == "numpy":
+        from app.core.vector_index import get_vector_index
+
+        return get_vector_index(COLLECTION_NAME).search(
+            query_vector, limit, metadata_filter
+        )
+
     client = get_qdrant_client()
+    qdrant_filter = _query_filter(metadata_filter)
+
+    # query_points replaced search (removed in qdrant-client 1.13+)
+    if hasattr(client, "query_points"):
+        hits = _with_retries(lambda: client.query_points(
+            collection_name=COLLECTION_NAME,
+            query=query_vector,
+            limit=limit,
+            query_filter=qdrant_filter,
+            with_payload=True,
+        )).points
+    else:
+        hits = _with_retries(lambda: client.search(
+            collection_name=COLLECTION_NAME,
+            query_vector=query_vector,
+            limit=limit,
+            query_filter=qdrant_filter,
+            with_payload=True,
+        ))
+
+    return _normalize_hits(hits)
+
+
+async def search_vectors_async(
+    query_vector: List[float],
+    limit: int = 5,
+    metadata_filter: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    search_vectors for async routes (same results). No route
+    awaits it yet: the query routes are sync and call
+    search_vectors from FastAPI's thread pool.
+    """
 
-    qdrant_filter = None
-    if metadata_filter:
-        qdrant_filter = Filter(
-            must=[
-                FieldCondition(
-                    key=k,
-                    match=MatchValue(value=v),
-                )
-                for k, v in metadata_filter.items()
-            ]
+    if VECTOR_BACKEND == "numpy":
+        return await asyncio.to_thread(
+            search_vectors, query_vector, limit, metadata_filter
         )
 
-    hits = client.search(
+    client = get_async_qdrant_client()
+    qdrant_filter = _query_filter(metadata_filter)
+
+    response = await _with_retries_async(lambda: client.query_points(
         collection_name=COLLECTION_NAME,
-        query_vector=query_vector,
+        query=query_vector,
         limit=limit,
         query_filter=qdrant_filter,
         with_payload=True,
-    )
-
-    results: List[Dict[str, Any]] = []
-
-    for hit in hits:
-        results.append({
-            "id": hit.id,
-            "score": hit.score,
-            "payload": hit.payload or {},
-        })
+    ))
 
-    return results
+    return _normalize_hits(response.points)
 
 
 # -------------------------
@@ -1,3 +1,6 @@
+from typing import List
+
+
 def chunk_text(text: str, chunk_size: int = 500, overlap: int = 50):
     """
     Splits text into overlapping chunks.
@@ -13,3 +16,45 @@ def chunk_text(text: str, chunk_size: int = 500, overlap: int = 50):
         start = end - overlap
 
     return chunks
+
+
+def chunk_words(
+    paragraphs: List[str],
+    chunk_size: int = 500,
+    overlap: int = 50,
+) -> List[str]:
+    """
+    Splits paragraphs into overlapping chunks of at most
+    chunk_size characters, on word boundaries (chunk_text cuts
+    words in half). Consecutive chunks share their last/first
+    words, at least `overlap` characters of them. A single
+    word longer than chunk_size is its own chunk.
+    """
+
+    words = [w for p in paragraphs for w in p.split()]
+    chunks = []
+    start = 0
+
+    while start < len(words):
+        # Pack words while they fit (+1 for each joining space)
+        end, size = start, -1
+        while end < len(words) and (
+            end == start or size + 1 + len(words[end]) <= chunk_size
+        ):
+            size += 1 + len(words[end])
+            end += 1
+
+        chunks.append(" ".join(words[start:end]))
+
+        if end == len(words):
+            break
+
+        # Step back over trailing words for the overlap, but
+        # always move forward
+        back, shared = end, 0
+        while back - 1 > start and shared < overlap:
+            back -= 1
+            shared += len(words[back]) + 1
+        start = back
+
+    return chunks
@@ -0,0 +1,120 @@
+# app/utils/text_normalizer.py
+
+import re
+from typing import Iterator, List, Tuple
+
+
+# ============================================================
+# Shared text normalization (EDUE, refiner, PDF parser)
+# ============================================================
+#
+# Every pattern is compiled once here. Hot loops import the
+# functions below instead of calling re.sub / re.search with
+# string patterns.
+
+STOPWORDS = {
+    "the", "is", "are", "and", "or", "of", "to", "in", "for",
+    "with", "on", "by", "an", "a", "as", "from", "that"
+}
+
+MIN_SENTENCE_TOKENS = 8
+
+NOISE_PATTERNS = [
+    r"learning objective",
+    r"https?://",
+    r"www\.",
+]
+
+NOISE_PREFIXES = ("what is", "explain", "define")
+
+_HYPHEN_BREAK = re.compile(r"-\s+")
+_WHITESPACE = re.compile(r"\s+")
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+_NOISE = re.compile("|".join(NOISE_PATTERNS))
+
+WORD_PATTERN = re.compile(r"\w+")
+_ALNUM_TOKEN = re.compile(r"[a-zA-Z0-9]+")
+
+
+# ------------------------------------------------------------
+# Cleaning
+# ------------------------------------------------------------
+
+def fold_whitespace(text: str) -> str:
+    return _WHITESPACE.sub(" ", text)
+
+
+def repair_pdf_artifacts(text: str) -> str:
+    """
+    Fix common PDF extraction issues (hyphenation, spacing).
+    """
+
+    # str.split() folds and strips the same whitespace set as \s+
+    return " ".join(_HYPHEN_BREAK.sub("", text).split())
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Split already-repaired text on sentence punctuation.
+    """
+
+    return _SENTENCE_BOUNDARY.split(text)
+
+
+# ------------------------------------------------------------
+# Noise tagging
+# ------------------------------------------------------------
+
+def _is_noise_lower(s: str) -> bool:
+    if len(s.split()) < MIN_SENTENCE_TOKENS:
+        return True
+
+    if _NOISE.search(s):
+        return True
+
+    return s.startswith(NOISE_PREFIXES)
+
+
+def is_noise(sentence: str) -> bool:
+    return _is_noise_lower(sentence.lower().strip())
+
+
+# ------------------------------------------------------------
+# Tokenization
+# ------------------------------------------------------------
+
+def tokenize(text: str) -> List[str]:
+    """
+    ASCII alphanumeric tokens, lowercased once, stopwords removed.
+    """
+
+    tokens = []
+    for t in _ALNUM_TOKEN.findall(text):
+        t = t.lower()
+        if t not in STOPWORDS:
+            tokens.append(t)
+    return tokens
+
+
+def word_terms(lowered: str) -> List[str]:
+    """
+    Unicode word runs of already-lowercased text.
+    """
+
+    return WORD_PATTERN.findall(lowered)
+
+
+# ------------------------------------------------------------
+# One-pass pipeline
+# ------------------------------------------------------------
+
+def iter_sentences(text: str) -> Iterator[Tuple[str, str, bool]]:
+    """
+    Repair, split and noise-tag in one pass.
+
+    Yields (sentence, lowercased sentence, is_noise).
+    """
+
+    for s in _SENTENCE_BOUNDARY.split(repair_pdf_artifacts(text)):
+        lowered = s.lower()
+        yield s, lowered, _is_noise_lower(lowered)
@@ -0,0 +1,76 @@
+from pathlib import Path
+from typing import List
+
+
+# Two sections, three indexable sentences (one noise line)
+SECTIONS = [
+    {
+        "title": "DATA WAREHOUSING",
+        "paragraphs": [
+            "A data warehouse integrates data from many operational source systems for analysis.",
+            "Warehousing pipelines load the warehouse every night from the staging area tables.",
+        ],
+        "pages": [3],
+        "page": 3,
+    },
+    {
+        "title": "STREAM PROCESSING",
+        "paragraphs": [
+            "Stream processing engines handle unbounded event streams with low latency in real time.",
+            "Short line.",
+        ],
+        "pages": [5],
+        "page": 5,
+    },
+]
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path: Path, pages: List[List[str]]) -> Path:
+    """
+    Minimal PDF: one Helvetica text line per entry, top down.
+    """
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in below
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+
+    for lines in pages:
+        ops = "".join(
+            f"BT /F1 11 Tf 72 {760 - 16 * i} Td ({_escape(line)}) Tj ET\n"
+            for i, line in enumerate(lines)
+        ).encode("latin-1")
+
+        objects.append(b"<< /Length %d >>\nstream\n%sendstream" % (len(ops), ops))
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>"
+            % (len(objects))
+        )
+        kids.append(len(objects))
+
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % k for k in kids), len(kids)
+    )
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % o for o in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, xref
+    )
+
+    path.write_bytes(bytes(out))
+    return path
@@ -0,0 +1,117 @@
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.core.edue_store import EDUEDocumentStore
+from app.scripts import bulk_ingest
+from app.services import ingest_service
+from app.utils import page_cache
+from app.utils.file_hash_utils import generate_file_hash
+from tests.helpers import write_pdf
+
+
+@pytest.fixture
+def inserted(tmp_path, monkeypatch):
+    """
+    bulk_ingest over a temporary store and journal, with the
+    process pool swapped for threads (so patches apply) and
+    the documents table recorded in the returned list.
+    """
+
+    rows = []
+
+    monkeypatch.setattr(page_cache, "PAGE_CACHE_ENABLED", False)
+    monkeypatch.setattr(
+        ingest_service, "EDUE_DOCUMENT_STORE", EDUEDocumentStore(tmp_path / "store")
+    )
+    monkeypatch.setattr(bulk_ingest, "JOURNAL_PATH", tmp_path / "journal.jsonl")
+    monkeypatch.setattr(bulk_ingest, "insert_document_metadata_batch", rows.extend)
+    monkeypatch.setattr(
+        bulk_ingest, "ProcessPoolExecutor",
+        lambda max_workers, mp_context: ThreadPoolExecutor(max_workers),
+    )
+    return rows
+
+
+@pytest.fixture
+def pdfs(tmp_path):
+    folder = tmp_path / "in"
+    folder.mkdir()
+    for name in ("a", "b", "c"):
+        write_pdf(folder / f"{name}.pdf", [[
+            f"CHAPTER {name.upper()}",
+            f"Document {name} describes the {name} pipeline and its storage layers.",
+        ]])
+    return folder
+
+
+def _run(monkeypatch, *args):
+    argv = ["bulk_ingest", *map(str, args), "--workers", "2", "--no-vectors"]
+    monkeypatch.setattr(sys, "argv", argv)
+    bulk_ingest.main()
+
+
+def _id(folder, name):
+    return generate_file_hash(str(folder / f"{name}.pdf"))
+
+
+def test_store_failure_is_recorded_and_the_run_goes_on(
+    pdfs, inserted, monkeypatch, capsys
+):
+    store = bulk_ingest.store_document
+
+    def failing_store(document_id, filename, *args, **kwargs):
+        if filename == "b.pdf":
+            raise OSError("disk full")
+        return store(document_id, filename, *args, **kwargs)
+
+    monkeypatch.setattr(bulk_ingest, "store_document", failing_store)
+    _run(monkeypatch, pdfs)
+
+    out = capsys.readouterr().out
+    assert "FAILED b.pdf: disk full" in out
+    assert "ingested  2 documents, 1 failed" in out
+
+    assert sorted(r["filename"] for r in inserted) == ["a.pdf", "c.pdf"]
+    assert not bulk_ingest.JOURNAL_PATH.exists()
+    assert not ingest_service.is_ingested(_id(pdfs, "b"))
+
+    # The next run only does the failed file
+    monkeypatch.setattr(bulk_ingest, "store_document", store)
+    _run(monkeypatch, pdfs)
+
+    out = capsys.readouterr().out
+    assert "found     3 PDFs, 2 duplicates or already ingested" in out
+    assert sorted(r["filename"] for r in inserted) == ["a.pdf", "b.pdf", "c.pdf"]
+
+
+def test_rerun_inserts_the_rows_journaled_by_an_interrupted_run(
+    pdfs, inserted, monkeypatch, capsys
+):
+    def database_down(rows):
+        raise ConnectionError("database down")
+
+    monkeypatch.setattr(bulk_ingest, "insert_document_metadata_batch", database_down)
+    with pytest.raises(ConnectionError):
+        _run(monkeypatch, pdfs / "a.pdf", pdfs / "b.pdf")
+
+    # Both documents are stored, their rows only journaled
+    journal = bulk_ingest.JOURNAL_PATH
+    journaled = [json.loads(line) for line in journal.read_text().splitlines()]
+    assert sorted(r["filename"] for r in journaled) == ["a.pdf", "b.pdf"]
+    assert all(ingest_service.is_ingested(r["document_id"]) for r in journaled)
+
+    # A row whose document never made it into the store
+    with open(journal, "a") as f:
+        f.write(json.dumps({"filename": "lost.pdf", "document_id": "lost"}) + "\n")
+
+    monkeypatch.setattr(bulk_ingest, "insert_document_metadata_batch", inserted.extend)
+    _run(monkeypatch, pdfs / "a.pdf", pdfs / "b.pdf")
+
+    out = capsys.readouterr().out
+    assert "found     2 PDFs, 2 duplicates or already ingested" in out
+    assert sorted(r["filename"] for r in inserted) == ["a.pdf", "b.pdf"]
+    assert {r["document_id"] for r in inserted} == {_id(pdfs, "a"), _id(pdfs, "b")}
+    assert not journal.exists()
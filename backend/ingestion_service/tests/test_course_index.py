@@ -0,0 +1,50 @@
+from app.core.course_index import build_course_index, course_code_key
+
+COURSES = [
+    {"course_code": "AE ZG631", "title": "Automotive Diagnostics and Interfaces",
+     "credits": 4, "description": " Vehicle diagnostics. ", "page": 9},
+    {"course_code": "AE ZG511", "title": "Mechatronics", "credits": 5, "page": 2},
+    {"course_code": "AE ZG531", "title": "Product Design", "credits": 5, "page": 4},
+    {"course_code": "AE ZG633", "title": "Advances in Vehicle Body Structures",
+     "credits": 4, "page": 10},
+]
+
+
+def test_codes_resolve_however_they_are_typed():
+    index = build_course_index(COURSES)
+
+    assert course_code_key("AE* ZG 631") == "AEZG631"
+    for question in [
+        "What is AE ZG631 about?",
+        "tell me about ae zg631",
+        "AE* ZG631 prerequisites",
+        "AEZG631",
+    ]:
+        assert [c["course_code"] for c in index.resolve(question)] == ["AE ZG631"]
+
+    assert index.lookup_code("ae*zg631")[0]["description"] == "Vehicle diagnostics."
+    assert index.codes_in_text("Compare AE ZG511 and AE ZG531, not AE ZG999") == [
+        "AEZG511", "AEZG531",
+    ]
+
+
+def test_titles_match_exactly_without_a_code():
+    index = build_course_index(COURSES)
+
+    assert [c["course_code"] for c in index.resolve("Explain product design")] == [
+        "AE ZG531",
+    ]
+    # A title word is not the title
+    assert index.resolve("What is design?") == []
+
+
+def test_filters():
+    index = build_course_index(COURSES)
+
+    def codes(courses):
+        return [c["course_code"] for c in courses]
+
+    assert codes(index.filter(credits=5)) == ["AE ZG511", "AE ZG531"]
+    assert codes(index.filter(min_credits=4, max_credits=4)) == ["AE ZG631", "AE ZG633"]
+    assert codes(index.filter(title="vehicle")) == ["AE ZG633"]
+    assert len(index.filter()) == len(index) == 4
@@ -0,0 +1,85 @@
+import numpy as np
+
+from app.utils.pdf_parser import _page_course_lines, page_courses
+
+
+def _record(rows, page=2, width=595.0):
+    """
+    Page record from (top, x0, line) rows, ~5 pt per character
+    and one space between words.
+    """
+
+    words = {"x0": [], "x1": [], "top": [], "text": []}
+    for top, x, line in rows:
+        for text in line.split():
+            words["x0"].append(x)
+            words["x1"].append(x + 5 * len(text))
+            words["top"].append(top)
+            words["text"].append(text)
+            x += 5 * len(text) + 3
+
+    return {
+        "page": page,
+        "width": width,
+        "words": {
+            field: np.asarray(values) if field != "text" else values
+            for field, values in words.items()
+        },
+    }
+
+
+# Like pages 2+ of the WILP catalog: a title across the gutter,
+# two columns of courses, a centered page number
+TWO_COLUMNS = [
+    (73.0, 150, "Course descriptions for Work-Integrated Learning Programmes"),
+    (97.0, 72, "AE ZG511 Mechatronics 5"),
+    (97.2, 310, "AE ZG512 Embedded System Design 4"),
+    (109.5, 72, "Sensors and actuators;"),
+    (109.6, 310, "Microcontrollers and buses;"),
+    (122.0, 72, "control of machines."),
+    (122.0, 310, "real time operating systems."),
+    (134.0, 72, "AE ZG513 Robotics 4"),
+    (146.0, 72, "Kinematics and path planning."),
+    (780.0, 290, "VII-2"),
+]
+
+
+def test_columns_are_detected_and_spanning_rows_kept_whole():
+    assert _page_course_lines(_record(TWO_COLUMNS)) == [
+        "Course descriptions for Work-Integrated Learning Programmes",
+        "AE ZG511 Mechatronics 5",
+        "Sensors and actuators;",
+        "control of machines.",
+        "AE ZG513 Robotics 4",
+        "Kinematics and path planning.",
+        "AE ZG512 Embedded System Design 4",
+        "Microcontrollers and buses;",
+        "real time operating systems.",
+        "VII-2",
+    ]
+
+
+def test_title_does_not_leak_into_courses():
+    courses = page_courses(_record(TWO_COLUMNS))
+
+    assert [(c["course_code"], c["title"], c["credits"]) for c in courses] == [
+        ("AE ZG511", "Mechatronics", 5),
+        ("AE ZG513", "Robotics", 4),
+        ("AE ZG512", "Embedded System Design", 4),
+    ]
+    assert courses[0]["description"] == " Sensors and actuators; control of machines."
+
+
+def test_single_column_page_reads_top_down():
+    # Past the page centre, but one column
+    rows = [
+        (100.0, 72, "AE ZG520 World Class Manufacturing 5"),
+        (112.0, 72, "The world-class manufacturing challenge, developing a strategy,"),
+        (124.0, 72, "just-in-time and total quality."),
+    ]
+
+    assert _page_course_lines(_record(rows)) == [line for _, _, line in rows]
+
+
+def test_empty_page():
+    assert _page_course_lines(_record([])) == []
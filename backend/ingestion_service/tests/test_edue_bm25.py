@@ -0,0 +1,167 @@
+import numpy as np
+import pytest
+
+from app.core.edue_bm25 import (
+    PHRASE_BONUS,
+    PROXIMITY_BONUS,
+    PROXIMITY_WINDOW,
+    build_bm25_matrix,
+    parse_bm25_query,
+    top_k_ids,
+)
+
+
+def _matrix(sentences, sections=None, headers=None):
+    words = [s.lower().split() for s in sentences]
+    sections = sections or [0] * len(sentences)
+    headers = headers or [[]]
+    return build_bm25_matrix(words, sections, headers)
+
+
+def test_parse_query_drops_stopwords_keeps_offsets():
+    query = parse_bm25_query("What is the data warehouse?")
+
+    assert query.tokens == ["what", "data", "warehouse"]
+    assert query.offsets == [0, 3, 4]
+
+
+def test_rarer_term_scores_higher():
+    bm25 = _matrix([
+        "alpha beta gamma delta",
+        "alpha gamma delta epsilon",
+        "alpha beta delta epsilon",
+    ])
+
+    common = bm25.score(["alpha"])
+    rare = bm25.score(["gamma"])
+
+    assert rare[0] > common[0] > 0
+    assert rare[2] == 0
+
+
+def test_header_field_is_boosted():
+    bm25 = _matrix(
+        ["kafka brokers replicate partitions", "spark jobs replicate partitions"],
+        sections=[0, 1],
+        headers=[["kafka"], ["spark"]],
+    )
+
+    plain = _matrix(["kafka brokers replicate partitions", "spark jobs replicate partitions"])
+
+    assert bm25.score(["kafka"])[0] > plain.score(["kafka"])[0]
+    assert bm25.score(["kafka"])[1] == 0
+
+
+def test_score_batch_matches_score():
+    bm25 = _matrix(["a b c d", "b c d e", "c d e f"])
+    queries = [["b"], ["c", "f"], ["zzz"]]
+
+    batch = bm25.score_batch(queries)
+
+    for row, tokens in zip(batch, queries):
+        np.testing.assert_array_equal(row, bm25.score(tokens))
+
+
+def test_phrase_beats_proximity_beats_scattered():
+    sentences = [
+        "data one two three four five six warehouse",   # scattered
+        "data one two warehouse three four five six",   # within window
+        "one two three data warehouse four five six",   # exact phrase
+    ]
+    bm25 = _matrix(sentences)
+    query = parse_bm25_query("data warehouse")
+
+    base = bm25.score(query.tokens)
+    assert base[0] == base[1] == base[2]
+
+    hits = bm25.search(query, 3)
+
+    assert [i for i, _ in hits] == [2, 1, 0]
+
+    weight = float(base[0])
+    scores = dict(hits)
+    assert scores[0] == pytest.approx(weight)
+    assert scores[1] == pytest.approx(weight * (1 + PROXIMITY_BONUS), rel=1e-5)
+    assert scores[2] == pytest.approx(weight * (1 + PHRASE_BONUS), rel=1e-5)
+
+
+def test_phrase_gap_counts_stopwords():
+    bm25 = _matrix([
+        "one two data warehouse three four five six",
+        "one two data of warehouse three four five",
+    ])
+
+    # "data of warehouse": the gap of 2 only matches sentence 1
+    hits = dict(bm25.search(parse_bm25_query("data of warehouse"), 2))
+    assert hits[1] > hits[0]
+
+    hits = dict(bm25.search(parse_bm25_query("data warehouse"), 2))
+    assert hits[0] > hits[1]
+
+
+def test_top_k_breaks_ties_by_document_order():
+    scores = np.array([0.0, 2.0, 1.0, 2.0, 2.0], dtype=np.float32)
+
+    assert top_k_ids(scores, 2) == [1, 3]
+    assert top_k_ids(scores, 10) == [1, 3, 4, 2]
+
+
+def _exhaustive_search(bm25, words, query, k):
+    """
+    Every sentence scored with its positional bonus, no
+    bounds: what search() must return.
+    """
+
+    scores = bm25.score(query.tokens)
+    pairs = [
+        (a, b, ob - oa)
+        for (a, oa), (b, ob) in zip(
+            zip(query.tokens, query.offsets),
+            zip(query.tokens[1:], query.offsets[1:]),
+        )
+        if a != b
+    ]
+
+    final = []
+    for sid in np.flatnonzero(scores > 0).tolist():
+        value = float(scores[sid])
+
+        for a, b, gap in pairs:
+            pa = [i for i, w in enumerate(words[sid]) if w == a]
+            pb = [i for i, w in enumerate(words[sid]) if w == b]
+            if not pa or not pb:
+                continue
+
+            weight = float(bm25.score([a])[sid]) + float(bm25.score([b])[sid])
+            if any(x + gap in pb for x in pa):
+                value += PHRASE_BONUS * weight
+            elif min(abs(y - x) for x in pa for y in pb) <= PROXIMITY_WINDOW:
+                value += PROXIMITY_BONUS * weight
+
+        final.append((sid, value))
+
+    final.sort(key=lambda x: (-x[1], x[0]))
+    return final[:k]
+
+
+def test_search_matches_exhaustive_scoring():
+    rng = np.random.default_rng(7)
+    vocab = [f"w{i}" for i in range(12)] + ["the", "of"]
+
+    words = [
+        rng.choice(vocab, size=rng.integers(3, 12)).tolist()
+        for _ in range(300)
+    ]
+    bm25 = build_bm25_matrix(words, [0] * len(words), [[]])
+
+    for _ in range(50):
+        question = " ".join(rng.choice(vocab, size=rng.integers(2, 5)))
+        query = parse_bm25_query(question)
+
+        for k in (1, 5, 20):
+            expected = _exhaustive_search(bm25, words, query, k)
+            hits = bm25.search(query, k)
+
+            assert len(hits) == len(expected)
+            for (_, score), (_, want) in zip(hits, expected):
+                assert score == pytest.approx(want, rel=1e-5)
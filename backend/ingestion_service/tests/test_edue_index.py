@@ -0,0 +1,58 @@
+import re
+
+from app.core.edue_index import build_edue_index
+from app.core.edue_query import query_edue
+from tests.helpers import SECTIONS
+
+
+def _document():
+    return {"sections": SECTIONS, "index": build_edue_index(SECTIONS)}
+
+
+def test_noise_sentences_are_not_indexed():
+    index = build_edue_index(SECTIONS)
+
+    assert len(index) == 3
+    assert all("Short line" not in s for s in index.sentences)
+    assert index.sentence_sections == [0, 0, 1]
+
+
+def test_match_term_is_substring_within_words():
+    index = build_edue_index(SECTIONS)
+
+    assert index.match_term("house") == {0, 1}
+    assert index.match_term("stream") == {2}
+    assert index.match_term("nightly") == set()
+
+
+def test_match_terms_agrees_with_substring_scan():
+    index = build_edue_index(SECTIONS)
+    words = set(re.findall(r"\w+", " ".join(index.sentences).lower()))
+    terms = {w[i:j] for w in words for i in range(len(w)) for j in range(i + 1, len(w) + 1)}
+
+    matched = index.match_terms(terms)
+
+    for term in terms:
+        expected = {i for i, s in enumerate(index.sentences) if term in s.lower()}
+        assert matched[term] == expected, term
+
+
+def test_query_ranks_longest_matching_sentences():
+    result = query_edue(_document(), "Which engines handle latency?")
+
+    assert result["engine"] == "edue"
+    assert result["result"]["answer"].startswith("Stream processing engines")
+    assert result["result"]["pages"] == [5]
+
+
+def test_query_declarative_prefix():
+    result = query_edue(_document(), "What is a warehouse?")
+
+    assert result["result"]["answer"].startswith("a warehouse is ")
+
+
+def test_query_without_matches():
+    result = query_edue(_document(), "zzz qqq")
+
+    assert result["result"]["answer"] == "Information is not available."
+    assert result["result"]["pages"] == []
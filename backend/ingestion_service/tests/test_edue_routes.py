@@ -0,0 +1,102 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.edue_index import build_edue_index
+from app.routes import edue_query as routes
+from app.services.query_cache import QueryResultCache
+from tests.helpers import SECTIONS
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """
+    EDUE routes over one in-memory document ("doc-1") and a
+    fresh result cache.
+    """
+
+    document = {
+        "document_id": "doc-1",
+        "filename": "catalog.pdf",
+        "sections": SECTIONS,
+        "index": build_edue_index(SECTIONS),
+        "courses": None,
+    }
+
+    monkeypatch.setattr(
+        routes, "get_document_by_id",
+        lambda document_id: document if document_id == "doc-1" else None,
+    )
+    monkeypatch.setattr(routes, "QUERY_CACHE", QueryResultCache())
+
+    app = FastAPI()
+    app.include_router(routes.router)
+    return TestClient(app)
+
+
+def test_query_is_cached(client):
+    body = {"document_id": "doc-1", "question": "What is a data warehouse?"}
+
+    first = client.post("/edue/query", json=body).json()
+    second = client.post("/edue/query", json=body).json()
+
+    assert first == second
+    assert client.get("/edue/cache/stats").json()["hits"] == 1
+
+
+def test_hybrid_query_runs_rag_every_time(client, monkeypatch):
+    # The vector collection changes with every ingest
+    answers = iter(["before", "after"])
+    monkeypatch.setattr(
+        routes, "run_hybrid_query",
+        lambda document, question: {"engine": "hybrid", "answer": next(answers)},
+    )
+
+    body = {"document_id": "doc-1", "question": "What is a data warehouse?"}
+
+    assert client.post("/edue/hybrid/query", json=body).json()["answer"] == "before"
+    assert client.post("/edue/hybrid/query", json=body).json()["answer"] == "after"
+    assert client.get("/edue/cache/stats").json()["entries"] == 0
+
+
+def test_unknown_document(client):
+    body = {"document_id": "missing", "question": "q"}
+
+    assert client.post("/edue/query", json=body).status_code == 404
+    assert client.post("/edue/hybrid/query", json=body).status_code == 404
+
+
+@pytest.mark.parametrize("engine", ["edue", "bm25"])
+def test_batch_matches_single_questions(client, engine):
+    words = ["data", "warehouse", "stream", "latency", "staging", "events", "zzz"]
+    # Past one BM25 chunk (BM25_BATCH_CHUNK), repeats included
+    questions = [
+        "What is a data warehouse?",
+        "How is the warehouse loaded?",
+        "nothing matches zzz",
+    ] + [f"{a} {b}" for a in words for b in words]
+
+    batch = client.post(
+        "/edue/query/batch",
+        json={"document_id": "doc-1", "questions": questions, "engine": engine},
+    ).json()
+
+    assert batch["document_id"] == "doc-1"
+    assert batch["results"] == [
+        client.post(
+            "/edue/query",
+            json={"document_id": "doc-1", "question": q, "engine": engine},
+        ).json()
+        for q in questions
+    ]
+
+
+def test_batch_limits(client):
+    body = {"document_id": "doc-1", "questions": []}
+    assert client.post("/edue/query/batch", json=body).status_code == 422
+
+    body["questions"] = ["q"] * (routes.MAX_BATCH_QUESTIONS + 1)
+    assert client.post("/edue/query/batch", json=body).status_code == 422
+
+    body = {"document_id": "missing", "questions": ["q"]}
+    assert client.post("/edue/query/batch", json=body).status_code == 404
@@ -0,0 +1,127 @@
+import random
+
+import pytest
+
+from app.core import edue_store
+from app.core.edue_bm25 import parse_bm25_query
+from app.core.edue_index import build_edue_index
+from app.core.edue_search import search_edue
+from app.core.edue_store import EDUEDocumentStore
+
+WORDS = ["warehouse", "pipeline", "stream", "latency", "partition", "replica", "schema", "ledger"]
+
+
+def _sections(i):
+    rng = random.Random(i)
+    return [
+        {
+            "title": f"SECTION {i}",
+            "paragraphs": [
+                " ".join(rng.choice(WORDS) for _ in range(8)) + f" topic{i % 20}."
+                for _ in range(3)
+            ],
+            "pages": [i % 5 + 1],
+        }
+    ]
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    """
+    40 documents written by one handle; returns a fresh
+    handle (as after a restart) that maps at most 4.
+    """
+
+    writer = EDUEDocumentStore(tmp_path)
+    for i in range(40):
+        sections = _sections(i)
+        writer[f"doc-{i:02d}"] = {
+            "document_id": f"doc-{i:02d}",
+            "filename": f"doc-{i:02d}.pdf",
+            "sections": sections,
+            "index": build_edue_index(sections),
+            "courses": None,
+        }
+
+    return EDUEDocumentStore(tmp_path, max_open=4)
+
+
+def _per_document_ranking(documents, question, top_k):
+    """
+    Every document ranked on its own, merged by score, then
+    document order, then sentence order.
+    """
+
+    query = parse_bm25_query(question)
+    hits = []
+    for order, document in enumerate(documents):
+        index = document["index"]
+        for sentence_id, score in index.bm25.search(query, top_k):
+            hits.append((-score, order, sentence_id, document["document_id"]))
+
+    return [
+        (document_id, round(-neg_score, 4))
+        for neg_score, _, _, document_id in sorted(hits)[:top_k]
+    ]
+
+
+def _search(store, question, top_k=10, document_ids=None):
+    terms = parse_bm25_query(question).tokens
+    documents = [store[d] for d in store.with_terms(terms, document_ids)]
+    return search_edue(documents, question, top_k=top_k)
+
+
+@pytest.mark.parametrize("question", [
+    "warehouse latency",
+    "replica schema ledger",
+    "topic7 stream",
+    "what is a topic13?",
+    "nothing matches this",
+])
+def test_search_matches_per_document_ranking(corpus, question):
+    expected = _per_document_ranking(corpus.values(), question, 10)
+
+    result = _search(corpus, question)
+
+    assert [(r["document_id"], r["score"]) for r in result["results"]] == expected
+    # Narrowing to candidates changes nothing
+    assert result["results"] == search_edue(corpus.values(), question, top_k=10)["results"]
+
+
+def test_search_maps_only_candidates_past_max_open(corpus, monkeypatch):
+    opened = []
+    open_binary = edue_store.open_edue_binary
+
+    def counting_open(path):
+        opened.append(path.stem)
+        return open_binary(path)
+
+    monkeypatch.setattr(edue_store, "open_edue_binary", counting_open)
+
+    # topic7 is in doc-07 and doc-27 only
+    for _ in range(3):
+        result = _search(corpus, "topic7")
+        assert {r["document_id"] for r in result["results"]} == {"doc-07", "doc-27"}
+        assert result["documents_searched"] == 2
+
+    assert sorted(set(opened)) == ["doc-07", "doc-27"]
+    assert _search(corpus, "nothing here")["results"] == []
+
+
+def test_candidates_follow_requested_order_and_new_documents(corpus):
+    ids = ["doc-27", "doc-07", "missing", "doc-01"]
+    assert corpus.with_terms(["topic7"], ids) == ["doc-27", "doc-07"]
+
+    sections = [{
+        "title": "NEW",
+        "paragraphs": ["A brand new topic7 document about ledgers and their partitions."],
+    }]
+    corpus["doc-new"] = {
+        "document_id": "doc-new",
+        "filename": "new.pdf",
+        "sections": sections,
+        "index": build_edue_index(sections),
+        "courses": None,
+    }
+
+    assert corpus.with_terms(["topic7"]) == ["doc-07", "doc-27", "doc-new"]
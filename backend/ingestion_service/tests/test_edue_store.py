@@ -0,0 +1,147 @@
+import numpy as np
+
+from app.core.course_index import build_course_index
+from app.core.edue_index import build_edue_index
+from app.core.edue_query import query_edue
+from app.core.edue_store import (
+    EDUEDocumentStore,
+    open_edue_binary,
+    write_edue_binary,
+)
+from tests.helpers import SECTIONS
+
+
+COURSES = [
+    {
+        "course_code": "AE ZG631",
+        "title": "Data Warehousing",
+        "credits": 4,
+        "description": "Dimensional modelling and ETL.",
+        "page": 3,
+    },
+]
+
+
+def _document(document_id="doc-1"):
+    return {
+        "document_id": document_id,
+        "filename": "catalog.pdf",
+        "sections": [{k: v for k, v in s.items() if k != "page"} for s in SECTIONS],
+        "index": build_edue_index(SECTIONS),
+        "courses": build_course_index(COURSES),
+    }
+
+
+def test_binary_round_trip(tmp_path):
+    document = _document()
+    path = tmp_path / "doc-1.edue"
+
+    write_edue_binary(path, document)
+    loaded = open_edue_binary(path)
+
+    assert loaded["document_id"] == "doc-1"
+    assert loaded["filename"] == "catalog.pdf"
+    assert list(loaded["sections"]) == document["sections"]
+    assert loaded["courses"].courses == document["courses"].courses
+
+    index, original = loaded["index"], document["index"]
+    assert list(index.sentences) == original.sentences
+    assert list(index.pages) == original.pages
+    assert list(index.lengths) == original.lengths
+    assert list(index.sentence_sections) == original.sentence_sections
+    assert list(index.section_titles) == original.section_titles
+    assert list(index.section_pages) == original.section_pages
+    assert {t: index.postings[t] for t in index.postings} == original.postings
+
+    for name in ("indptr", "indices", "data", "pos_indptr", "positions"):
+        np.testing.assert_array_equal(
+            getattr(index.bm25, name), getattr(original.bm25, name)
+        )
+    assert dict(index.bm25.terms) == original.bm25.terms
+
+
+def test_loaded_document_answers_identically(tmp_path):
+    document = _document()
+    path = tmp_path / "doc-1.edue"
+    write_edue_binary(path, document)
+    loaded = open_edue_binary(path)
+
+    for engine in ("edue", "bm25"):
+        for question in (
+            "What is a data warehouse?",
+            "stream latency",
+            "Tell me about AE ZG631",
+            "nothing matches zzz",
+        ):
+            assert query_edue(loaded, question, engine) == query_edue(document, question, engine)
+
+
+def test_store_lists_and_reopens_documents(tmp_path):
+    store = EDUEDocumentStore(tmp_path)
+    store["doc-1"] = _document("doc-1")
+
+    assert "doc-1" in store
+    assert store.get("missing") is None
+
+    reopened = EDUEDocumentStore(tmp_path)
+    assert reopened.keys() == ["doc-1"]
+    assert list(reopened["doc-1"]["index"].sentences) == _document()["index"].sentences
+
+
+def test_store_does_not_keep_written_documents(tmp_path):
+    store = EDUEDocumentStore(tmp_path)
+    document = _document("doc-1")
+    store["doc-1"] = document
+
+    assert store._loaded == {}
+    # Read back from the file, not the in-memory index
+    assert store["doc-1"] is not document
+    assert list(store["doc-1"]["index"].sentences) == document["index"].sentences
+
+
+def test_store_caps_mapped_documents(tmp_path):
+    store = EDUEDocumentStore(tmp_path, max_open=2)
+    for d in ("a", "b", "c"):
+        store[d] = _document(d)
+
+    for d in ("a", "b", "a", "c"):
+        assert store[d]["document_id"] == d
+
+    assert list(store._loaded) == ["a", "c"]
+    assert len(store) == 3 and store.keys() == ["a", "b", "c"]
+
+
+def test_rewrite_drops_stale_mapping(tmp_path):
+    store = EDUEDocumentStore(tmp_path)
+    store["doc-1"] = _document("doc-1")
+    store["doc-1"]
+
+    rewritten = _document("doc-1")
+    rewritten["filename"] = "revised.pdf"
+    store["doc-1"] = rewritten
+
+    assert store["doc-1"]["filename"] == "revised.pdf"
+
+
+def test_store_sees_documents_written_by_another_process(tmp_path):
+    reader = EDUEDocumentStore(tmp_path)
+    writer = EDUEDocumentStore(tmp_path)
+    assert "doc-1" not in reader
+
+    writer["doc-1"] = _document("doc-1")
+    writer["doc-2"] = _document("doc-2")
+
+    assert "doc-1" in reader
+    assert reader.get("doc-1")["filename"] == "catalog.pdf"
+    assert reader.with_terms(["warehouse"], ["doc-2"]) == ["doc-2"]
+    assert sorted(reader.keys()) == ["doc-1", "doc-2"]
+    assert reader.with_terms(["warehouse"]) == ["doc-1", "doc-2"]
+
+
+def test_store_lookup_stays_in_its_directory(tmp_path):
+    store = EDUEDocumentStore(tmp_path / "store")
+    write_edue_binary(tmp_path / "outside.edue", _document("outside"))
+
+    for document_id in ("../outside", ".hidden", ""):
+        assert document_id not in store
+        assert store.get(document_id) is None
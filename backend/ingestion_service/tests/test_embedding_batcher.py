@@ -0,0 +1,101 @@
+import threading
+
+import pytest
+
+from app.utils.embedding_batcher import MicroBatcher
+
+
+class Gate:
+    """
+    Batch function that records its batches and holds the
+    first one until released, so later items queue up.
+    """
+
+    def __init__(self, fn=lambda items: [i * 10 for i in items]):
+        self.fn = fn
+        self.batches = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, items):
+        self.batches.append(list(items))
+        self.started.set()
+        self.release.wait(5)
+        return self.fn(items)
+
+
+def _held(gate):
+    """
+    A batcher whose first batch (item 0) is running and held.
+    """
+
+    batcher = MicroBatcher(gate, max_batch=8, max_wait_ms=1)
+    first = batcher.submit(0)
+    assert gate.started.wait(5)
+    return batcher, first
+
+
+def test_queued_calls_share_one_batch():
+    gate = Gate()
+    batcher, first = _held(gate)
+
+    futures = [batcher.submit(i) for i in range(1, 5)]
+    gate.release.set()
+
+    assert first.result(5) == 0
+    assert [f.result(5) for f in futures] == [10, 20, 30, 40]
+    assert gate.batches == [[0], [1, 2, 3, 4]]
+    assert batcher.stats()["items"] == 5
+
+
+def test_cancelled_calls_are_skipped():
+    gate = Gate()
+    batcher, first = _held(gate)
+
+    gone = batcher.submit(1)
+    kept = batcher.submit(2)
+    assert gone.cancel()
+    gate.release.set()
+
+    assert kept.result(5) == 20
+    assert gate.batches[1] == [2]
+    assert batcher.stats()["cancelled"] == 1
+
+    # The worker is still serving
+    assert batcher(3) == 30
+
+
+def test_error_fails_every_caller_of_the_batch():
+    def fn(items):
+        if "bad" in items:
+            raise RuntimeError("encode failed")
+        return [i * 10 for i in items]
+
+    gate = Gate(fn)
+    batcher, first = _held(gate)
+
+    futures = [batcher.submit(1), batcher.submit("bad")]
+    gate.release.set()
+
+    assert first.result(5) == 0
+    for f in futures:
+        with pytest.raises(RuntimeError, match="encode failed"):
+            f.result(5)
+
+    assert batcher(4) == 40
+    assert batcher.stats()["errors"] == 1
+
+
+def test_short_results_fail_the_batch_instead_of_hanging():
+    gate = Gate(lambda items: [i * 10 for i in items][:1])
+    batcher, first = _held(gate)
+
+    futures = [batcher.submit(1), batcher.submit(2)]
+    gate.release.set()
+
+    assert first.result(5) == 0
+    for f in futures:
+        with pytest.raises(ValueError, match="1 results for 2 items"):
+            f.result(5)
+
+    assert batcher(5) == 50
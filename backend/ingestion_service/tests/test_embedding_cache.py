@@ -0,0 +1,171 @@
+import os
+import threading
+
+import numpy as np
+
+from app.utils.embedding_cache import _HEADER, EmbeddingCache, normalize_text
+from app.utils.file_lock import exclusive_lock
+
+
+def _cache(tmp_path, **kwargs):
+    return EmbeddingCache("test/model", root=tmp_path, **kwargs)
+
+
+def _vectors(n, dim=4, start=0):
+    return np.arange(start, start + n * dim, dtype=np.float32).reshape(n, dim)
+
+
+def test_lookup_returns_cached_rows_and_missing_positions(tmp_path):
+    cache = _cache(tmp_path)
+    keys = cache.keys(["alpha", "beta", "gamma"])
+
+    assert cache.lookup(keys) == (None, [0, 1, 2])
+
+    cache.put(keys[:2], _vectors(2))
+    vectors, missing = cache.lookup(keys)
+
+    assert missing == [2]
+    np.testing.assert_array_equal(vectors[:2], _vectors(2))
+
+    # Another handle (another process) reads the same file
+    vectors, missing = _cache(tmp_path).lookup(keys[1:2])
+    assert missing == []
+    np.testing.assert_array_equal(vectors[0], _vectors(2)[1])
+
+
+def test_keys_fold_whitespace_and_unicode_forms():
+    cache = EmbeddingCache("m")
+
+    assert normalize_text("  café\n menu ") == "café menu"
+    assert cache.keys(["café  menu"]) == cache.keys([" café menu"])
+    assert cache.keys(["a"]) != EmbeddingCache("other").keys(["a"])
+
+
+def test_put_skips_known_and_repeated_keys(tmp_path):
+    cache = _cache(tmp_path)
+    keys = cache.keys(["alpha", "alpha", "beta"])
+
+    cache.put(keys, _vectors(3))
+    cache.put(keys[:1], _vectors(1, start=100))
+
+    assert cache.stats()["entries"] == 2
+    vectors, _ = cache.lookup(keys[:1])
+    np.testing.assert_array_equal(vectors[0], _vectors(1)[0])
+
+
+def test_torn_tail_is_ignored_then_cut_off(tmp_path):
+    cache = _cache(tmp_path)
+    keys = cache.keys(["alpha", "beta", "gamma"])
+    cache.put(keys[:1], _vectors(1))
+
+    # A crash halfway through a row
+    with open(cache.path, "ab") as f:
+        f.write(b"\xff" * 10)
+
+    reader = _cache(tmp_path)
+    assert reader.lookup(keys[:2])[1] == [1]
+
+    reader.put(keys[1:3], _vectors(2, start=10))
+
+    row_bytes = 16 + 4 * 4
+    assert os.path.getsize(cache.path) == _HEADER.size + 3 * row_bytes
+
+    vectors, missing = _cache(tmp_path).lookup(keys)
+    assert missing == []
+    np.testing.assert_array_equal(vectors[1:], _vectors(2, start=10))
+
+
+def test_vectors_of_another_size_are_not_cached(tmp_path):
+    cache = _cache(tmp_path)
+    keys = cache.keys(["alpha", "beta"])
+
+    cache.put(keys[:1], _vectors(1, dim=4))
+    cache.put(keys[1:], _vectors(1, dim=8))
+
+    assert cache.lookup(keys)[1] == [1]
+    assert cache.stats()["dim"] == 4
+
+
+def test_compaction_keeps_recently_used_rows(tmp_path):
+    cache = _cache(tmp_path, max_entries=8)
+    keys = cache.keys([f"text {i}" for i in range(9)])
+
+    cache.put(keys[:8], _vectors(8))
+    # Used since: kept over newer rows
+    cache.lookup(keys[:2])
+
+    cache.put(keys[8:], _vectors(1, start=100))
+
+    stats = cache.stats()
+    assert stats["compactions"] == 1
+    assert stats["entries"] == 4
+
+    vectors, missing = _cache(tmp_path, max_entries=8).lookup(keys)
+    assert sorted(set(range(9)) - set(missing)) == [0, 1, 7, 8]
+    np.testing.assert_array_equal(vectors[8], _vectors(1, start=100)[0])
+
+
+def test_concurrent_writers_keep_every_row(tmp_path):
+    texts = [f"text {i}" for i in range(200)]
+
+    def write(part):
+        cache = _cache(tmp_path)
+        for i in range(part, len(texts), 4):
+            cache.put(cache.keys([texts[i]]), _vectors(1, start=i))
+
+    threads = [threading.Thread(target=write, args=(p,)) for p in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    cache = _cache(tmp_path)
+    vectors, missing = cache.lookup(cache.keys(texts))
+
+    assert missing == []
+    assert [v[0] for v in vectors.tolist()] == list(range(200))
+
+
+def test_foreign_file_is_replaced_by_a_writer_only(tmp_path):
+    cache = _cache(tmp_path)
+    keys = cache.keys(["alpha"])
+
+    cache.path.parent.mkdir(parents=True, exist_ok=True)
+    cache.path.write_bytes(b"OLD!" + b"\0" * 60)
+
+    # Readers leave it alone
+    assert cache.lookup(keys) == (None, [0])
+    assert cache.stats()["entries"] == 0
+    assert cache.path.read_bytes()[:4] == b"OLD!"
+
+    cache.put(keys, _vectors(1))
+
+    vectors, missing = _cache(tmp_path).lookup(keys)
+    assert missing == []
+    np.testing.assert_array_equal(vectors[0], _vectors(1)[0])
+
+
+def test_lookup_waits_for_a_compacting_writer(tmp_path):
+    cache = _cache(tmp_path)
+    keys = cache.keys(["alpha", "beta"])
+    cache.put(keys, _vectors(2))
+
+    reader = _cache(tmp_path)
+    result = []
+
+    # Another process rewrites the file meanwhile
+    with exclusive_lock(cache.lock_path):
+        thread = threading.Thread(target=lambda: result.append(reader.lookup(keys)))
+        thread.start()
+        thread.join(0.2)
+        assert thread.is_alive()
+
+        tmp = cache.path.with_suffix(".tmp")
+        tmp.write_bytes(cache.path.read_bytes()[:_HEADER.size + 16 + 4 * 4])
+        os.replace(tmp, cache.path)
+
+    thread.join()
+
+    vectors, missing = result[0]
+    assert missing == [1]
+    np.testing.assert_array_equal(vectors[0], _vectors(1)[0])
@@ -0,0 +1,58 @@
+import hashlib
+import io
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from app.utils import file_utils
+
+
+@pytest.fixture(autouse=True)
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_utils, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(file_utils, "UPLOAD_CHUNK_SIZE", 7)
+    return tmp_path
+
+
+def _upload(data, filename="catalog.pdf"):
+    return SimpleNamespace(file=io.BytesIO(data), filename=filename)
+
+
+def test_upload_is_hashed_while_written(upload_dir):
+    data = b"%PDF-1.4 " * 100
+
+    file_path, digest = file_utils.save_upload_file(_upload(data))
+
+    assert digest == hashlib.sha256(data).hexdigest()
+    assert file_path == f"{upload_dir}/{digest[:16]}_catalog.pdf"
+    assert open(file_path, "rb").read() == data
+    assert os.listdir(upload_dir) == [os.path.basename(file_path)]
+
+
+def test_same_name_different_content_kept_apart(upload_dir):
+    first, _ = file_utils.save_upload_file(_upload(b"first version"))
+    second, _ = file_utils.save_upload_file(_upload(b"second version"))
+
+    assert first != second
+    assert open(first, "rb").read() == b"first version"
+    assert open(second, "rb").read() == b"second version"
+
+    # A path in the filename stays out of the path
+    path, _ = file_utils.save_upload_file(_upload(b"x", "../../etc/evil.pdf"))
+    assert os.path.dirname(path) == str(upload_dir)
+
+
+def test_failed_upload_leaves_no_temp_file(upload_dir):
+    class Broken(io.BytesIO):
+        def read(self, size=-1):
+            if self.tell() > 10:
+                raise ConnectionResetError("client went away")
+            return super().read(size)
+
+    with pytest.raises(ConnectionResetError):
+        file_utils.save_upload_file(
+            SimpleNamespace(file=Broken(b"x" * 100), filename="a.pdf")
+        )
+
+    assert os.listdir(upload_dir) == []
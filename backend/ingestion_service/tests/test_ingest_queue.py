@@ -0,0 +1,113 @@
+import os
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routes import upload
+from app.services import ingest_jobs
+from app.services.ingest_jobs import IngestJobQueue
+from app.utils import file_utils
+
+
+@pytest.fixture
+def release(tmp_path, monkeypatch):
+    """
+    Upload route over a 1-worker, 1-slot queue whose jobs
+    block until release is set.
+    """
+
+    release = threading.Event()
+
+    def store(document_id, filename, file_path, extracted):
+        return {"document_id": document_id, "filename": filename}
+
+    def extract(file_path, progress=None):
+        release.wait(5)
+        return {}
+
+    monkeypatch.setattr(file_utils, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(ingest_jobs, "is_ingested", lambda document_id: False)
+    monkeypatch.setattr(ingest_jobs, "extract_document", extract)
+    monkeypatch.setattr(ingest_jobs, "store_document", store)
+    monkeypatch.setattr(upload, "INGEST_QUEUE", IngestJobQueue(workers=1, max_queued=1))
+    monkeypatch.setattr(upload, "is_ingested", lambda document_id: False)
+
+    yield release
+    release.set()
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(upload.router)
+    return TestClient(app)
+
+
+def _post(client, name, content):
+    return client.post("/upload/", files={"file": (name, content, "application/pdf")})
+
+
+def _wait_for(client, job_id, status):
+    for _ in range(200):
+        job = client.get(f"/upload/jobs/{job_id}").json()
+        if job["status"] == status:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} never reached {status}")
+
+
+def test_upload_is_queued_and_completes(client, release):
+    response = _post(client, "a.pdf", b"%PDF-a")
+
+    assert response.status_code == 202
+    body = response.json()
+    assert body["status_url"] == f"/upload/jobs/{body['job_id']}"
+
+    release.set()
+    job = _wait_for(client, body["job_id"], "done")
+    assert job["result"]["document_id"] == body["document_id"]
+
+
+def test_same_document_is_not_queued_twice(client, release):
+    first = _post(client, "a.pdf", b"%PDF-a").json()
+    _wait_for(client, first["job_id"], "running")
+
+    again = _post(client, "copy-of-a.pdf", b"%PDF-a")
+
+    assert again.status_code == 202
+    assert again.json()["job_id"] == first["job_id"]
+
+
+def test_full_queue_refuses_with_retry_after(client, release, tmp_path):
+    running = _post(client, "a.pdf", b"%PDF-a").json()
+    _wait_for(client, running["job_id"], "running")
+
+    assert _post(client, "b.pdf", b"%PDF-b").status_code == 202
+
+    refused = _post(client, "c.pdf", b"%PDF-c")
+    assert refused.status_code == 503
+    assert refused.headers["Retry-After"] == str(upload.RETRY_AFTER_SECONDS)
+
+    # The refused upload isn't left behind
+    saved = sorted(name.split("_", 1)[1] for name in os.listdir(tmp_path))
+    assert saved == ["a.pdf", "b.pdf"]
+
+
+def test_ingested_document_returns_at_once(client, release, monkeypatch):
+    monkeypatch.setattr(upload, "is_ingested", lambda document_id: True)
+
+    response = _post(client, "a.pdf", b"%PDF-a")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "success"
+
+
+def test_non_pdf_is_rejected(client, release):
+    assert _post(client, "notes.txt", b"text").status_code == 400
+
+
+def test_unknown_job(client):
+    assert client.get("/upload/jobs/nope").status_code == 404
@@ -0,0 +1,98 @@
+from app.core.edue_index import build_edue_index
+from app.services import ingest_service
+from tests.helpers import SECTIONS
+
+
+class FakeEmbedder:
+    calls = []
+
+    def embed_texts(self, texts, **kwargs):
+        self.calls.append(len(texts))
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+def _capture(monkeypatch, chunk_size=5):
+    written = []
+
+    def write_points(batches, concurrency):
+        for points in batches:
+            written.append(len(points))
+        return sum(written)
+
+    FakeEmbedder.calls = []
+    monkeypatch.setattr(ingest_service, "EmbeddingService", FakeEmbedder)
+    monkeypatch.setattr(ingest_service, "write_points", write_points)
+    monkeypatch.setattr(ingest_service, "CHUNK_SIZE", chunk_size)
+    monkeypatch.setattr(ingest_service, "CHUNK_OVERLAP", 0)
+    return written
+
+
+def test_chunks_are_embedded_in_fixed_batches(monkeypatch):
+    written = _capture(monkeypatch)
+    monkeypatch.setattr(ingest_service, "EMBED_BATCH_SIZE", 2)
+    monkeypatch.setattr(ingest_service, "UPSERT_BATCH_SIZE", 3)
+
+    chunks = list(ingest_service.document_chunks("doc", "f.pdf", SECTIONS))
+    result = ingest_service.index_document_vectors("doc", "f.pdf", SECTIONS)
+
+    assert result["vectors_indexed"] == len(chunks) > 4
+    assert all(n == 2 for n in FakeEmbedder.calls[:-1])
+    assert sum(FakeEmbedder.calls) == len(chunks)
+    assert all(n == 3 for n in written[:-1])
+
+
+def test_document_without_text_is_not_embedded(monkeypatch):
+    _capture(monkeypatch)
+
+    result = ingest_service.index_document_vectors("doc", "f.pdf", [])
+
+    assert result == {"vectors_indexed": 0, "vectors_per_sec": 0.0}
+    assert FakeEmbedder.calls == []
+
+
+def _store(tmp_path, monkeypatch, **kwargs):
+    monkeypatch.setattr(
+        ingest_service, "EDUE_DOCUMENT_STORE",
+        ingest_service.EDUEDocumentStore(tmp_path),
+    )
+
+    document = {
+        "sections": SECTIONS,
+        "index": build_edue_index(SECTIONS),
+        "courses": None,
+        "num_courses": 0,
+        "num_pages": 1,
+        "pages_parsed": 1,
+        "pdf_backend": "layout",
+    }
+
+    return ingest_service.store_document(
+        "doc", "f.pdf", "f.pdf", document, insert_metadata=False, **kwargs
+    )
+
+
+def test_vector_indexing_is_on_by_default(tmp_path, monkeypatch):
+    written = _capture(monkeypatch)
+
+    assert _store(tmp_path, monkeypatch)["vectors_indexed"] == sum(written) > 0
+
+    written.clear()
+    result = _store(tmp_path, monkeypatch, index_vectors=False)
+    assert "vectors_indexed" not in result and written == []
+
+    monkeypatch.setattr(ingest_service, "VECTOR_INDEX_ENABLED", False)
+    result = _store(tmp_path, monkeypatch)
+    assert "vectors_indexed" not in result and written == []
+
+
+def test_vector_index_failure_still_stores_the_document(tmp_path, monkeypatch):
+    def no_model():
+        raise ImportError("No module named 'sentence_transformers'")
+
+    _capture(monkeypatch)
+    monkeypatch.setattr(ingest_service, "EmbeddingService", no_model)
+
+    result = _store(tmp_path, monkeypatch)
+
+    assert result["vector_index_error"] == "No module named 'sentence_transformers'"
+    assert ingest_service.is_ingested("doc")
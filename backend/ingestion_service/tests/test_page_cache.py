@@ -0,0 +1,113 @@
+import os
+import subprocess
+import sys
+
+import pdfplumber
+import pytest
+
+from app.utils import page_cache, pdf_parser
+from app.utils.page_cache import PageCache, page_key
+from tests.helpers import write_pdf
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = PageCache(tmp_path / "page_cache")
+    monkeypatch.setattr(page_cache, "PAGE_CACHE", cache)
+    monkeypatch.setattr(page_cache, "PAGE_CACHE_ENABLED", True)
+    return cache
+
+
+def _keys(path):
+    with pdfplumber.open(path) as pdf:
+        return [page_key(p) for p in pdf.pages]
+
+
+def test_page_key_depends_on_page_content_only(tmp_path):
+    first = write_pdf(tmp_path / "v1.pdf", [["INTRODUCTION", "same text"], ["old page"]])
+    second = write_pdf(tmp_path / "v2.pdf", [["INTRODUCTION", "same text"], ["new page"], ["extra"]])
+
+    k1, k2 = _keys(first), _keys(second)
+
+    assert k1[0] == k2[0]
+    assert k1[1] != k2[1]
+    assert len(set(k2)) == 3
+
+
+def test_cache_key_is_per_backend(tmp_path, cache):
+    path = write_pdf(tmp_path / "doc.pdf", [["HELLO"]])
+
+    with pdfplumber.open(path) as pdf:
+        page = pdf.pages[0]
+        layout = pdf_parser._page_cache_key(page, "layout")
+        text = pdf_parser._page_cache_key(page, "text")
+
+    assert layout == f"{page_key(page)}-layout"
+    assert text == f"{page_key(page)}-text"
+
+
+def test_disabled_cache_has_no_keys(tmp_path, monkeypatch):
+    monkeypatch.setattr(page_cache, "PAGE_CACHE_ENABLED", False)
+    path = write_pdf(tmp_path / "doc.pdf", [["HELLO"]])
+
+    with pdfplumber.open(path) as pdf:
+        assert pdf_parser._page_cache_key(pdf.pages[0], "layout") is None
+
+
+@pytest.mark.parametrize("backend", ["layout", "text"])
+def test_unchanged_pages_are_served_from_cache(tmp_path, cache, backend):
+    first = write_pdf(tmp_path / "v1.pdf", [["CHAPTER ONE", "alpha beta"], ["gamma delta"]])
+    second = write_pdf(tmp_path / "v2.pdf", [["CHAPTER ONE", "alpha beta"], ["gamma epsilon"]])
+
+    parsed = pdf_parser.parse_pdf(str(first), workers=1, backend=backend)
+    assert [r["cached"] for r in parsed] == [False, False]
+
+    revised = pdf_parser.parse_pdf(str(second), workers=1, backend=backend)
+    assert [r["cached"] for r in revised] == [True, False]
+    assert revised[0]["lines"] == parsed[0]["lines"] == ["CHAPTER ONE", "alpha beta"]
+    assert revised[1]["lines"] == ["gamma epsilon"]
+
+
+def test_evict_drops_least_recently_used(tmp_path):
+    writer = PageCache(tmp_path)
+
+    for i, key in enumerate(["aa1", "bb2", "cc3"]):
+        writer.put(key, {"lines": [key]})
+        os.utime(writer._path(key), (1000 + i, 1000 + i))
+
+    cache = PageCache(tmp_path, max_entries=2)
+
+    # A hit refreshes the entry
+    assert cache.get("aa1") == {"lines": ["aa1"]}
+
+    assert cache.evict() == 1
+    assert cache.get("bb2") is None
+    assert cache.stats()["entries"] == 2
+
+
+def test_put_evicts_only_past_the_limits(tmp_path, monkeypatch):
+    cache = PageCache(tmp_path, max_entries=10)
+
+    scans = []
+    entries = cache._entries
+    monkeypatch.setattr(cache, "_entries", lambda: scans.append(1) or entries())
+
+    for i in range(10):
+        cache.put(f"k{i:02d}", {"lines": [str(i)]})
+
+    # One scan to size the cache, none per write after that
+    assert len(scans) == 1
+    assert cache.stats()["entries"] == 10
+
+    cache.put("k10", {"lines": ["10"]})
+
+    # Over the limit: evicted down to the low-water mark
+    assert cache.stats()["entries"] == int(10 * page_cache.PAGE_CACHE_LOW_WATER)
+    assert cache.get("k10") == {"lines": ["10"]}
+
+
+def test_api_import_does_not_load_pdfminer():
+    code = "import sys, app.main; sys.exit('pdfminer' in sys.modules)"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    assert subprocess.run([sys.executable, "-c", code], cwd=root).returncode == 0
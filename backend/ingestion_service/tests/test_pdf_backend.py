@@ -0,0 +1,37 @@
+import pytest
+
+from app.utils import page_cache, pdf_parser
+from tests.helpers import write_pdf
+
+
+@pytest.fixture(autouse=True)
+def no_page_cache(monkeypatch):
+    monkeypatch.setattr(page_cache, "PAGE_CACHE_ENABLED", False)
+
+
+def _catalog(tmp_path, code_page):
+    pages = [[f"CHAPTER {i}", "plain text"] for i in range(1, 15)]
+    pages[code_page - 1].append("AE ZG512 Deep Learning")
+    return str(write_pdf(tmp_path / "catalog.pdf", pages))
+
+
+def test_ingestion_defaults_to_layout(tmp_path, monkeypatch):
+    path = str(write_pdf(tmp_path / "doc.pdf", [["plain text"]]))
+
+    # No probe pass at all
+    monkeypatch.setattr(pdf_parser, "detect_pdf_backend", None)
+
+    assert pdf_parser.resolve_pdf_backend(path) == "layout"
+
+
+def test_auto_finds_course_codes_past_the_first_pages(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_parser, "PDF_BACKEND", "auto")
+
+    assert pdf_parser.resolve_pdf_backend(_catalog(tmp_path, 12), workers=1) == "layout"
+
+
+def test_auto_picks_text_without_course_codes(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_parser, "PDF_BACKEND", "auto")
+    path = str(write_pdf(tmp_path / "doc.pdf", [["CHAPTER ONE", "plain text"]] * 3))
+
+    assert pdf_parser.resolve_pdf_backend(path, workers=1) == "text"
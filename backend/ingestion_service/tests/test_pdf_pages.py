@@ -0,0 +1,53 @@
+import pytest
+
+from app.utils import pdf_pages
+from tests.helpers import write_pdf
+
+
+def _page_text(page, page_number):
+    # Module-level: pool workers import it
+    return page_number, page.extract_text()
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """
+    Two workers, ranges of at most 3 pages, from a pool of
+    the test's own.
+    """
+
+    monkeypatch.setattr(pdf_pages, "PDF_WORKERS", 2)
+    monkeypatch.setattr(pdf_pages, "MIN_PAGES_PER_WORKER", 2)
+    monkeypatch.setattr(pdf_pages, "MAX_PAGES_PER_RANGE", 3)
+    monkeypatch.setattr(pdf_pages, "_pool", None)
+    yield
+    if pdf_pages._pool is not None:
+        pdf_pages._pool.shutdown()
+
+
+def test_pool_results_match_serial_in_page_order(tmp_path, pool):
+    path = str(write_pdf(
+        tmp_path / "doc.pdf", [[f"page {i} text"] for i in range(1, 12)]
+    ))
+
+    serial = pdf_pages.map_pages(path, _page_text, workers=1)
+    assert pdf_pages._pool is None
+
+    calls = []
+    parallel = pdf_pages.map_pages(
+        path, _page_text, workers=2, progress=lambda done, total: calls.append(done)
+    )
+
+    assert pdf_pages._pool is not None
+    assert parallel == serial == [(i, f"page {i} text") for i in range(1, 12)]
+    # One call per range, the last one at the page count
+    assert len(calls) > 1 and calls[-1] == 11
+
+
+def test_small_files_stay_in_process(tmp_path, pool):
+    path = str(write_pdf(tmp_path / "doc.pdf", [["one"], ["two"], ["three"]]))
+
+    assert pdf_pages.map_pages(path, _page_text, workers=2) == [
+        (1, "one"), (2, "two"), (3, "three"),
+    ]
+    assert pdf_pages._pool is None
@@ -0,0 +1,53 @@
+import os
+
+import pytest
+from qdrant_client.http.exceptions import ResponseHandlingException, UnexpectedResponse
+
+from app.utils import qdrant_utils
+
+
+@pytest.fixture(autouse=True)
+def fresh_client(monkeypatch):
+    monkeypatch.setattr(qdrant_utils, "_client", None)
+    monkeypatch.setattr(qdrant_utils, "_client_pid", None)
+    monkeypatch.setitem(qdrant_utils.QDRANT_CONFIG, "retry_backoff", 0)
+
+
+def test_one_client_per_process(monkeypatch):
+    client = qdrant_utils.get_qdrant_client()
+    assert qdrant_utils.get_qdrant_client() is client
+
+    # A forked child builds its own
+    pid = os.getpid()
+    monkeypatch.setattr(qdrant_utils.os, "getpid", lambda: pid + 1)
+    assert qdrant_utils.get_qdrant_client() is not client
+
+
+def test_only_transient_errors_are_retried():
+    calls = []
+
+    def flaky(error, failures):
+        def call():
+            calls.append(1)
+            if len(calls) <= failures:
+                raise error
+            return "ok"
+        return call
+
+    assert qdrant_utils._with_retries(
+        flaky(ResponseHandlingException(TimeoutError()), 2)
+    ) == "ok"
+    assert len(calls) == 3
+
+    calls.clear()
+    with pytest.raises(UnexpectedResponse):
+        qdrant_utils._with_retries(
+            flaky(UnexpectedResponse(400, "Bad Request", b"", {}), 1)
+        )
+    assert len(calls) == 1
+
+    calls.clear()
+    assert qdrant_utils._with_retries(
+        flaky(UnexpectedResponse(503, "Unavailable", b"", {}), 1)
+    ) == "ok"
+    assert len(calls) == 2
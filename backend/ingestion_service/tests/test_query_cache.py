@@ -0,0 +1,176 @@
+from app.services import query_cache
+from app.services.query_cache import QueryResultCache
+
+
+def _result(answer="x"):
+    return {"engine": "edue", "question": "q", "result": {"answer": answer}}
+
+
+def test_get_or_compute_computes_once():
+    cache = QueryResultCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return _result()
+
+    first = cache.get_or_compute("doc", "edue", "Which courses?", compute)
+    second = cache.get_or_compute("doc", "edue", "Which courses?", compute)
+
+    assert first["result"] == second["result"] == _result()["result"]
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_hit_returns_callers_question():
+    cache = QueryResultCache()
+    cache.get_or_compute("doc", "edue", "Which courses?", _result)
+
+    hit = cache.get_or_compute("doc", "edue", "which courses", lambda: None)
+
+    assert hit["question"] == "which courses"
+
+
+def test_keys_are_per_document_and_engine():
+    cache = QueryResultCache()
+    cache.get_or_compute("doc", "edue", "q", lambda: _result("a"))
+
+    assert cache.get_or_compute("doc", "bm25", "q", lambda: _result("b"))["result"]["answer"] == "b"
+    assert cache.get_or_compute("other", "edue", "q", lambda: _result("c"))["result"]["answer"] == "c"
+
+
+def test_lru_eviction_by_entries():
+    cache = QueryResultCache(max_entries=2)
+    cache.put(("doc", "edue", "a"), _result("a"))
+    cache.put(("doc", "edue", "b"), _result("b"))
+    cache.get(("doc", "edue", "a"))
+    cache.put(("doc", "edue", "c"), _result("c"))
+
+    assert cache.get(("doc", "edue", "b")) is None
+    assert cache.get(("doc", "edue", "a")) is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_eviction_by_bytes_and_oversized_values():
+    cache = QueryResultCache(max_bytes=100)
+    cache.put(("doc", "edue", "a"), _result("a"))
+    cache.put(("doc", "edue", "b"), _result("b"))
+
+    assert cache.stats()["entries"] == 1
+    assert cache.stats()["bytes"] <= 100
+
+    cache.put(("doc", "edue", "big"), _result("x" * 500))
+    assert cache.get(("doc", "edue", "big")) is None
+
+
+def test_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(query_cache.time, "monotonic", lambda: now[0])
+
+    cache = QueryResultCache(ttl_seconds=10)
+    cache.put(("doc", "edue", "a"), _result())
+
+    now[0] += 5
+    assert cache.get(("doc", "edue", "a")) is not None
+
+    now[0] += 10
+    assert cache.get(("doc", "edue", "a")) is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_invalidate_document():
+    cache = QueryResultCache()
+    cache.put(("doc", "edue", "a"), _result())
+    cache.put(("doc", "bm25", "a"), _result())
+    cache.put(("other", "edue", "a"), _result())
+
+    assert cache.invalidate_document("doc") == 2
+    assert cache.get(("doc", "edue", "a")) is None
+    assert cache.get(("other", "edue", "a")) is not None
+
+
+# -------------------------------------------------------------------
+# Keys never merge questions with different answers
+# -------------------------------------------------------------------
+
+QUESTIONS = [
+    "What is a data warehouse?",
+    "what a data warehouse",
+    "What is a Data Warehouse?",
+    "WHAT IS a data warehouse?",
+    "what is a data warehouse",
+    "data warehouse",
+    "warehouse data",
+    "the data warehouse",
+    "data of warehouse",
+    "Define data warehouse",
+    "How is data loaded into the warehouse?",
+    "how are data loaded into the warehouse",
+    "stream latency",
+    "Stream, latency!",
+    "stream-latency",
+    "Tell me about AE ZG631",
+    "tell me about ae zg631",
+    "Tell me about AE-ZG631",
+    "data warehousing",
+    "Data Warehousing course",
+]
+
+
+def _document():
+    from app.core.course_index import build_course_index
+    from app.core.edue_index import build_edue_index
+    from tests.helpers import SECTIONS
+
+    return {
+        "sections": SECTIONS,
+        "index": build_edue_index(SECTIONS),
+        "courses": build_course_index([{
+            "course_code": "AE ZG631",
+            "title": "Data Warehousing",
+            "credits": 4,
+            "description": "Dimensional modelling and ETL.",
+            "page": 3,
+        }]),
+    }
+
+
+def test_different_answers_never_share_a_key():
+    from app.core.edue_query import query_edue
+
+    document = _document()
+
+    for engine in ("edue", "bm25"):
+        answers = {}
+        for question in QUESTIONS:
+            result = query_edue(document, question, engine)
+            answer = {k: v for k, v in result.items() if k != "question"}
+            key = query_cache.normalize_question(question, engine)
+
+            if key in answers:
+                assert answers[key] == answer, (engine, question)
+            answers[key] = answer
+
+        # Some wordings do share an entry
+        assert len(answers) < len(QUESTIONS)
+
+
+def test_declarative_prefix_is_part_of_the_key():
+    for engine in ("edue", "bm25"):
+        assert (
+            query_cache.normalize_question("What is a data warehouse?", engine)
+            != query_cache.normalize_question("what a data warehouse", engine)
+        )
+
+
+def test_cached_wording_does_not_leak_into_other_questions():
+    from app.core.edue_query import query_edue
+
+    document = _document()
+    cache = QueryResultCache()
+
+    for question in ("what a data warehouse", "What is a data warehouse?"):
+        cached = cache.get_or_compute(
+            "doc", "edue", question, lambda: query_edue(document, question)
+        )
+        assert cached == query_edue(document, question)
@@ -0,0 +1,239 @@
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from qdrant_client import QdrantClient
+from qdrant_client.http.exceptions import ResponseHandlingException, UnexpectedResponse
+from qdrant_client.models import Distance, PointStruct, VectorParams
+
+from app.core import vector_index
+from app.core.vector_index import NumpyVectorIndex
+from app.utils import qdrant_utils
+from app.utils.qdrant_utils import _normalize_hits, _query_filter, ensure_collection
+
+DIM = 8
+
+
+def _points(n, start=0, seed=0, document_count=3):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(n, DIM)).astype(np.float32)
+
+    return [
+        PointStruct(
+            id=start + i,
+            vector=vectors[i].tolist(),
+            payload={
+                "document_id": f"doc-{(start + i) % document_count}",
+                "section": f"section {(start + i) % 5}",
+                "pages": [(start + i) % 7, (start + i) % 7 + 1],
+                "kind": "table" if (start + i) % 4 == 0 else "text",
+            },
+        )
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def qdrant():
+    client = QdrantClient(":memory:")
+    client.create_collection(
+        collection_name="test",
+        vectors_config=VectorParams(size=DIM, distance=Distance.COSINE),
+    )
+
+    def search(query, limit, metadata_filter=None):
+        return _normalize_hits(client.query_points(
+            collection_name="test",
+            query=query,
+            limit=limit,
+            query_filter=_query_filter(metadata_filter),
+            with_payload=True,
+        ).points)
+
+    return SimpleNamespace(
+        upsert=lambda points: client.upsert(collection_name="test", points=points),
+        search=search,
+    )
+
+
+def _assert_same_hits(ours, theirs):
+    assert [h["id"] for h in ours] == [h["id"] for h in theirs]
+    assert [h["payload"] for h in ours] == [h["payload"] for h in theirs]
+    np.testing.assert_allclose(
+        [h["score"] for h in ours], [h["score"] for h in theirs], atol=1e-5
+    )
+
+
+FILTERS = [
+    None,
+    {"document_id": "doc-1"},
+    {"document_id": "doc-2", "pages": 3},
+    {"kind": "table"},                          # no postings: payload scan
+    {"document_id": "doc-0", "kind": "text"},
+    {"document_id": "missing"},
+]
+
+
+@pytest.mark.parametrize("metadata_filter", FILTERS)
+def test_search_matches_qdrant(tmp_path, qdrant, metadata_filter):
+    index = NumpyVectorIndex(tmp_path)
+    points = _points(200)
+    index.upsert(points)
+    qdrant.upsert(points)
+
+    for query in _points(5, seed=1):
+        _assert_same_hits(
+            index.search(query.vector, limit=10, metadata_filter=metadata_filter),
+            qdrant.search(query.vector, limit=10, metadata_filter=metadata_filter),
+        )
+
+
+def test_upsert_replaces_like_qdrant(tmp_path, qdrant):
+    index = NumpyVectorIndex(tmp_path)
+    for points in (_points(100), _points(40, start=30, seed=2)):
+        index.upsert(points)
+        qdrant.upsert(points)
+
+    stats = index.stats()
+    assert (stats["rows"], stats["live"]) == (140, 100)
+
+    for query in _points(5, seed=1):
+        _assert_same_hits(
+            index.search(query.vector, limit=100, metadata_filter={"document_id": "doc-1"}),
+            qdrant.search(query.vector, limit=100, metadata_filter={"document_id": "doc-1"}),
+        )
+
+
+def test_compaction_drops_superseded_rows(tmp_path, qdrant, monkeypatch):
+    monkeypatch.setattr(vector_index, "VECTOR_INDEX_COMPACT_MIN_ROWS", 50)
+
+    index = NumpyVectorIndex(tmp_path)
+    reader = NumpyVectorIndex(tmp_path)
+    queries = _points(5, seed=1)
+
+    index.upsert(_points(100))
+    qdrant.upsert(_points(100))
+    assert reader.stats()["rows"] == 100
+
+    # 60 of 160 rows superseded: below the ratio
+    index.upsert(_points(60, seed=2))
+    qdrant.upsert(_points(60, seed=2))
+    assert index.stats()["compactions"] == 0
+
+    # 100 of 200 rows superseded: compacted to the 100 live rows
+    index.upsert(_points(40, start=60, seed=3))
+    qdrant.upsert(_points(40, start=60, seed=3))
+
+    stats = index.stats()
+    assert (stats["rows"], stats["live"], stats["generation"]) == (100, 100, 1)
+    assert stats["compactions"] == 1
+
+    # Another process picks the new generation up
+    for index_ in (index, reader):
+        for query in queries:
+            _assert_same_hits(
+                index_.search(query.vector, limit=10, metadata_filter={"kind": "table"}),
+                qdrant.search(query.vector, limit=10, metadata_filter={"kind": "table"}),
+            )
+    assert reader.stats()["generation"] == 1
+
+    # Generation 0 goes with the next compaction
+    index.upsert(_points(10, seed=4))
+    index.compact()
+
+    assert index.stats()["generation"] == 2
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "CURRENT",
+        "payloads.1.jsonl", "payloads.2.jsonl",
+        "vectors.1.f32", "vectors.2.f32",
+        "write.lock",
+    ]
+
+
+def test_torn_tail_is_ignored_then_cut_off(tmp_path):
+    index = NumpyVectorIndex(tmp_path)
+    index.upsert(_points(10))
+
+    # A crash halfway through the next row
+    with open(index.vectors_path, "ab") as f:
+        f.write(b"\xff" * 12)
+
+    reader = NumpyVectorIndex(tmp_path)
+    assert reader.stats()["rows"] == 10
+
+    appended = _points(5, start=10, seed=2)
+    reader.upsert(appended)
+
+    assert NumpyVectorIndex(tmp_path).stats()["rows"] == 15
+    hits = reader.search(appended[2].vector, limit=1)
+    assert hits[0]["id"] == 12
+
+
+def test_concurrent_writers_keep_every_row(tmp_path):
+    # Separate handles, as the API ingest queue and bulk_ingest are
+    def write(part):
+        index = NumpyVectorIndex(tmp_path)
+        for start in range(part * 10, 400, 40):
+            index.upsert(_points(10, start=start, seed=start))
+
+    threads = [threading.Thread(target=write, args=(p,)) for p in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    index = NumpyVectorIndex(tmp_path)
+    assert index.stats()["rows"] == 400
+
+    for start in (0, 130, 390):
+        point = _points(10, start=start, seed=start)[3]
+        hit = index.search(point.vector, limit=1)[0]
+        assert (hit["id"], hit["payload"]) == (point.id, point.payload)
+
+
+class FlakyClient:
+    """
+    QdrantClient stand-in whose create_collection fails the
+    first `failures` calls, creating the collection anyway if
+    `created_anyway`.
+    """
+
+    def __init__(self, failures, created_anyway=False):
+        self.failures = failures
+        self.created_anyway = created_anyway
+        self.creates = 0
+        self.exists = False
+
+    def collection_exists(self, name):
+        return self.exists
+
+    def create_collection(self, collection_name, vectors_config):
+        self.creates += 1
+        if self.creates <= self.failures:
+            self.exists = self.created_anyway
+            raise ResponseHandlingException(TimeoutError("timed out"))
+        if self.exists:
+            raise UnexpectedResponse(409, "Conflict", b"already exists", {})
+        self.exists = True
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    monkeypatch.setitem(qdrant_utils.QDRANT_CONFIG, "retry_backoff", 0)
+
+
+def test_ensure_collection_retries_the_create(no_backoff):
+    client = FlakyClient(failures=2)
+    ensure_collection(client, DIM)
+    assert client.exists and client.creates == 3
+
+    client = FlakyClient(failures=qdrant_utils.QDRANT_CONFIG["retries"] + 1)
+    with pytest.raises(ResponseHandlingException):
+        ensure_collection(client, DIM)
+
+
+def test_ensure_collection_accepts_a_create_that_timed_out(no_backoff):
+    client = FlakyClient(failures=1, created_anyway=True)
+    ensure_collection(client, DIM)
+    assert client.exists and client.creates == 1